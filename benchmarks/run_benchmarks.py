@@ -0,0 +1,314 @@
+"""
+Offline throughput benchmarks of the pipeline stages.
+
+Every run starts a local stub server (see stub_servers.py) in place of the News
+API, the publishers and Yahoo Finance, and works in a temporary directory, so
+nothing is read from or written to ./data. For every corpus size it measures:
+
+    extract_full_articles         News API pages + concurrent article downloads
+    process_raw_data              NDJSON archive write and read-back
+    calculate_articles_sentiment  VADER scoring (no memo, so every text is scored)
+    exports                       processed CSV + Parquet and scored CSV exports
+    stock_download                OHLCV payloads for --tickers symbols
+    feature_engineering           FeatureEngine.build over articles and bars
+
+and reports seconds, items/sec and the peak RSS of each stage as JSON.
+
+Usage:
+    python -m benchmarks.run_benchmarks --sizes 100 500 2000 --output bench.json
+    python -m benchmarks.run_benchmarks --sizes 500 --baseline bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.stub_servers import StubServer
+
+logger = logging.getLogger(__name__)
+
+
+class PeakRssSampler:
+    """
+    Tracks the peak resident set size while a block runs.
+
+    /proc/self/statm is sampled every few milliseconds on Linux. Elsewhere the
+    process-wide peak from getrusage is reported, which never decreases.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+    def __enter__(self) -> "PeakRssSampler":
+        self.peak_bytes = self._current()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._current())
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, self._current())
+
+    def _current(self) -> int:
+        try:
+            with open("/proc/self/statm", "r") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except OSError:
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(name: str, items: int, func: Callable[[], Any]) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run one stage and collect its metrics.
+
+    Args:
+        name: Stage name
+        items: Number of items (articles, bars) the stage processes
+        func: The stage
+
+    Returns:
+        The stage result and its metrics
+    """
+    with PeakRssSampler() as sampler:
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+    metrics = {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_sec": round(items / seconds, 2) if seconds > 0 else None,
+        "peak_rss_mb": round(sampler.peak_bytes / 2 ** 20, 1),
+    }
+    logger.info(f"{name}: {metrics}")
+    return result, metrics
+
+
+def download_bars(base_url: str, tickers: List[str], days: int, max_workers: int = 8) -> pd.DataFrame:
+    """
+    Download daily bars of several tickers from the chart stub as one long-format frame.
+
+    Args:
+        base_url: Base URL of the stub server
+        tickers: Ticker symbols
+        days: Number of daily bars per ticker
+        max_workers: Concurrent downloads
+
+    Returns:
+        Long-format DataFrame with 'ticker', 'Date' and OHLCV columns
+    """
+    from src.http_transport import HttpTransport
+
+    transport = HttpTransport(pool_size=max_workers)
+
+    def fetch(ticker: str) -> pd.DataFrame:
+        response = transport.get(f"{base_url}/v8/finance/chart/{ticker}", params={"days": days})
+        result = response.json()["chart"]["result"][0]
+        quote = result["indicators"]["quote"][0]
+        return pd.DataFrame({
+            "ticker": ticker,
+            "Date": pd.to_datetime(result["timestamp"], unit="s"),
+            "Open": quote["open"],
+            "High": quote["high"],
+            "Low": quote["low"],
+            "Close": quote["close"],
+            "Volume": quote["volume"],
+        })
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return pd.concat(executor.map(fetch, tickers), ignore_index=True)
+    finally:
+        transport.close()
+
+
+def run_corpus(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Benchmark every stage on a corpus of the given size.
+
+    Args:
+        size: Number of articles
+        args: Parsed command line arguments
+
+    Returns:
+        Metrics of every stage
+    """
+    from src.feature_engineering import FeatureEngine
+    from src.news_api import NewsApiClient
+    from src.news_data_handler import NewsDataHandler
+    from src.sentiment_analysis import NewsSentimentAnalyzer
+
+    stub = StubServer(size, article_bytes=args.article_bytes, latency_ms=args.latency_ms).start()
+    stages: Dict[str, Dict[str, Any]] = {}
+    try:
+        client = NewsApiClient("benchmark", "business", 30, api_key="benchmark")
+        client.endpoint = f"{stub.base_url}/v2/everything"
+        articles, stages["extract_full_articles"] = measure(
+            "extract_full_articles", size,
+            lambda: client.extract_full_articles(max_workers=args.max_workers, max_per_host=args.max_workers,
+                                                 parse_workers=args.parse_workers)
+        )
+
+        handler = NewsDataHandler(ticker="BENCH")
+
+        def process() -> pd.DataFrame:
+            path = handler.save_raw_data(articles)
+            return handler.process_raw_data(path)
+
+        processed, stages["process_raw_data"] = measure("process_raw_data", size, process)
+
+        analyzer = NewsSentimentAnalyzer(n_workers=args.workers, engine=args.engine)
+        scored, stages["calculate_articles_sentiment"] = measure(
+            "calculate_articles_sentiment", size, lambda: analyzer.calculate_articles_sentiment(processed)
+        )
+
+        def export() -> None:
+            handler.export_articles(processed, formats=["csv", "parquet"])
+            analyzer.export_to_csv(scored)
+
+        _, stages["exports"] = measure("exports", size, export)
+
+        tickers = [f"T{i:04d}" for i in range(args.tickers)]
+        bars, stages["stock_download"] = measure(
+            "stock_download", args.tickers * args.days,
+            lambda: download_bars(stub.base_url, tickers, args.days)
+        )
+
+        news = scored[["date", "sentiment"]].assign(ticker=[tickers[i % len(tickers)] for i in range(len(scored))])
+        _, stages["feature_engineering"] = measure(
+            "feature_engineering", len(news) + len(bars),
+            lambda: FeatureEngine(output_path="./data/final/engineered_features.csv").build(
+                news, bars, date_column="date", score_column="sentiment"
+            )
+        )
+    finally:
+        stub.stop()
+    return stages
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Compare stage timings with a baseline report.
+
+    Args:
+        results: Report of this run
+        baseline: Earlier report
+        tolerance: Allowed relative slowdown, e.g. 0.1 for 10 %
+
+    Returns:
+        One message per stage that got slower than the tolerance allows
+    """
+    regressions = []
+    baseline_runs = {run["corpus_size"]: run["stages"] for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        for stage, metrics in run["stages"].items():
+            before = baseline_runs.get(run["corpus_size"], {}).get(stage)
+            if not before or not before["seconds"]:
+                continue
+            ratio = metrics["seconds"] / before["seconds"]
+            metrics["baseline_ratio"] = round(ratio, 3)
+            if ratio > 1 + tolerance:
+                regressions.append(f"{stage} at {run['corpus_size']} articles: "
+                                   f"{before['seconds']}s -> {metrics['seconds']}s ({ratio:.2f}x)")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run_benchmarks", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 2000], help="Corpus sizes")
+    parser.add_argument("--article-bytes", type=int, default=6000, help="Text size of an article page")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency of every article page")
+    parser.add_argument("--max-workers", type=int, default=8, help="Concurrent article downloads")
+    parser.add_argument("--parse-workers", type=int, default=1, help="Article text extraction processes")
+    parser.add_argument("--engine", choices=["nltk", "compiled"], default="nltk", help="Sentiment engine")
+    parser.add_argument("--workers", type=int, default=1, help="Sentiment scoring processes")
+    parser.add_argument("--tickers", type=int, default=50, help="Number of stock tickers")
+    parser.add_argument("--days", type=int, default=250, help="Daily bars per ticker")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare the timings with")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed slowdown against the baseline")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level (default: WARNING)")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the benchmarks and print or write the report.
+
+    Returns:
+        1 if a stage regressed against the baseline, 0 otherwise
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # Stage results are logged even when the pipeline modules are kept quiet
+    logging.getLogger(__name__).setLevel(min(logging.INFO, logging.getLogger().level))
+
+    report: Dict[str, Any] = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "settings": {key: value for key, value in vars(args).items()
+                     if key not in ("output", "baseline", "log_level")},
+        "runs": [],
+    }
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="fni-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            for size in args.sizes:
+                report["runs"].append({"corpus_size": size, "stages": run_corpus(size, args)})
+        finally:
+            os.chdir(cwd)
+
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    for message in regressions:
+        print(f"Regression: {message}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
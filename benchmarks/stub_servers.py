@@ -0,0 +1,170 @@
+"""
+Local stand-ins for the News API, publisher sites and the Yahoo Finance chart API.
+
+All responses are synthetic and deterministic, so benchmark runs are comparable
+and never touch the network.
+"""
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+# Words with and without a VADER valence, so scoring does realistic work
+_WORDS = (
+    "apple shares market investors quarter revenue growth iphone analysts company stock "
+    "report earnings guidance tariffs supply chain demand china services profit strong "
+    "weak record decline gains losses surge slump concerns optimism beat miss great bad "
+    "good risk uncertainty rally crash boost cut jobs innovation lawsuit fine win fail"
+).split()
+
+
+def synthetic_text(seed: int, size: int) -> str:
+    """
+    Build a deterministic pseudo article text of about size characters.
+
+    Args:
+        seed: Seed of the text (the same seed always gives the same text)
+        size: Approximate length in characters
+
+    Returns:
+        Text made of sentences of random words
+    """
+    rng = random.Random(seed)
+    sentences: List[str] = []
+    length = 0
+    while length < size:
+        sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+        sentences.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(sentences)
+
+
+class StubServer:
+    """
+    One threaded HTTP server that plays the News API, the publishers and Yahoo Finance.
+
+    Routes:
+        /v2/everything?page=&pageSize=   News API pages listing the synthetic articles
+        /articles/<id>                    Article HTML of article_bytes characters,
+                                          answered after latency_ms
+        /v8/finance/chart/<symbol>?days=  Daily OHLCV bars in the Yahoo chart format
+    """
+
+    def __init__(self, corpus_size: int, article_bytes: int = 6000, latency_ms: float = 0.0) -> None:
+        """
+        Initialize the server without starting it.
+
+        Args:
+            corpus_size: Number of articles the News API stub returns in total
+            article_bytes: Approximate size of the text of an article page
+            latency_ms: Delay before every article page is answered
+        """
+        self.corpus_size = corpus_size
+        self.article_bytes = article_bytes
+        self.latency_ms = latency_ms
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """Start serving on a free local port in a background thread."""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(url.query).items()}
+                if url.path == "/v2/everything":
+                    status, content_type, body = 200, "application/json", stub._news_page(query)
+                elif url.path.startswith("/articles/"):
+                    time.sleep(stub.latency_ms / 1000)
+                    status, content_type, body = 200, "text/html", stub._article(int(url.path.rsplit("/", 1)[1]))
+                elif url.path.startswith("/v8/finance/chart/"):
+                    symbol = url.path.rsplit("/", 1)[1]
+                    status, content_type, body = 200, "application/json", stub._chart(symbol, int(query.get("days", 250)))
+                else:
+                    status, content_type, body = 404, "text/plain", b"not found"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _news_page(self, query: Dict[str, str]) -> bytes:
+        page = int(query.get("page", 1))
+        page_size = int(query.get("pageSize", 100))
+        first = (page - 1) * page_size
+        articles = [self._article_metadata(i) for i in range(first, min(first + page_size, self.corpus_size))]
+        return json.dumps({"status": "ok", "totalResults": self.corpus_size, "articles": articles}).encode("utf-8")
+
+    def _article_metadata(self, article_id: int) -> Dict[str, object]:
+        day = 1 + article_id % 28
+        return {
+            "source": {"id": None, "name": f"Publisher {article_id % 20}"},
+            "author": f"Author {article_id % 50}",
+            "title": f"Synthetic story {article_id}",
+            "description": synthetic_text(article_id, 150),
+            "url": f"{self.base_url}/articles/{article_id}",
+            "urlToImage": None,
+            "publishedAt": f"2025-04-{day:02d}T{article_id % 24:02d}:00:00Z",
+            "content": synthetic_text(article_id, 200),
+        }
+
+    def _article(self, article_id: int) -> bytes:
+        paragraphs = "".join(
+            f"<p>{sentence}.</p>" for sentence in synthetic_text(article_id, self.article_bytes).split(". ")
+        )
+        html = (
+            f"<html><head><title>Synthetic story {article_id}</title></head><body>"
+            f"<nav><a href='/'>Home</a></nav><article><h1>Synthetic story {article_id}</h1>"
+            f"{paragraphs}</article><footer>Copyright</footer></body></html>"
+        )
+        return html.encode("utf-8")
+
+    @staticmethod
+    def _chart(symbol: str, days: int) -> bytes:
+        rng = random.Random(symbol)
+        start = 1704067200  # 2024-01-01 00:00 UTC
+        timestamps, opens, highs, lows, closes, volumes = [], [], [], [], [], []
+        price = 50 + rng.random() * 200
+        for day in range(days):
+            open_ = price * (1 + rng.gauss(0, 0.005))
+            close = open_ * (1 + rng.gauss(0, 0.015))
+            timestamps.append(start + day * 86400)
+            opens.append(open_)
+            closes.append(close)
+            highs.append(max(open_, close) * (1 + abs(rng.gauss(0, 0.004))))
+            lows.append(min(open_, close) * (1 - abs(rng.gauss(0, 0.004))))
+            volumes.append(int(1e6 * math.exp(rng.gauss(2, 0.3))))
+            price = close
+        payload = {"chart": {"result": [{
+            "meta": {"symbol": symbol, "currency": "USD"},
+            "timestamp": timestamps,
+            "indicators": {"quote": [{"open": opens, "high": highs, "low": lows, "close": closes, "volume": volumes}]},
+        }], "error": None}}
+        return json.dumps(payload).encode("utf-8")
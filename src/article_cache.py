@@ -0,0 +1,237 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the referral and never change the page content
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "cmpid", "ocid",
+    "ref", "ref_src", "referrer", "smid", "sr_share", "guccounter", "taid",
+})
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize an article URL so that trivially different links share one cache key.
+
+    The scheme and host are lower-cased, default ports, fragments, tracking
+    parameters (utm_* and the like) and trailing slashes are removed, and the
+    remaining query parameters are sorted.
+
+    Args:
+        url: The URL to normalize
+
+    Returns:
+        The normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+@dataclass
+class CachedArticle:
+    """A cached article page together with its HTTP validators."""
+
+    url: str
+    html: str
+    full_text: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl_seconds: float) -> bool:
+        """
+        Check whether the entry may be served without contacting the publisher.
+
+        Args:
+            ttl_seconds: Maximum age of the entry in seconds
+
+        Returns:
+            True if the entry is younger than the TTL
+        """
+        return time.time() - self.fetched_at < ttl_seconds
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """
+        Build the headers for a conditional revalidation request.
+
+        Returns:
+            Dictionary with If-None-Match and/or If-Modified-Since headers
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ArticleCache:
+    """
+    Persistent, size-bounded cache of article HTML and extracted text.
+
+    Entries are keyed by the normalized article URL and stored in a SQLite file.
+    The raw HTML is kept zlib-compressed. When the total stored size exceeds
+    ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+            self,
+            path: str = "./data/cache/articles.sqlite",
+            ttl_seconds: float = 7 * 24 * 3600,
+            max_bytes: int = 512 * 1024 * 1024
+    ) -> None:
+        """
+        Initialize the cache, creating the database file if needed.
+
+        Args:
+            path: Path of the SQLite database file
+            ttl_seconds: Age after which an entry must be revalidated before use
+            max_bytes: Upper bound on the stored HTML and text size in bytes
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                html BLOB NOT NULL,
+                full_text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_accessed_at ON articles (accessed_at);
+        """)
+        self._connection.commit()
+        self._total_size = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        logger.info(f"ArticleCache opened at {self.path} ({self._total_size} bytes stored)")
+
+    def get(self, url: str) -> Optional[CachedArticle]:
+        """
+        Look up an article and mark it as recently used.
+
+        Args:
+            url: Article URL (normalized internally)
+
+        Returns:
+            The cached article, or None on a cache miss
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT url, html, full_text, etag, last_modified, fetched_at FROM articles WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute("UPDATE articles SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._connection.commit()
+
+        return CachedArticle(
+            url=row[0],
+            html=zlib.decompress(row[1]).decode("utf-8"),
+            full_text=row[2],
+            etag=row[3],
+            last_modified=row[4],
+            fetched_at=row[5]
+        )
+
+    def put(
+            self,
+            url: str,
+            html: str,
+            full_text: str,
+            etag: Optional[str] = None,
+            last_modified: Optional[str] = None
+    ) -> None:
+        """
+        Store or replace an article and evict old entries if the cache is full.
+
+        Args:
+            url: Article URL (normalized internally)
+            html: Raw HTML of the article page
+            full_text: Text extracted from the page
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+        """
+        compressed_html = zlib.compress(html.encode("utf-8"))
+        size = len(compressed_html) + len(full_text.encode("utf-8"))
+        now = time.time()
+
+        key = normalize_url(url)
+        with self._lock:
+            previous = self._connection.execute("SELECT size FROM articles WHERE key = ?", (key,)).fetchone()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO articles "
+                "(key, url, html, full_text, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, compressed_html, full_text, etag, last_modified, now, now, size)
+            )
+            self._total_size += size - (previous[0] if previous else 0)
+            if self._total_size > self.max_bytes:
+                self._evict()
+            self._connection.commit()
+
+    def mark_revalidated(self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """
+        Reset the age of an entry after the publisher answered 304 Not Modified.
+
+        Args:
+            url: Article URL (normalized internally)
+            etag: New ETag header, if the response carried one
+            last_modified: New Last-Modified header, if the response carried one
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "UPDATE articles SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE key = ?",
+                (now, now, etag, last_modified, normalize_url(url))
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        evicted = 0
+        rows = self._connection.execute("SELECT key, size FROM articles ORDER BY accessed_at")
+        for key, size in rows.fetchall():
+            if self._total_size <= self.max_bytes:
+                break
+            self._connection.execute("DELETE FROM articles WHERE key = ?", (key,))
+            self._total_size -= size
+            evicted += 1
+        logger.info(f"Evicted {evicted} entries from article cache")
@@ -0,0 +1,305 @@
+import json
+import logging
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Tried in order on every page after JSON-LD; per-domain rules are tried before them
+DEFAULT_RULES = (
+    "//*[@itemprop='articleBody']",
+    "//article",
+)
+
+_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.IGNORECASE)
+
+# Start of the 'full_text' placeholder of an article whose page could not be fetched or extracted
+EXTRACTION_ERROR_PREFIX = "[Error "
+
+
+def is_extraction_placeholder(text: Optional[str]) -> bool:
+    """
+    Check whether an article text is missing: empty, or an extraction error placeholder.
+
+    Args:
+        text: Value of an article's 'full_text'
+
+    Returns:
+        True if the text holds no article content
+    """
+    text = (text or "").strip()
+    return not text or (text.startswith(EXTRACTION_ERROR_PREFIX) and text.endswith("]"))
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """
+    Get the charset declared in a Content-Type header.
+
+    Unlike requests, no ISO-8859-1 default is assumed for text types, so lxml can
+    fall back to the <meta charset> of the page.
+
+    Args:
+        content_type: Value of the Content-Type header
+
+    Returns:
+        The charset, or None if the header declares none
+    """
+    match = _CHARSET_RE.search(content_type or "")
+    return match.group(1) if match else None
+
+
+def _find_article_bodies(node: Any) -> Iterator[str]:
+    """Yield every 'articleBody' string of a JSON-LD document, including nested @graph entries."""
+    if isinstance(node, dict):
+        body = node.get("articleBody")
+        if isinstance(body, str):
+            yield body
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                yield from _find_article_bodies(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _find_article_bodies(item)
+
+
+@lru_cache(maxsize=None)
+def _text_document_class() -> type:
+    """readability Document whose summary is the text of its article tree rather than serialized HTML."""
+    from readability import Document
+
+    class TextDocument(Document):
+        def get_clean_html(self):
+            return self.html.text_content()
+
+    return TextDocument
+
+
+class ArticleExtractor:
+    """
+    Extracts the readable text of an article page from a single parse tree.
+
+    The page is parsed once with lxml. The article text is then taken from the
+    first source that yields at least min_length characters:
+
+        1. the 'articleBody' of the JSON-LD metadata most news sites embed
+        2. the XPath rules of the page's domain, then DEFAULT_RULES
+           (e.g. <article> or itemprop="articleBody" elements)
+        3. readability, run on the same tree
+
+    Readability scores every paragraph of the page, so it is by far the most
+    expensive step and only runs on pages the cheap rules do not cover.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 2 * 1024 * 1024,
+            domain_rules: Optional[Dict[str, Sequence[str]]] = None,
+            min_length: int = 200
+    ) -> None:
+        """
+        Initialize the extractor.
+
+        Args:
+            max_bytes: Maximum number of bytes of a page that are downloaded and parsed
+            domain_rules: XPath expressions per domain, e.g. {"example.com": ["//div[@id='story']"]};
+                          a domain also matches its subdomains
+            min_length: Minimum number of characters a rule must yield to be accepted
+
+        Raises:
+            ValueError: If max_bytes is lower than 1
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        self.max_bytes = max_bytes
+        self.domain_rules: Dict[str, List[str]] = {
+            domain.lower(): list(rules) for domain, rules in (domain_rules or {}).items()
+        }
+        self.min_length = min_length
+
+    def extract(self, page: bytes, host: str = "", encoding: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Extract the article text of a page.
+
+        Args:
+            page: Raw page content, possibly truncated at max_bytes
+            host: Host the page was downloaded from, used to select domain rules
+            encoding: Charset from the Content-Type header, if any
+
+        Returns:
+            The stripped article text and the method that produced it
+            ('json_ld', 'rule' or 'readability')
+
+        Raises:
+            Exception: If the page cannot be parsed at all
+        """
+        # Imported here so that clients which only query the API never load the parsers
+        from lxml import etree, html
+
+        parser = html.HTMLParser(encoding=encoding) if encoding else None
+        tree = html.document_fromstring(page, parser=parser)
+
+        text = self._from_json_ld(tree)
+        method = "json_ld"
+        if text is None:
+            # Scripts and styles carry no article text; JSON-LD was the last thing needed from them
+            etree.strip_elements(tree, "script", "style", "noscript", with_tail=False)
+            text = self._from_rules(tree, host)
+            method = "rule"
+        if text is None:
+            text = self._from_readability(tree)
+            method = "readability"
+        return text, method
+
+    def _from_json_ld(self, tree) -> Optional[str]:
+        """Longest JSON-LD articleBody of the page, if it is long enough."""
+        bodies: List[str] = []
+        for script in tree.xpath("//script[@type='application/ld+json']/text()"):
+            try:
+                bodies.extend(_find_article_bodies(json.loads(script)))
+            except ValueError:
+                continue
+        text = max((body.strip() for body in bodies), key=len, default="")
+        return text if len(text) >= self.min_length else None
+
+    def _from_rules(self, tree, host: str) -> Optional[str]:
+        """Text of the first domain or default rule matching a long enough element."""
+        for rule in self._rules_for(host):
+            texts = [node.text_content().strip() for node in tree.xpath(rule)]
+            text = max(texts, key=len, default="")
+            if len(text) >= self.min_length:
+                return text
+        return None
+
+    def _rules_for(self, host: str) -> List[str]:
+        """Rules of the host's domain (longest domain first), then the default rules."""
+        host = host.lower().split(":")[0]
+        rules: List[str] = []
+        for domain in sorted(self.domain_rules, key=len, reverse=True):
+            if host == domain or host.endswith(f".{domain}"):
+                rules.extend(self.domain_rules[domain])
+        return rules + list(DEFAULT_RULES)
+
+    @staticmethod
+    def _from_readability(tree) -> str:
+        """Readability's article text, read from its own tree instead of its serialized HTML."""
+        return _text_document_class()(tree).summary().strip()
+
+
+# Extractor of the current worker process (see ExtractionPool)
+_worker_extractor: Optional[ArticleExtractor] = None
+
+
+def _init_extraction_worker(extractor: ArticleExtractor) -> None:
+    global _worker_extractor
+    _worker_extractor = extractor
+
+
+def _extract_in_worker(page: bytes, host: str, encoding: Optional[str]) -> Tuple[str, str, float]:
+    """Extract one page in a worker process; also returns the seconds it took."""
+    start = time.perf_counter()
+    text, method = _worker_extractor.extract(page, host=host, encoding=encoding)
+    return text, method, time.perf_counter() - start
+
+
+class ExtractionPool:
+    """
+    Second stage of article extraction: parses downloaded pages on a process pool.
+
+    Parsing is CPU-bound lxml/readability work that holds the GIL, so download
+    threads hand their pages to this pool instead of parsing them themselves.
+    Pages wait in a bounded queue, and only a few per worker process are
+    submitted at a time; when parsing falls behind, submit blocks the download
+    threads, so at most about (queue_size + 2 * workers) pages are held in memory.
+    """
+
+    def __init__(self, extractor: ArticleExtractor, workers: int, queue_size: Optional[int] = None) -> None:
+        """
+        Start the worker processes.
+
+        Args:
+            extractor: Extractor run in every worker
+            workers: Number of worker processes
+            queue_size: Pages waiting for a worker before submit blocks (defaults to 2 * workers)
+
+        Raises:
+            ValueError: If workers is lower than 1
+        """
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size or 2 * workers)
+        self._in_flight = threading.BoundedSemaphore(2 * workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_extraction_worker,
+            initargs=(extractor,)
+        )
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="extraction-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info(f"ExtractionPool started with {workers} processes")
+
+    def submit(
+            self,
+            page: bytes,
+            host: str,
+            encoding: Optional[str],
+            callback: Callable[[Optional[Tuple[str, str, float]], Optional[BaseException]], None]
+    ) -> None:
+        """
+        Queue a page for extraction, blocking while the queue is full.
+
+        Args:
+            page: Raw page content
+            host: Host the page was downloaded from
+            encoding: Charset from the Content-Type header, if any
+            callback: Called with ((text, method, seconds), None) on success or
+                      (None, exception) on failure, from a pool thread
+        """
+        self._queue.put((page, host, encoding, callback))
+
+    def close(self) -> None:
+        """Wait until every queued page is extracted and its callback ran, then stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._dispatcher.join()
+        # The pool's management thread runs the callbacks, so shutdown returns after the last one
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "ExtractionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _dispatch(self) -> None:
+        """Move queued pages to the process pool, keeping a bounded number in flight."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            page, host, encoding, callback = item
+            self._in_flight.acquire()
+            try:
+                future = self._executor.submit(_extract_in_worker, page, host, encoding)
+            except Exception as e:
+                # e.g. BrokenProcessPool after a worker crashed
+                self._in_flight.release()
+                callback(None, e)
+                continue
+            future.add_done_callback(partial(self._done, callback))
+
+    def _done(self, callback: Callable, future: Future) -> None:
+        try:
+            error = future.exception()
+            callback(None if error else future.result(), error)
+        except Exception:
+            logger.exception("Extraction callback failed")
+        finally:
+            self._in_flight.release()
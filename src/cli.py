@@ -0,0 +1,470 @@
+"""
+Command line entry point of the pipeline.
+
+Usage:
+    python -m src news
+    python -m src news --query apple microsoft nvidia
+    python -m src sentiment --engine compiled
+    python -m src stock --symbol AAPL --period 1mo
+    python -m src stock --symbol AAPL MSFT NVDA --period 1y
+    python -m src features
+    python -m src features --source sqlite --ticker AAPL --start 2025-05-01 --end 2025-05-31
+    python -m src features --session-align
+    python -m src all
+    python -m src --metrics-output metrics.prom all
+
+Every stage imports its modules inside the function that runs it, so a stage
+only pays for the dependencies it uses (e.g. 'stock' never loads nltk,
+readability or lxml).
+"""
+import argparse
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROCESSED_ARTICLES_PATH = "./data/processed/articles.csv"
+SCORED_ARTICLES_PATH = "./data/processed/articles_with_sentiment_score.csv"
+ONLINE_FEATURES_STATE_PATH = "./data/state/online_features.json"
+RATE_LIMIT_STATE_PATH = "./data/state/news_api_rate_limit.json"
+
+
+def run_news(args: argparse.Namespace):
+    """
+    Fetch articles, extract their full text and store the raw and processed data.
+
+    Several --query values are fetched together by NewsQueryScheduler, which merges
+    them into as few API requests as possible and tags every article with the
+    queries it matched ('matched_queries').
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        DataFrame with the articles processed in this run
+    """
+    from datetime import datetime, timedelta
+
+    from src.article_cache import ArticleCache
+    from src.article_extraction import ArticleExtractor
+    from src.deduplication import ExactDuplicateFilter
+    from src.ingestion_state import WatermarkStore
+    from src.news_api import NewsApiClient
+    from src.news_data_handler import NewsDataHandler
+    from src.news_scheduler import NewsQueryScheduler, QueryJob
+    from src.rate_limiter import TokenBucket
+
+    incremental = not args.full_refresh
+    watermarks = WatermarkStore()
+    news_data_handler = NewsDataHandler(ticker=args.ticker)
+    rate_limiter = TokenBucket.for_daily_quota(args.requests_per_day, state_path=RATE_LIMIT_STATE_PATH)
+
+    dedup = None
+    if not args.no_dedup:
+        # Archived URLs are looked up in the archive's URL index instead of being loaded
+        dedup = ExactDuplicateFilter(url_lookup=news_data_handler.raw_archive.has_url_key if incremental else None)
+
+    articles_from_newsAPI = NewsApiClient(
+        search_query=args.query[0],
+        categories=args.categories,
+        search_days=args.days,
+        cache=None if args.no_cache else ArticleCache(),
+        since=watermarks.get(NewsApiClient.build_query_key(args.query[0], args.categories)) if incremental else None,
+        dedup=dedup,
+        extractor=ArticleExtractor(max_bytes=args.max_article_bytes),
+        rate_limiter=rate_limiter,
+    )
+
+    # Jobs of a multi-query run whose articles were fetched completely
+    jobs = []
+    if len(args.query) == 1:
+        articles = articles_from_newsAPI.extract_full_articles(
+            max_workers=args.max_workers,
+            max_per_host=args.max_per_host,
+            parse_workers=args.parse_workers
+        )
+    else:
+        window_start = (datetime.today() - timedelta(days=args.days)).strftime("%Y-%m-%d")
+        for query in dict.fromkeys(args.query):
+            since = watermarks.get(NewsApiClient.build_query_key(query, args.categories)) if incremental else None
+            jobs.append(QueryJob(query, args.categories, max(since or window_start, window_start),
+                                 articles_from_newsAPI.end_date))
+        schedule = NewsQueryScheduler(rate_limiter=rate_limiter).fetch(jobs)
+        # Pending and truncated jobs may be merged or narrowed, so they are matched by query.
+        # Their watermarks stay put, or the articles that were not fetched would fall below them
+        pending_keys = {job.key for job in schedule.pending + schedule.truncated}
+        jobs = [job for job in jobs if job.key not in pending_keys]
+        articles = articles_from_newsAPI.extract_full_articles(
+            max_workers=args.max_workers,
+            max_per_host=args.max_per_host,
+            pages=[{"articles": schedule.articles}],
+            parse_workers=args.parse_workers
+        )
+
+    if incremental:
+        new_articles = news_data_handler.merge_raw_data(articles)
+        processed_articles = news_data_handler.articles_to_dataframe(new_articles)
+    else:
+        news_data_handler.save_raw_data(articles)
+        processed_articles = news_data_handler.articles_to_dataframe(articles)
+
+    if not processed_articles.empty:
+        news_data_handler.export_articles(processed_articles, formats=args.formats, append=incremental)
+
+    if incremental and len(args.query) == 1:
+        if articles_from_newsAPI.truncated:
+            # The oldest results were not fetched; advancing would skip them for good
+            logger.warning(f"Not advancing the watermark of '{articles_from_newsAPI.query_key}'")
+        else:
+            watermarks.advance(articles_from_newsAPI.query_key, articles)
+    elif incremental:
+        for job in jobs:
+            watermarks.advance(job.key, [a for a in articles if job.key in a.get("matched_queries", [])])
+    return processed_articles
+
+
+def run_sentiment(args: argparse.Namespace, processed_articles=None):
+    """
+    Score article sentiment and export the results.
+
+    Args:
+        args: Parsed command line arguments
+        processed_articles: Articles to score. If None, every article in the
+                            processed articles CSV is scored
+
+    Returns:
+        DataFrame with the scored articles, or None if there was nothing to score
+    """
+    import pandas as pd
+
+    from src.deduplication import NearDuplicateIndex
+    from src.news_data_handler import compact_articles
+    from src.sentiment_analysis import NewsSentimentAnalyzer
+    from src.sentiment_memo import SentimentMemo
+
+    append = processed_articles is not None and not getattr(args, "full_refresh", False)
+    if processed_articles is None:
+        processed_articles = compact_articles(pd.read_csv(PROCESSED_ARTICLES_PATH, index_col=0))
+    if processed_articles.empty:
+        logger.info("No new articles to score")
+        return None
+    if not args.no_dedup:
+        processed_articles = NearDuplicateIndex().link(processed_articles)
+
+    news_sentiment_analyzer = NewsSentimentAnalyzer(
+        n_workers=args.workers,
+        chunk_size=args.chunk_size,
+        memo=None if args.no_memo else SentimentMemo(),
+        engine=args.engine,
+    )
+
+    # The articles are this stage's own frame, so the scores are attached instead of copying the texts
+    news_sentiment_analysis = news_sentiment_analyzer.calculate_articles_sentiment(
+        processed_articles, output="attach", drop_full_text=args.drop_full_text
+    )
+    if "csv" in args.formats:
+        news_sentiment_analyzer.export_to_csv(news_data=news_sentiment_analysis, append=append)
+    if "parquet" in args.formats:
+        news_sentiment_analyzer.export_to_parquet(news_sentiment_analysis, ticker=args.ticker, append=append)
+    if "sqlite" in args.formats:
+        news_sentiment_analyzer.export_to_sqlite(news_sentiment_analysis, ticker=args.ticker)
+    return news_sentiment_analysis
+
+
+def run_stock(args: argparse.Namespace):
+    """
+    Download stock prices from Yahoo Finance and export them.
+
+    Args:
+        args: Parsed command line arguments
+
+    Returns:
+        DataFrame with the downloaded prices
+    """
+    from src.price_store import PriceStore
+    from src.stock_data_handler import StockDataHandler
+    from src.yahoo_finance import YahooFinanceClient
+
+    stock_data_handler = StockDataHandler()
+
+    if len(args.symbol) == 1:
+        stock_data_from_yahoo = YahooFinanceClient(
+            stock_symbol=args.symbol[0],
+            period=args.period,
+            interval=args.interval,
+            store=None if args.no_price_store else PriceStore()
+        )
+        stocks = stock_data_from_yahoo.fetch_stock_data()
+    else:
+        batch = YahooFinanceClient.fetch_batch(
+            args.symbol,
+            period=args.period,
+            interval=args.interval,
+            max_workers=args.download_workers
+        )
+        for symbol, reason in batch.failed.items():
+            logger.warning(f"Skipping {symbol}: {reason}")
+        stocks = batch.data
+
+    stock_data_handler.export_to_all_formats(stocks, formats=args.formats)
+    return stocks
+
+
+def run_features(args: argparse.Namespace, stocks=None, new_articles=None, incremental: bool = False) -> None:
+    """
+    Build the engineered features from the scored articles and the stock prices.
+
+    In batch mode the features are rebuilt from every scored article. With
+    --online the saved rolling state is updated with only the new articles and
+    bars when incremental is set, and rebuilt from every scored article otherwise.
+
+    With --source sqlite only the scores and prices of --ticker between --start
+    and --end are loaded from the SQLite store, instead of the whole CSV exports.
+    With --session-align articles are assigned to bars by exchange session (see
+    SessionAligner) instead of by UTC calendar day.
+
+    Args:
+        args: Parsed command line arguments
+        stocks: Prices to use. If None, the exported stock CSV is read
+        new_articles: Articles scored in this run (online incremental mode)
+        incremental: Whether to continue from the saved online state
+    """
+    import os
+
+    import pandas as pd
+
+    from src.feature_engineering import FeatureEngine, OnlineFeatureEngine
+    from src.market_sessions import SessionAligner
+    from src.stock_data_handler import StockDataHandler, to_long_format
+
+    store = None
+    if args.source == "sqlite":
+        from src.sqlite_store import SQLiteStore
+        store = SQLiteStore()
+
+    # Session alignment needs the publication timestamps rather than the calendar days
+    date_column = "publishedAt" if args.session_align and not args.online else "date"
+
+    def read_scored_articles():
+        if store is not None:
+            return store.read_sentiment(ticker=args.ticker, start=args.start, end=args.end,
+                                        columns=[date_column, "sentiment"])
+        return pd.read_csv(SCORED_ARTICLES_PATH, usecols=[date_column, "sentiment"])
+
+    if stocks is None and store is not None:
+        stocks = store.read_prices(ticker=args.ticker, start=args.start, end=args.end)
+    elif stocks is None:
+        stocks = StockDataHandler().read_csv()
+    else:
+        stocks = to_long_format(stocks, ticker=args.symbol[0] if len(args.symbol) == 1 else None)
+
+    if not args.online:
+        aligner = SessionAligner(exchange=args.exchange, cutoff=args.session_cutoff) if args.session_align else None
+        scored_articles = read_scored_articles()
+        scored_articles["ticker"] = args.ticker
+        FeatureEngine(session_aligner=aligner).run(
+            scored_articles, stocks, date_column=date_column, score_column="sentiment"
+        )
+        return
+    if args.session_align:
+        logger.warning("--session-align is not supported with --online; articles are keyed by calendar day")
+
+    feature_engine = FeatureEngine()
+
+    # The saved state only keeps the recent days, so a continued run updates the exported rows
+    upsert = incremental and os.path.isfile(ONLINE_FEATURES_STATE_PATH)
+    if upsert:
+        online_engine = OnlineFeatureEngine.load(ONLINE_FEATURES_STATE_PATH)
+        scored_articles = new_articles
+    else:
+        online_engine = OnlineFeatureEngine()
+        scored_articles = read_scored_articles()
+    if scored_articles is not None:
+        online_engine.add_articles(scored_articles, date_column="date", score_column="sentiment", ticker=args.ticker)
+    online_engine.add_bars(stocks)
+    online_engine.save(ONLINE_FEATURES_STATE_PATH)
+    feature_engine.export_to_csv(online_engine.features(), upsert=upsert)
+
+
+def run_all(args: argparse.Namespace) -> None:
+    """
+    Run every stage as a pipeline.
+
+    The news and sentiment branch runs concurrently with the stock branch, and
+    DataFrames are handed from stage to stage in memory. Outputs are checkpointed,
+    so sentiment and features are skipped when their inputs did not change since
+    the last run (e.g. no new articles and no new bars).
+
+    Args:
+        args: Parsed command line arguments
+    """
+    from src.pipeline import Pipeline
+
+    incremental = not args.full_refresh
+    pipeline = Pipeline(max_workers=2)
+    pipeline.add("news", lambda: run_news(args), volatile=True)
+    pipeline.add("stock", lambda: run_stock(args), volatile=True)
+    pipeline.add(
+        "sentiment",
+        lambda news: run_sentiment(args, news),
+        inputs=["news"],
+        params={"engine": args.engine, "dedup": not args.no_dedup, "formats": args.formats,
+                "drop_full_text": args.drop_full_text}
+    )
+    pipeline.add(
+        "features",
+        lambda stock, sentiment: run_features(args, stock, new_articles=sentiment, incremental=incremental),
+        inputs=["stock", "sentiment"],
+        params={"online": args.online, "ticker": args.ticker, "source": args.source,
+                "start": args.start, "end": args.end, "session_align": args.session_align,
+                "exchange": args.exchange, "session_cutoff": args.session_cutoff}
+    )
+    pipeline.run()
+
+
+def _add_formats_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--formats", nargs="+", choices=["csv", "excel", "parquet", "sqlite"], default=["csv"],
+                        help="Output formats of the processed articles, sentiment scores and stock prices")
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    _add_formats_argument(parser)
+    parser.add_argument("--ticker", default="AAPL",
+                        help="Ticker the articles are about (Parquet partition and SQLite key)")
+
+
+def _add_dedup_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--no-dedup", action="store_true",
+                        help="Do not skip or link duplicate and near-duplicate articles")
+
+
+def _add_feature_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--online", action="store_true",
+                        help="Update the saved rolling feature state instead of recomputing all features")
+    parser.add_argument("--source", choices=["csv", "sqlite"], default="csv",
+                        help="Read scores and prices from the exported CSVs or only the --ticker/--start/--end "
+                             "slice from the SQLite store")
+    parser.add_argument("--start", help="First day (YYYY-MM-DD) loaded from the SQLite store")
+    parser.add_argument("--end", help="Last day (YYYY-MM-DD) loaded from the SQLite store")
+    parser.add_argument("--session-align", action="store_true",
+                        help="Assign every article to the next tradable bar of its exchange instead of its "
+                             "UTC calendar day (batch mode)")
+    parser.add_argument("--exchange", default="XNYS",
+                        help="Exchange (MIC) of tickers without a known Yahoo Finance suffix, e.g. XNYS or XLON")
+    parser.add_argument("--session-cutoff", choices=["close", "open"], default="close",
+                        help="Articles count for the first bar ending after ('close') or starting after "
+                             "('open') their publication")
+
+
+def _add_news_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--query", nargs="+", default=["apple"],
+                        help="Keywords to search for in news articles; several are merged into few API requests")
+    parser.add_argument("--categories", default="tech", help="Comma-separated categories to filter by")
+    parser.add_argument("--days", type=int, default=30, help="Number of days in the past to search")
+    parser.add_argument("--full-refresh", action="store_true",
+                        help="Ignore the watermark and rewrite the stored articles")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk article cache")
+    parser.add_argument("--max-workers", type=int, default=8, help="Concurrent article downloads")
+    parser.add_argument("--max-per-host", type=int, default=2, help="Concurrent downloads per publisher")
+    parser.add_argument("--parse-workers", type=int, default=1,
+                        help="Processes extracting article text (default: 1, in the download threads)")
+    parser.add_argument("--requests-per-day", type=int, default=100,
+                        help="News API requests the plan allows per day (default: 100, the developer plan)")
+    parser.add_argument("--max-article-bytes", type=int, default=2 * 1024 * 1024,
+                        help="Bytes of an article page downloaded and parsed at most")
+
+
+def _add_sentiment_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--engine", choices=["nltk", "compiled"], default="nltk", help="Sentiment scoring engine")
+    parser.add_argument("--workers", type=int, default=1, help="Number of scoring processes")
+    parser.add_argument("--chunk-size", type=int, default=64, help="Articles per scoring chunk")
+    parser.add_argument("--no-memo", action="store_true", help="Do not use the sentiment memo table")
+    parser.add_argument("--drop-full-text", action="store_true",
+                        help="Drop the article bodies after scoring, so they are not kept or exported with the scores")
+
+
+def _add_stock_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--symbol", nargs="+", default=["AAPL"], help="One or more ticker symbols")
+    parser.add_argument("--period", default="1mo", help="Period to download, e.g. 1mo or 1y")
+    parser.add_argument("--interval", default="1d", help="Bar interval, e.g. 1d or 1h")
+    parser.add_argument("--download-workers", type=int, default=8,
+                        help="Concurrent Yahoo Finance requests when several symbols are given")
+    parser.add_argument("--no-price-store", action="store_true",
+                        help="Download the full period instead of only the ranges missing locally")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser with one subcommand per pipeline stage.
+
+    Returns:
+        The configured argument parser
+    """
+    parser = argparse.ArgumentParser(prog="python -m src", description="Financial news insights pipeline")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (default: INFO)")
+    parser.add_argument("--metrics-output",
+                        help="Write the run metrics to this file: JSON for a .json path, Prometheus text otherwise")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    news_parser = subparsers.add_parser("news", help="Fetch and store news articles")
+    _add_news_arguments(news_parser)
+    _add_dedup_argument(news_parser)
+    _add_output_arguments(news_parser)
+    news_parser.set_defaults(handler=run_news)
+
+    sentiment_parser = subparsers.add_parser("sentiment", help="Score the stored articles")
+    _add_sentiment_arguments(sentiment_parser)
+    _add_dedup_argument(sentiment_parser)
+    _add_output_arguments(sentiment_parser)
+    sentiment_parser.set_defaults(handler=run_sentiment)
+
+    stock_parser = subparsers.add_parser("stock", help="Download stock prices")
+    _add_stock_arguments(stock_parser)
+    _add_formats_argument(stock_parser)
+    stock_parser.set_defaults(handler=run_stock)
+
+    features_parser = subparsers.add_parser("features", help="Build the engineered features")
+    features_parser.add_argument("--ticker", default="AAPL", help="Ticker the articles are about")
+    _add_feature_arguments(features_parser)
+    features_parser.set_defaults(handler=run_features)
+
+    all_parser = subparsers.add_parser("all", help="Run every stage")
+    _add_news_arguments(all_parser)
+    _add_sentiment_arguments(all_parser)
+    _add_dedup_argument(all_parser)
+    _add_stock_arguments(all_parser)
+    _add_feature_arguments(all_parser)
+    _add_output_arguments(all_parser)
+    all_parser.set_defaults(handler=run_all)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Parse the command line and run the selected stage.
+
+    The run ends with a summary of its metrics (see src.metrics), also when the
+    stage fails.
+
+    Args:
+        argv: Command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    from src.metrics import metrics
+
+    try:
+        with metrics.timer("command_seconds", command=args.command):
+            args.handler(args)
+    finally:
+        logger.info(metrics.summary())
+        if args.metrics_output:
+            metrics.write(args.metrics_output)
+    return 0
@@ -0,0 +1,207 @@
+import logging
+import os
+from typing import Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# A filter is a (column, operator, value) tuple as understood by pyarrow, e.g. ("ticker", "=", "AAPL")
+Filter = Tuple[str, str, Any]
+
+
+def _import_pyarrow():
+    """
+    Import pyarrow, which is only needed for columnar storage.
+
+    Returns:
+        The pyarrow, pyarrow.dataset and pyarrow.parquet modules
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet storage requires pyarrow: pip install pyarrow") from e
+    return pa, ds, pq
+
+
+def add_partition_columns(
+        df: DataFrame,
+        timestamp_column: str,
+        ticker: Optional[str] = None
+) -> DataFrame:
+    """
+    Add the 'ticker' and 'date' partition columns to a dataframe.
+
+    Args:
+        df: DataFrame to partition
+        timestamp_column: Column holding the timestamp the 'date' partition is derived from
+        ticker: Ticker to use if the dataframe has no 'ticker' column yet
+
+    Returns:
+        A new DataFrame with 'ticker' and 'date' columns
+
+    Raises:
+        ValueError: If there is neither a 'ticker' column nor a ticker argument
+    """
+    if "ticker" not in df.columns and ticker is None:
+        raise ValueError("A ticker is required to partition data without a 'ticker' column")
+
+    partitioned = df.assign(date=pd.to_datetime(df[timestamp_column], utc=True).dt.date)
+    if "ticker" not in partitioned.columns:
+        partitioned["ticker"] = ticker
+    return partitioned
+
+
+class ParquetStore:
+    """
+    Parquet dataset partitioned by ticker and date.
+
+    Files are laid out as ``root/ticker=AAPL/date=2025-05-08/*.parquet``, so a read
+    filtered on ticker or date only opens the matching directories, and a column
+    projection only decodes the requested columns (e.g. scores without the
+    article bodies). Column dtypes are stored in the files and survive a round trip.
+    """
+
+    PARTITION_COLUMNS = ("ticker", "date")
+
+    def __init__(self, root: str) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the dataset
+        """
+        self.root = root
+
+    def write(self, df: DataFrame, append: bool = False, key: Optional[str] = None) -> None:
+        """
+        Write a dataframe, replacing the ticker/date partitions it contains.
+
+        Partitions that are not in the dataframe are left untouched, so re-running a
+        day rewrites only that day. With append, the rows already stored in those
+        partitions are kept: they are read back and rewritten together with the new
+        rows, so e.g. a second incremental run on the same day adds to that day.
+
+        Args:
+            df: DataFrame with 'ticker' and 'date' columns (see add_partition_columns)
+            append: Whether to keep the stored rows of the partitions written
+            key: Column identifying a row, e.g. 'url'. When appending, a new row
+                 replaces the stored row with the same key
+
+        Raises:
+            ValueError: If a partition column is missing
+        """
+        missing_columns = [col for col in self.PARTITION_COLUMNS if col not in df.columns]
+        if missing_columns:
+            raise ValueError(f"Missing partition columns: {', '.join(missing_columns)}")
+
+        if append:
+            df = self._with_stored_rows(df, key)
+
+        pa, ds, _ = _import_pyarrow()
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.set_column(
+            table.schema.get_field_index("date"), "date", table.column("date").cast(pa.date32())
+        )
+
+        os.makedirs(self.root, exist_ok=True)
+        ds.write_dataset(
+            table,
+            self.root,
+            format="parquet",
+            partitioning=self._partitioning(),
+            existing_data_behavior="delete_matching",
+            basename_template="part-{i}.parquet",
+        )
+        logger.info(f"Wrote {len(df)} rows to Parquet dataset at {self.root}")
+
+    def read(
+            self,
+            columns: Optional[Sequence[str]] = None,
+            filters: Optional[List[Filter]] = None
+    ) -> DataFrame:
+        """
+        Read a slice of the dataset.
+
+        Args:
+            columns: Columns to load (all if None). Partition columns may be included
+            filters: Row filters such as [("ticker", "=", "AAPL"), ("date", ">=", date(2025, 5, 1))].
+                     Filters on partition columns skip whole directories, other filters
+                     are pushed down to the Parquet row groups
+
+        Returns:
+            DataFrame with the selected rows and columns
+        """
+        if not os.path.isdir(self.root):
+            logger.warning(f"Parquet dataset not found: {self.root}")
+            return pd.DataFrame(columns=list(columns) if columns else None)
+
+        _, ds, _ = _import_pyarrow()
+        dataset = ds.dataset(self.root, format="parquet", partitioning=self._partitioning())
+
+        expression = None
+        for column, operator, value in filters or []:
+            condition = self._condition(ds.field(column), operator, value)
+            expression = condition if expression is None else expression & condition
+
+        table = dataset.to_table(columns=list(columns) if columns else None, filter=expression)
+        logger.info(f"Read {table.num_rows} rows from Parquet dataset at {self.root}")
+        return table.to_pandas()
+
+    def _with_stored_rows(self, df: DataFrame, key: Optional[str]) -> DataFrame:
+        """
+        Prepend the stored rows of the partitions a dataframe is about to replace.
+
+        Only the directories of those partitions are read.
+        """
+        if not os.path.isdir(self.root) or df.empty:
+            return df
+
+        tickers = [str(ticker) for ticker in df["ticker"].unique()]
+        dates = list(pd.to_datetime(df["date"]).dt.date.unique())
+        stored = self.read(filters=[("ticker", "in", tickers), ("date", "in", dates)])
+        if stored.empty:
+            return df
+
+        # The filters select every ticker/date combination; keep the partitions being written
+        written = set(zip(df["ticker"].astype(str), pd.to_datetime(df["date"]).dt.date))
+        stored = stored[[pair in written for pair in zip(stored["ticker"].astype(str), stored["date"])]]
+        if key is not None and key in stored.columns and key in df.columns:
+            stored = stored[~stored[key].isin(df[key])]
+        logger.info(f"Keeping {len(stored)} stored rows of the partitions being rewritten")
+        return pd.concat([stored, df.assign(ticker=df["ticker"].astype(str))], ignore_index=True)
+
+    def _partitioning(self):
+        """Hive partitioning with explicit types, so 'date' is read back as a date."""
+        pa, ds, _ = _import_pyarrow()
+        return ds.partitioning(pa.schema([("ticker", pa.string()), ("date", pa.date32())]), flavor="hive")
+
+    @staticmethod
+    def _condition(field, operator: str, value: Any):
+        """
+        Build a pyarrow filter expression.
+
+        Raises:
+            ValueError: If the operator is not supported
+        """
+        if operator in ("=", "=="):
+            return field == value
+        if operator == "!=":
+            return field != value
+        if operator == "<":
+            return field < value
+        if operator == "<=":
+            return field <= value
+        if operator == ">":
+            return field > value
+        if operator == ">=":
+            return field >= value
+        if operator == "in":
+            return field.isin(list(value))
+        raise ValueError(f"Unsupported filter operator: {operator}")
@@ -0,0 +1,314 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.article_cache import normalize_url
+from src.article_extraction import is_extraction_placeholder
+from src.sentiment_memo import text_hash
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+_SEPARATORS = ("-", "|", "–", "—", ":")
+
+
+def normalize_title(title: str, source_name: Optional[str] = None) -> str:
+    """
+    Normalize an article title so that syndicated copies of a story compare equal.
+
+    Unicode is NFKC-normalized and case-folded, a trailing ' - <source name>' added
+    by the publisher is removed, and punctuation and repeated whitespace are dropped.
+
+    Args:
+        title: Article title
+        source_name: Name of the publisher, removed if the title ends with it
+
+    Returns:
+        The normalized title
+    """
+    normalized = unicodedata.normalize("NFKC", title).casefold().strip()
+    if source_name:
+        source = unicodedata.normalize("NFKC", source_name).casefold().strip()
+        for separator in _SEPARATORS:
+            suffix = f" {separator} {source}"
+            if normalized.endswith(suffix):
+                normalized = normalized[:-len(suffix)]
+                break
+    normalized = _NON_WORD_RE.sub(" ", normalized)
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class ExactDuplicateFilter:
+    """
+    Finds duplicate articles by normalized URL and normalized title before any page is fetched.
+
+    An article with an already seen URL is the same article and can be dropped.
+    An article with a new URL but an already seen title is a syndicated copy: it
+    is kept, but linked to the first article with that title instead of being
+    downloaded again.
+    """
+
+    def __init__(self, url_lookup: Optional[Callable[[str], bool]] = None) -> None:
+        """
+        Initialize an empty filter.
+
+        Args:
+            url_lookup: Optional check whether a normalized URL was ingested before,
+                        e.g. RawArticleArchive.has_url_key
+        """
+        self._urls: set = set()
+        self._titles: Dict[str, str] = {}
+        self._url_lookup = url_lookup
+
+    def add_urls(self, urls) -> None:
+        """
+        Mark URLs as already ingested, e.g. the URLs of the raw article archive.
+
+        Args:
+            urls: Article URLs
+        """
+        self._urls.update(normalize_url(url) for url in urls if url)
+
+    def seen_url(self, article: Dict[str, Any]) -> bool:
+        """
+        Check whether an article with the same normalized URL was already seen.
+
+        Args:
+            article: Article with a 'url' key
+
+        Returns:
+            True if the URL was seen before
+        """
+        key = normalize_url(article["url"])
+        return key in self._urls or (self._url_lookup is not None and self._url_lookup(key))
+
+    def title_duplicate_of(self, article: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the URL of an earlier article with the same normalized title.
+
+        Args:
+            article: Article with 'title' and 'source' keys
+
+        Returns:
+            URL of the canonical article, or None if the title is new
+        """
+        key = self._title_key(article)
+        return self._titles.get(key) if key else None
+
+    def add(self, article: Dict[str, Any]) -> None:
+        """
+        Register an article as canonical for its URL and title.
+
+        Args:
+            article: Article with 'url', 'title' and 'source' keys
+        """
+        self._urls.add(normalize_url(article["url"]))
+        key = self._title_key(article)
+        if key:
+            self._titles.setdefault(key, article["url"])
+
+    @staticmethod
+    def _title_key(article: Dict[str, Any]) -> str:
+        """Normalized title of an article, or '' if it has none."""
+        title = article.get("title") or ""
+        source = article.get("source") or {}
+        source_name = source.get("name") if isinstance(source, dict) else None
+        return normalize_title(title, source_name)
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash index that links near-duplicate article texts to a canonical article.
+
+    Every text is reduced to a MinHash signature of its word shingles. The
+    signature is split into bands, and texts sharing a band are candidates;
+    a candidate is a near-duplicate when the estimated Jaccard similarity of
+    their shingles reaches the threshold. Only canonical articles are indexed,
+    so every duplicate links directly to the first article of its cluster, also
+    across runs.
+    """
+
+    def __init__(
+            self,
+            path: str = "./data/cache/near_duplicates.sqlite",
+            num_perm: int = 64,
+            bands: int = 16,
+            threshold: float = 0.8,
+            shingle_size: int = 5,
+            seed: int = 1
+    ) -> None:
+        """
+        Initialize the index, creating the database file if needed.
+
+        Args:
+            path: Path of the SQLite database file
+            num_perm: Number of hash functions in a signature
+            bands: Number of LSH bands (must divide num_perm)
+            threshold: Minimum estimated Jaccard similarity of near-duplicates
+            shingle_size: Number of words per shingle
+            seed: Seed of the hash functions (must stay the same for an existing index)
+
+        Raises:
+            ValueError: If bands does not divide num_perm
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd 64-bit a
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                url TEXT PRIMARY KEY,
+                text_hash TEXT NOT NULL,
+                signature BLOB NOT NULL
+            )
+        """)
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS bands (
+                band_key TEXT NOT NULL,
+                url TEXT NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_bands_key ON bands (band_key)")
+        self._connection.commit()
+        logger.info(f"NearDuplicateIndex opened at {self.path}")
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text: Article text
+
+        Returns:
+            Array of num_perm uint32 minimum hash values
+        """
+        words = text.casefold().split()
+        size = min(self.shingle_size, len(words)) or 1
+        shingles = {" ".join(words[i:i + size]) for i in range(max(len(words) - size + 1, 1))}
+        values = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little")
+             for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        hashed = (self._a[:, None] * values[None, :] + self._b[:, None]) >> np.uint64(32)
+        return hashed.min(axis=1).astype(np.uint32)
+
+    def link(self, articles: DataFrame, text_column: str = "full_text", url_column: str = "url") -> DataFrame:
+        """
+        Link every near-duplicate article to its canonical article.
+
+        Articles are processed in order, so the first article of a cluster becomes
+        its canonical article unless an earlier run already indexed one. Articles
+        without a text (empty, or an extraction error placeholder) are neither
+        looked up nor indexed.
+
+        Args:
+            articles: Articles with a text and a URL column
+            text_column: Column holding the article text
+            url_column: Column holding the article URL
+
+        Returns:
+            A shallow copy with 'duplicate_of' (URL of the canonical article) and 'canonical_hash'
+            (text hash of the canonical article) set for near-duplicates, None otherwise. An
+            existing 'duplicate_of' link is kept
+        """
+        duplicate_of: List[Optional[str]] = []
+        canonical_hash: List[Optional[str]] = []
+
+        with self._lock:
+            for url, text in zip(articles[url_column], articles[text_column]):
+                text = "" if text is None or text is pd.NA else str(text)
+                # Missing texts are all alike, so they would link unrelated articles
+                match = None if is_extraction_placeholder(text) else self._link_one(url, text)
+                duplicate_of.append(match[0] if match else None)
+                canonical_hash.append(match[1] if match else None)
+            self._connection.commit()
+
+        # A shallow copy: only the two new columns are allocated, not the article texts
+        linked = articles.copy(deep=False)
+        near_duplicate_of = pd.Series(duplicate_of, index=articles.index, dtype=object)
+        if "duplicate_of" in articles.columns:
+            # Keep the links set before, e.g. to the canonical article of a title duplicate
+            near_duplicate_of = articles["duplicate_of"].astype(object).combine_first(near_duplicate_of)
+        linked["duplicate_of"] = near_duplicate_of
+        linked["canonical_hash"] = canonical_hash
+        logger.info(f"Linked {sum(url is not None for url in duplicate_of)} of {len(linked)} articles "
+                    f"to a near-duplicate canonical article")
+        return linked
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def _link_one(self, url: str, text: str) -> Optional[tuple]:
+        """
+        Find the canonical article of one text, or index the text as canonical.
+
+        Returns:
+            (canonical URL, canonical text hash) of a near-duplicate, None otherwise
+        """
+        existing = self._connection.execute("SELECT 1 FROM signatures WHERE url = ?", (url,)).fetchone()
+        if existing:
+            return None
+
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+
+        placeholders = ",".join("?" * len(band_keys))
+        candidates = self._connection.execute(
+            f"SELECT DISTINCT s.url, s.text_hash, s.signature FROM bands b "
+            f"JOIN signatures s ON s.url = b.url WHERE b.band_key IN ({placeholders})",
+            band_keys
+        ).fetchall()
+
+        best: Optional[tuple] = None
+        best_similarity = self.threshold
+        for candidate_url, candidate_hash, candidate_signature in candidates:
+            similarity = float(np.mean(np.frombuffer(candidate_signature, dtype=np.uint32) == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = (candidate_url, candidate_hash), similarity
+        if best:
+            return best
+
+        self._connection.execute(
+            "INSERT INTO signatures (url, text_hash, signature) VALUES (?, ?, ?)",
+            (url, text_hash(text), signature.tobytes())
+        )
+        self._connection.executemany(
+            "INSERT INTO bands (band_key, url) VALUES (?, ?)",
+            [(key, url) for key in band_keys]
+        )
+        return None
+
+    def _band_keys(self, signature: np.ndarray) -> List[str]:
+        """Hash every band of a signature, prefixed with the band number."""
+        rows = self.num_perm // self.bands
+        return [
+            f"{band}:{hashlib.blake2b(signature[band * rows:(band + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+            for band in range(self.bands)
+        ]
@@ -0,0 +1,549 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from src.market_sessions import SessionAligner
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+NEWS_FEATURE_COLUMNS = [
+    "avg_sentiment", "n_positive", "n_negative", "total_articles",
+    "Sentiment_std", "n_news", "polarity_ratio",
+]
+STOCK_FEATURE_COLUMNS = ["Intraday return", "Next Day Return", "Gap", "Volatility 5 Day", "Volume Change"]
+
+
+def _to_day(values: pd.Series) -> pd.Series:
+    """Convert dates or timestamps to naive midnight timestamps (UTC for aware values)."""
+    days = pd.to_datetime(values)
+    if days.dt.tz is not None:
+        days = days.dt.tz_convert("UTC").dt.tz_localize(None)
+    return days.dt.normalize()
+
+
+class FeatureEngine:
+    """
+    Builds the model features from scored news and daily stock bars.
+
+    News features are per-day aggregates of the article sentiment, computed in one
+    grouped pass. Stock features are computed on a long-format frame sorted by
+    ticker and date, so every ticker is handled by the same vectorized operations
+    instead of one group at a time. Both are keyed by 'Date', and by 'ticker'
+    when both inputs have that column.
+
+    Articles are keyed by their UTC calendar day, unless a SessionAligner is
+    given: then every article counts for the next tradable bar of its ticker, so
+    weekend and after-close news is kept and lands in the session it can move.
+    """
+
+    def __init__(
+            self,
+            output_path: str = "./data/final/engineered_features.csv",
+            positive_threshold: float = 0.05,
+            negative_threshold: float = -0.05,
+            volatility_window: int = 5,
+            session_aligner: Optional[SessionAligner] = None
+    ) -> None:
+        """
+        Initialize the feature engine.
+
+        Args:
+            output_path: CSV file the engineered features are written to
+            positive_threshold: Scores above this count as positive articles
+            negative_threshold: Scores below this count as negative articles
+            volatility_window: Number of bars in the close price volatility window
+            session_aligner: Optional aligner assigning articles to bars by exchange session;
+                             the news date column must then hold publication timestamps
+        """
+        self.output_path = output_path
+        self.positive_threshold = positive_threshold
+        self.negative_threshold = negative_threshold
+        self.volatility_window = volatility_window
+        self.session_aligner = session_aligner
+        logger.info(f"FeatureEngine initialized with output path {self.output_path}")
+
+    def news_features(
+            self,
+            news_df: DataFrame,
+            date_column: str = "Date",
+            score_column: str = "Sentiment Score"
+    ) -> DataFrame:
+        """
+        Aggregate article sentiment scores into per-day news features.
+
+        Args:
+            news_df: Scored articles, one row per article
+            date_column: Column holding the publication date
+            score_column: Column holding the compound sentiment score
+
+        Returns:
+            DataFrame with 'Date' (and 'ticker' if present) and NEWS_FEATURE_COLUMNS
+        """
+        keys = self._keys(news_df)
+        scores = news_df[score_column].astype("float64")
+        frame = pd.DataFrame({
+            "Date": _to_day(news_df[date_column]),
+            "score": scores,
+            "positive": (scores > self.positive_threshold).astype("int64"),
+            "negative": (scores < self.negative_threshold).astype("int64"),
+        })
+        if "ticker" in keys:
+            frame["ticker"] = news_df["ticker"].to_numpy()
+
+        features = frame.groupby(keys, sort=True).agg(
+            avg_sentiment=("score", "mean"),
+            n_positive=("positive", "sum"),
+            n_negative=("negative", "sum"),
+            total_articles=("score", "count"),
+            Sentiment_std=("score", "std"),
+            n_news=("score", "size"),
+        ).reset_index()
+        features["polarity_ratio"] = features["n_positive"] / (
+            features["n_positive"] + features["n_negative"] + 1e-5
+        )
+        logger.info(f"Computed news features for {len(features)} days")
+        return features[keys + NEWS_FEATURE_COLUMNS]
+
+    def stock_features(self, stock_df: DataFrame) -> DataFrame:
+        """
+        Compute the daily stock features for one or many tickers at once.
+
+        Rows are sorted by ticker and date once; shifted and rolling values are
+        computed over the whole frame and then masked where they would reach across
+        a ticker boundary.
+
+        Args:
+            stock_df: Daily bars with 'Date', 'Open', 'Close' and 'Volume' columns,
+                      and a 'ticker' column for more than one ticker
+
+        Returns:
+            DataFrame with 'Date' (and 'ticker' if present) and STOCK_FEATURE_COLUMNS
+        """
+        keys = self._keys(stock_df)
+        bars = stock_df.assign(Date=_to_day(stock_df["Date"]))
+        bars = bars.sort_values(keys, kind="stable").reset_index(drop=True)
+
+        close = bars["Close"].to_numpy(dtype="float64")
+        open_ = bars["Open"].to_numpy(dtype="float64")
+        volume = bars["Volume"].to_numpy(dtype="float64")
+
+        if "ticker" in keys:
+            ticker = bars["ticker"].to_numpy()
+            starts = np.r_[True, ticker[1:] != ticker[:-1]]
+        else:
+            starts = np.arange(len(bars)) == 0
+        ends = np.r_[starts[1:], True][:len(bars)]
+        # Position of every row within its ticker, to mask incomplete rolling windows
+        row = np.arange(len(bars))
+        position = row - np.maximum.accumulate(np.where(starts, row, 0)) if len(bars) else row
+
+        prev_close = np.where(starts, np.nan, np.r_[np.nan, close[:-1]])
+        next_close = np.where(ends, np.nan, np.r_[close[1:], np.nan])
+        prev_volume = np.where(starts, np.nan, np.r_[np.nan, volume[:-1]])
+
+        volatility = bars["Close"].astype("float64").rolling(self.volatility_window).std().to_numpy()
+        volatility[position < self.volatility_window - 1] = np.nan
+
+        features = bars[keys].copy()
+        features["Intraday return"] = (close - open_) / open_
+        features["Next Day Return"] = (next_close - close) / close
+        features["Gap"] = (open_ - prev_close) / prev_close
+        features["Volatility 5 Day"] = volatility
+        features["Volume Change"] = volume / prev_volume - 1
+        logger.info(f"Computed stock features for {len(features)} bars")
+        return features
+
+    def build(self, news_df: DataFrame, stock_df: DataFrame, **news_columns) -> DataFrame:
+        """
+        Build the engineered features from scored articles and daily bars.
+
+        Args:
+            news_df: Scored articles (see news_features)
+            stock_df: Daily bars (see stock_features)
+            **news_columns: date_column / score_column overrides for news_features
+
+        Returns:
+            DataFrame with the news and stock features of the days present in both
+
+        Raises:
+            ValueError: If the session aligner cannot determine the bar interval
+        """
+        with metrics.timer("stage_seconds", stage="feature_engineering"):
+            if self.session_aligner is not None:
+                news_df = self.session_aligner.align(
+                    news_df, stock_df, timestamp_column=news_columns.get("date_column", "Date")
+                )
+                news_columns = {**news_columns, "date_column": "bar_date"}
+            news = self.news_features(news_df, **news_columns)
+            stock = self.stock_features(stock_df)
+
+            keys = ["ticker", "Date"] if "ticker" in news.columns and "ticker" in stock.columns else ["Date"]
+            features = news.merge(stock, on=keys, how="inner")
+        metrics.inc("rows_processed_total", len(news_df) + len(stock_df), stage="feature_engineering")
+        logger.info(f"Built {len(features)} rows of engineered features")
+        return features
+
+    def export_to_csv(self, features: DataFrame, upsert: bool = False) -> bool:
+        """
+        Export the engineered features to CSV.
+
+        Args:
+            features: DataFrame returned by build or OnlineFeatureEngine.features
+            upsert: If True, keep the rows of the existing file, replacing those of the
+                    (ticker, day)s in features, instead of rewriting it
+
+        Returns:
+            bool: True if export was successful
+
+        Raises:
+            IOError: If there's an issue writing to the output path
+        """
+        logger.info(f"Exporting engineered features to {self.output_path}")
+        try:
+            os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+            with metrics.timer("export_seconds", target="features", format="csv"):
+                output = features.assign(Date=features["Date"].dt.strftime("%Y-%m-%d"))
+                if upsert and os.path.isfile(self.output_path):
+                    keys = self._keys(output)
+                    existing = pd.read_csv(self.output_path)
+                    output = (pd.concat([existing, output], ignore_index=True)
+                              .drop_duplicates(subset=keys, keep="last")
+                              .sort_values(keys, kind="stable"))
+                output.to_csv(self.output_path, index=False, encoding="utf-8")
+            metrics.inc("rows_exported_total", len(output), target="features", format="csv")
+            logger.info("Successfully exported engineered features")
+            return True
+        except Exception as e:
+            logger.error(f"Error exporting engineered features: {e}")
+            raise IOError(f"Error exporting engineered features to {self.output_path}: {e}")
+
+    def run(self, news_df: DataFrame, stock_df: DataFrame, **news_columns) -> DataFrame:
+        """
+        Build the engineered features and write them to the output path.
+
+        Args:
+            news_df: Scored articles
+            stock_df: Daily bars
+            **news_columns: date_column / score_column overrides for news_features
+
+        Returns:
+            The engineered features
+        """
+        features = self.build(news_df, stock_df, **news_columns)
+        self.export_to_csv(features)
+        return features
+
+    @staticmethod
+    def _keys(df: DataFrame) -> List[str]:
+        """Group keys of a frame: 'ticker' (if present) and 'Date'."""
+        return ["ticker", "Date"] if "ticker" in df.columns else ["Date"]
+
+
+def _day_key(value) -> str:
+    """Convert a date or timestamp to its 'YYYY-MM-DD' day (UTC for aware values)."""
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return timestamp.strftime("%Y-%m-%d")
+
+
+class OnlineFeatureEngine:
+    """
+    Streaming counterpart of FeatureEngine that updates the features one record at a time.
+
+    Every (ticker, day) of news keeps a count, a running sum of the scores, the sum
+    of squared deviations (updated as in Welford's algorithm, which stays accurate
+    where a raw sum of squares would cancel) and the positive/negative counts. Every
+    ticker keeps its last bar and a rolling window of closes with its running mean
+    and squared deviations. An article or a bar is therefore applied in O(1), and
+    the features match a batch recompute with FeatureEngine.build.
+
+    Bars must arrive in date order per ticker. A bar for the latest day replaces that
+    bar (e.g. a refreshed, still forming bar) and older bars are ignored, so the full
+    downloaded period can be fed again after every download.
+
+    The state only keeps the days that can still change: those within retention_days
+    of a ticker's latest bar, and the bar before it. Older days are final; their
+    feature rows are handed out once by features() and then dropped, so the saved
+    state stays the same size however long the history grows. Articles for a
+    dropped day arrive too late and are ignored.
+    """
+
+    def __init__(
+            self,
+            positive_threshold: float = 0.05,
+            negative_threshold: float = -0.05,
+            volatility_window: int = 5,
+            retention_days: int = 7
+    ) -> None:
+        """
+        Initialize an empty state.
+
+        Args:
+            positive_threshold: Scores above this count as positive articles
+            negative_threshold: Scores below this count as negative articles
+            volatility_window: Number of bars in the close price volatility window
+            retention_days: Days before a ticker's latest bar whose news and bars are kept,
+                            i.e. how late an article may arrive and still be counted
+        """
+        self.positive_threshold = positive_threshold
+        self.negative_threshold = negative_threshold
+        self.volatility_window = volatility_window
+        self.retention_days = retention_days
+
+        # ticker -> day -> [count, sum, m2, n_positive, n_negative]
+        self._news: Dict[str, Dict[str, List[float]]] = {}
+        # ticker -> day -> stock feature values
+        self._stock_rows: Dict[str, Dict[str, Dict[str, float]]] = {}
+        # ticker -> rolling state after the latest bar, and the state before it
+        self._stock_state: Dict[str, Dict[str, Any]] = {}
+        self._previous_state: Dict[str, Optional[Dict[str, Any]]] = {}
+        # ticker -> first day still kept; earlier days are final
+        self._horizon: Dict[str, str] = {}
+        # Feature rows of the days dropped since the engine was created or loaded (not saved)
+        self._finalized: List[Dict[str, Any]] = []
+
+    def add_article(self, ticker: str, date, score: float) -> Optional[Dict[str, float]]:
+        """
+        Add one scored article to the news aggregates of its day.
+
+        Args:
+            ticker: Ticker the article is about
+            date: Publication date or timestamp
+            score: Compound sentiment score
+
+        Returns:
+            The updated news features of the day, or None if the day is already final
+        """
+        day = _day_key(date)
+        if day < self._horizon.get(ticker, ""):
+            logger.warning(f"Ignoring a {ticker} article of {day}: days before {self._horizon[ticker]} are final")
+            metrics.inc("online_features_late_articles_total")
+            return None
+        stats = self._news.setdefault(ticker, {}).setdefault(day, [0, 0.0, 0.0, 0, 0])
+
+        count = stats[0] + 1
+        old_mean = stats[1] / stats[0] if stats[0] else 0.0
+        new_mean = (stats[1] + score) / count
+        stats[0] = count
+        stats[1] += score
+        stats[2] += (score - old_mean) * (score - new_mean)
+        stats[3] += int(score > self.positive_threshold)
+        stats[4] += int(score < self.negative_threshold)
+        return self._news_row(stats)
+
+    def add_bar(self, ticker: str, date, open_: float, close: float, volume: float) -> Optional[Dict[str, float]]:
+        """
+        Add one daily bar and update the stock features.
+
+        The bar also completes the 'Next Day Return' of the previous bar.
+
+        Args:
+            ticker: Ticker symbol
+            date: Day of the bar
+            open_: Open price
+            close: Close price
+            volume: Traded volume
+
+        Returns:
+            The stock features of the bar, or None if the bar is older than the latest bar
+        """
+        day = _day_key(date)
+        state = self._stock_state.get(ticker)
+        if state is not None and day < state["day"]:
+            return None
+        if state is not None and day == state["day"]:
+            state = self._previous_state[ticker]
+
+        window: List[float] = list(state["window"]) if state else []
+        count, mean, m2 = (state["count"], state["mean"], state["m2"]) if state else (0, 0.0, 0.0)
+
+        # Slide the close window: remove the oldest close, then add the new one
+        if count == self.volatility_window:
+            oldest = window.pop(0)
+            count -= 1
+            if count:
+                delta = oldest - mean
+                mean -= delta / count
+                m2 -= delta * (oldest - mean)
+            else:
+                mean, m2 = 0.0, 0.0
+        window.append(close)
+        count += 1
+        delta = close - mean
+        mean += delta / count
+        m2 += delta * (close - mean)
+
+        last_close = state["close"] if state else np.nan
+        last_volume = state["volume"] if state else np.nan
+        row = {
+            "Intraday return": (close - open_) / open_,
+            "Next Day Return": np.nan,
+            "Gap": (open_ - last_close) / last_close,
+            "Volatility 5 Day": float(np.sqrt(max(m2, 0.0) / (count - 1)))
+            if count == self.volatility_window else np.nan,
+            "Volume Change": volume / last_volume - 1,
+        }
+
+        rows = self._stock_rows.setdefault(ticker, {})
+        if state is not None:
+            rows[state["day"]]["Next Day Return"] = (close - last_close) / last_close
+        rows[day] = row
+
+        self._previous_state[ticker] = state
+        self._stock_state[ticker] = {
+            "day": day, "close": close, "volume": volume,
+            "window": window, "count": count, "mean": mean, "m2": m2,
+        }
+        self._drop_final_days(ticker)
+        return row
+
+    def add_articles(
+            self,
+            news_df: DataFrame,
+            date_column: str = "Date",
+            score_column: str = "Sentiment Score",
+            ticker: Optional[str] = None
+    ) -> None:
+        """
+        Add every article of a frame (see add_article).
+
+        Args:
+            news_df: Scored articles
+            date_column: Column holding the publication date
+            score_column: Column holding the compound sentiment score
+            ticker: Ticker of a frame without a 'ticker' column
+        """
+        tickers = news_df["ticker"] if "ticker" in news_df.columns else [ticker] * len(news_df)
+        for row_ticker, date, score in zip(tickers, news_df[date_column], news_df[score_column]):
+            self.add_article(row_ticker, date, float(score))
+
+    def add_bars(self, stock_df: DataFrame, ticker: Optional[str] = None) -> None:
+        """
+        Add every bar of a frame in date order (see add_bar).
+
+        Args:
+            stock_df: Daily bars with 'Date', 'Open', 'Close' and 'Volume' columns
+            ticker: Ticker of a frame without a 'ticker' column
+        """
+        bars = stock_df if "ticker" in stock_df.columns else stock_df.assign(ticker=ticker)
+        bars = bars.assign(_day=_to_day(bars["Date"])).sort_values(["ticker", "_day"], kind="stable")
+        for row in bars[["ticker", "_day", "Open", "Close", "Volume"]].itertuples(index=False):
+            self.add_bar(row[0], row[1], float(row[2]), float(row[3]), float(row[4]))
+
+    def features(self) -> DataFrame:
+        """
+        Get the features of every kept (ticker, day) with both news and a bar.
+
+        The rows of the days that became final since the engine was created or loaded
+        are included too; they are not saved, so write every result with
+        FeatureEngine.export_to_csv(upsert=True) to keep them.
+
+        Returns:
+            DataFrame with the columns of FeatureEngine.build for frames with a ticker
+        """
+        records = list(self._finalized)
+        for ticker, days in self._news.items():
+            stock_rows = self._stock_rows.get(ticker, {})
+            for day, stats in days.items():
+                if day in stock_rows:
+                    records.append({"ticker": ticker, "Date": day, **self._news_row(stats), **stock_rows[day]})
+
+        columns = ["ticker", "Date"] + NEWS_FEATURE_COLUMNS + STOCK_FEATURE_COLUMNS
+        features = pd.DataFrame.from_records(records, columns=columns)
+        features["Date"] = pd.to_datetime(features["Date"])
+        return features.sort_values(["ticker", "Date"]).reset_index(drop=True)
+
+    def save(self, path: str = "./data/state/online_features.json") -> None:
+        """
+        Save the state atomically so the next run can continue from it.
+
+        Args:
+            path: Path of the JSON state file
+        """
+        state = {
+            "positive_threshold": self.positive_threshold,
+            "negative_threshold": self.negative_threshold,
+            "volatility_window": self.volatility_window,
+            "retention_days": self.retention_days,
+            "horizon": self._horizon,
+            "news": self._news,
+            "stock_rows": self._stock_rows,
+            "stock_state": self._stock_state,
+            "previous_state": self._previous_state,
+        }
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved online feature state to {path}")
+
+    @classmethod
+    def load(cls, path: str = "./data/state/online_features.json") -> "OnlineFeatureEngine":
+        """
+        Load a state saved with save.
+
+        Args:
+            path: Path of the JSON state file
+
+        Returns:
+            The restored engine
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+
+        engine = cls(state["positive_threshold"], state["negative_threshold"], state["volatility_window"],
+                     state.get("retention_days", 7))
+        engine._horizon = state.get("horizon", {})
+        engine._news = state["news"]
+        engine._stock_rows = state["stock_rows"]
+        engine._stock_state = state["stock_state"]
+        engine._previous_state = state["previous_state"]
+        logger.info(f"Loaded online feature state from {path}")
+        return engine
+
+    def _drop_final_days(self, ticker: str) -> None:
+        """
+        Move the days of a ticker that can no longer change out of the state.
+
+        A day is final when it lies more than retention_days before the latest bar
+        and before the previous bar, whose 'Next Day Return' the latest bar may still
+        update. Final days with news and a bar become rows of features().
+        """
+        latest = self._stock_state[ticker]["day"]
+        previous = self._previous_state[ticker]
+        horizon = (pd.Timestamp(latest) - pd.Timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        if previous is not None:
+            horizon = min(horizon, previous["day"])
+        if horizon <= self._horizon.get(ticker, ""):
+            return
+        self._horizon[ticker] = horizon
+
+        news = self._news.get(ticker, {})
+        stock_rows = self._stock_rows[ticker]
+        for day in sorted(d for d in news if d < horizon):
+            stats = news.pop(day)
+            if day in stock_rows:
+                self._finalized.append({"ticker": ticker, "Date": day, **self._news_row(stats), **stock_rows[day]})
+        for day in [d for d in stock_rows if d < horizon]:
+            del stock_rows[day]
+
+    def _news_row(self, stats: List[float]) -> Dict[str, float]:
+        """News features of one day from its running statistics."""
+        count, total, m2, n_positive, n_negative = stats
+        return {
+            "avg_sentiment": total / count,
+            "n_positive": int(n_positive),
+            "n_negative": int(n_negative),
+            "total_articles": int(count),
+            "Sentiment_std": float(np.sqrt(max(m2, 0.0) / (count - 1))) if count > 1 else np.nan,
+            "n_news": int(count),
+            "polarity_ratio": n_positive / (n_positive + n_negative + 1e-5),
+        }
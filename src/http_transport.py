@@ -0,0 +1,226 @@
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class HttpTransport:
+    """
+    Shared HTTP session with connection pooling, keep-alive and retry/backoff.
+
+    One transport is meant to be reused for every request a client makes, so TCP and
+    TLS connections are kept alive between calls instead of being reopened each time.
+    Responses with a retryable status (429 and 5xx) and transient network errors are
+    retried with exponential backoff and jitter; a ``Retry-After`` header, when
+    present, takes precedence over the computed delay.
+
+    Every attempt is recorded in the ``http_request_seconds`` histogram and the
+    downloaded bytes in ``http_bytes_downloaded_total``, both labelled by host;
+    the bytes of a streamed body are counted by ``read_body`` as they are read.
+    """
+
+    RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+            self,
+            pool_size: int = 10,
+            max_retries: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 60.0,
+            timeout: float = 10.0,
+            headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Initialize the transport.
+
+        Args:
+            pool_size: Maximum number of pooled connections kept per host
+            max_retries: Number of retries after the first attempt
+            backoff_factor: Base delay in seconds; attempt n waits backoff_factor * 2 ** n
+            max_backoff: Upper bound in seconds for any single wait, including Retry-After
+            timeout: Default request timeout in seconds
+            headers: Optional headers sent with every request
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        if headers:
+            self._session.headers.update(headers)
+
+        logger.debug(f"HttpTransport initialized with pool_size={pool_size}, max_retries={max_retries}")
+
+    def get(
+            self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None,
+            retries: Optional[int] = None,
+            stream: bool = False
+    ) -> Response:
+        """
+        Send a GET request, retrying transient failures.
+
+        The final response is returned even if its status is an error, so callers
+        keep using ``raise_for_status`` and their own status handling.
+
+        Args:
+            url: URL to request
+            params: Optional query parameters
+            headers: Optional per-request headers
+            timeout: Request timeout in seconds (defaults to the transport timeout)
+            retries: Override for the number of retries of this request
+            stream: Whether to defer downloading the response body
+
+        Returns:
+            Response: The last HTTP response received
+
+        Raises:
+            requests.RequestException: If the request still fails after all retries
+        """
+        max_retries = self.max_retries if retries is None else retries
+        host = urlparse(url).netloc.lower()
+        attempt = 0
+
+        while True:
+            start = time.perf_counter()
+            try:
+                response = self._session.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout or self.timeout,
+                    stream=stream
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.observe("http_request_seconds", time.perf_counter() - start, host=host)
+                metrics.inc("http_requests_total", host=host, status="error")
+                if attempt >= max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                logger.warning(f"Request to {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                self._record_response(host, response, time.perf_counter() - start, stream)
+                if response.status_code not in self.RETRY_STATUS_CODES or attempt >= max_retries:
+                    return response
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                logger.warning(f"Request to {url} returned {response.status_code}, retrying in {delay:.1f}s")
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def read_body(self, response: Response, max_bytes: Optional[int] = None,
+                  chunk_size: int = 64 * 1024) -> Tuple[bytes, bool]:
+        """
+        Read the body of a streamed response, stopping after max_bytes.
+
+        The response is closed afterwards, so a capped connection is not returned
+        to the pool with unread data.
+
+        Args:
+            response: Response of a ``get(..., stream=True)`` call
+            max_bytes: Maximum number of bytes to keep (None reads everything)
+            chunk_size: Size of the chunks read from the connection
+
+        Returns:
+            The body (at most max_bytes long) and whether it was truncated
+        """
+        chunks = []
+        size = 0
+        truncated = False
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                chunks.append(chunk)
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    truncated = True
+                    break
+        finally:
+            response.close()
+
+        metrics.inc("http_bytes_downloaded_total", size, host=urlparse(response.url).netloc.lower())
+        body = b"".join(chunks)
+        return (body[:max_bytes], truncated) if truncated else (body, False)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._session.close()
+
+    @staticmethod
+    def _record_response(host: str, response: Response, seconds: float, stream: bool) -> None:
+        """
+        Record the latency, status and size of a response.
+
+        Streamed bodies are not read here; read_body counts their bytes instead.
+
+        Args:
+            host: Host the request was sent to
+            response: The HTTP response
+            seconds: Time until the response (and, unless streamed, its body) arrived
+            stream: Whether the body download was deferred
+        """
+        metrics.observe("http_request_seconds", seconds, host=host)
+        metrics.inc("http_requests_total", host=host, status=response.status_code)
+        if not stream:
+            metrics.inc("http_bytes_downloaded_total", len(response.content), host=host)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """
+        Calculate the exponential backoff delay for a retry attempt.
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed
+
+        Returns:
+            Delay in seconds, with up to 10% jitter to avoid synchronized retries
+        """
+        delay = min(self.backoff_factor * (2 ** attempt), self.max_backoff)
+        return delay + random.uniform(0, delay * 0.1)
+
+    def _retry_after_delay(self, response: Response) -> Optional[float]:
+        """
+        Parse the Retry-After header of a response.
+
+        Args:
+            response: The HTTP response to inspect
+
+        Returns:
+            Delay in seconds, or None if the header is missing or malformed
+        """
+        retry_after = response.headers.get("Retry-After")
+        if not retry_after:
+            return None
+
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                logger.debug(f"Ignoring malformed Retry-After header: {retry_after}")
+                return None
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+            delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+        return min(max(delay, 0.0), self.max_backoff)
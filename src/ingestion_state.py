@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def parse_published_at(value: str) -> datetime:
+    """
+    Parse a News API 'publishedAt' timestamp into an aware UTC datetime.
+
+    Args:
+        value: ISO 8601 timestamp such as '2025-05-08T15:28:17Z'
+
+    Returns:
+        The timestamp as a timezone-aware datetime in UTC
+    """
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+class WatermarkStore:
+    """
+    Persists, per news query, the latest 'publishedAt' that has already been ingested.
+
+    Watermarks are kept in a small JSON file as UTC timestamps in the
+    'YYYY-MM-DDTHH:MM:SS' form accepted by the News API 'from' parameter.
+    """
+
+    def __init__(self, path: str = "./data/state/watermarks.json") -> None:
+        """
+        Initialize the store and load existing watermarks.
+
+        Args:
+            path: Path of the JSON file holding the watermarks
+        """
+        self.path = path
+        self._watermarks: Dict[str, str] = {}
+
+        if os.path.isfile(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._watermarks = json.load(f)
+            logger.info(f"Loaded {len(self._watermarks)} watermarks from {self.path}")
+
+    def get(self, query_key: str) -> Optional[str]:
+        """
+        Get the watermark of a query.
+
+        Args:
+            query_key: Key identifying the query (see NewsApiClient.query_key)
+
+        Returns:
+            The latest ingested 'publishedAt', or None if the query was never ingested
+        """
+        return self._watermarks.get(query_key)
+
+    def advance(self, query_key: str, articles: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Move the watermark of a query forward to the newest article given.
+
+        The watermark never moves backwards, so replaying an older batch is harmless.
+
+        Args:
+            query_key: Key identifying the query
+            articles: Newly ingested articles with a 'publishedAt' field
+
+        Returns:
+            The watermark after the update
+        """
+        timestamps = [parse_published_at(a["publishedAt"]) for a in articles if a.get("publishedAt")]
+        if not timestamps:
+            return self.get(query_key)
+
+        newest = max(timestamps).strftime("%Y-%m-%dT%H:%M:%S")
+        current = self.get(query_key)
+        if current is None or newest > current:
+            self._watermarks[query_key] = newest
+            self._save()
+            logger.info(f"Watermark for '{query_key}' advanced to {newest}")
+        return self.get(query_key)
+
+    def _save(self) -> None:
+        """Write the watermarks atomically so an interrupted run cannot corrupt them."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._watermarks, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self.path)
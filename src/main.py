@@ -1,36 +1,5 @@
-from news_api import NewsApiClient
-from src.news_data_handler import NewsDataHandler
-from src.sentiment_analysis import NewsSentimentAnalyzer
-from src.stock_data_handler import StockDataHandler
-from src.yahoo_finance import YahooFinanceClient
+"""Run the whole pipeline with the default settings (same as ``python -m src all``)."""
+from src.cli import main
 
-articles_from_newsAPI = NewsApiClient(
-    search_query="apple",
-    categories="tech",
-    search_days=30,
-)
-
-news_data_handler = NewsDataHandler()
-
-articles = articles_from_newsAPI.extract_full_articles()
-raw_articles = news_data_handler.save_raw_data(articles)
-processed_articles = news_data_handler.process_raw_data(raw_articles)
-news_data_handler.export_articles(processed_articles)
-
-
-news_sentiment_analyzer = NewsSentimentAnalyzer()
-
-news_sentiment_analysis = news_sentiment_analyzer.calculate_articles_sentiment(processed_articles)
-news_sentiment_analyzer.export_to_csv(news_data=news_sentiment_analysis)
-
-
-stock_data_from_yahoo = YahooFinanceClient(
-    stock_symbol="AAPL",
-    period="1mo",
-    interval="1d"
-)
-
-stock_data_handler = StockDataHandler()
-
-stocks = stock_data_from_yahoo.fetch_stock_data()
-stock_data_handler.export_to_all_formats(stocks)
+if __name__ == "__main__":
+    raise SystemExit(main(["all"]))
@@ -0,0 +1,263 @@
+import logging
+from dataclasses import dataclass
+from datetime import time
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ExchangeHours:
+    """
+    Regular trading session of an exchange.
+
+    Attributes:
+        timezone: IANA time zone of the exchange, e.g. 'America/New_York'
+        open: Local time the session opens
+        close: Local time the session closes
+    """
+
+    timezone: str
+    open: time
+    close: time
+
+
+# Regular sessions by MIC; holidays need no calendar, as no bars exist for them
+EXCHANGE_HOURS: Dict[str, ExchangeHours] = {
+    "XNYS": ExchangeHours("America/New_York", time(9, 30), time(16, 0)),
+    "XNAS": ExchangeHours("America/New_York", time(9, 30), time(16, 0)),
+    "XTSE": ExchangeHours("America/Toronto", time(9, 30), time(16, 0)),
+    "XLON": ExchangeHours("Europe/London", time(8, 0), time(16, 30)),
+    "XETR": ExchangeHours("Europe/Berlin", time(9, 0), time(17, 30)),
+    "XPAR": ExchangeHours("Europe/Paris", time(9, 0), time(17, 30)),
+    "XAMS": ExchangeHours("Europe/Amsterdam", time(9, 0), time(17, 30)),
+    "XSWX": ExchangeHours("Europe/Zurich", time(9, 0), time(17, 30)),
+    "XTKS": ExchangeHours("Asia/Tokyo", time(9, 0), time(15, 30)),
+    "XHKG": ExchangeHours("Asia/Hong_Kong", time(9, 30), time(16, 0)),
+    "XASX": ExchangeHours("Australia/Sydney", time(10, 0), time(16, 0)),
+}
+
+# Yahoo Finance ticker suffix -> MIC; tickers without a listed suffix use the default exchange
+TICKER_SUFFIX_EXCHANGES: Dict[str, str] = {
+    "TO": "XTSE",
+    "L": "XLON",
+    "DE": "XETR",
+    "PA": "XPAR",
+    "AS": "XAMS",
+    "SW": "XSWX",
+    "T": "XTKS",
+    "HK": "XHKG",
+    "AX": "XASX",
+}
+
+SESSION_CUTOFFS = ("close", "open")
+
+
+def exchange_for_ticker(ticker: str, default: str = "XNYS") -> str:
+    """
+    Get the exchange of a Yahoo Finance ticker from its suffix, e.g. 'XLON' for 'VOD.L'.
+
+    Args:
+        ticker: Ticker symbol
+        default: Exchange of tickers without a known suffix
+
+    Returns:
+        MIC of the exchange
+    """
+    _, _, suffix = str(ticker).rpartition(".")
+    return TICKER_SUFFIX_EXCHANGES.get(suffix.upper(), default) if "." in str(ticker) else default
+
+
+def _offset(value: time) -> pd.Timedelta:
+    return pd.Timedelta(hours=value.hour, minutes=value.minute)
+
+
+class SessionAligner:
+    """
+    Assigns articles to the next tradable price bar of their ticker's exchange.
+
+    Every bar gets a UTC window from the exchange hours: a daily bar spans its
+    session's open to close in the exchange's time zone, an intraday bar spans its
+    interval (ending at the close at the latest). An article then belongs to the
+    first bar of its ticker that can still react to it:
+
+        cutoff='close'  the first bar ending after publication, so an article from
+                        the session counts for that session and one published after
+                        the close, over a weekend or on a holiday for the next one
+        cutoff='open'   the first bar starting at or after publication, so only
+                        news known before a bar opens is assigned to it
+
+    The assignment is one sorted as-of merge by ticker over the bar windows, so
+    its cost grows with the number of articles and bars, never their product,
+    and minute bars of many tickers are no different from daily bars. Sessions
+    are taken from the bars themselves, so holidays and missing bars need no
+    calendar; early closes are treated as regular sessions.
+    """
+
+    def __init__(
+            self,
+            exchange: str = "XNYS",
+            cutoff: str = "close",
+            bar_timezone: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the aligner.
+
+        Args:
+            exchange: MIC of the exchange of tickers without a known suffix (see EXCHANGE_HOURS)
+            cutoff: 'close' or 'open', see the class description
+            bar_timezone: Time zone of naive intraday bar timestamps (defaults to the
+                          exchange's). Naive daily bars are always exchange-local days
+
+        Raises:
+            ValueError: If the exchange or cutoff is unknown
+        """
+        if exchange not in EXCHANGE_HOURS:
+            raise ValueError(f"Unknown exchange: {exchange}. Must be one of {tuple(EXCHANGE_HOURS)}")
+        if cutoff not in SESSION_CUTOFFS:
+            raise ValueError(f"Unknown session cutoff: {cutoff}. Must be one of {SESSION_CUTOFFS}")
+        self.exchange = exchange
+        self.cutoff = cutoff
+        self.bar_timezone = bar_timezone
+
+    def align(
+            self,
+            news_df: DataFrame,
+            bars_df: DataFrame,
+            timestamp_column: str = "publishedAt",
+            output_column: str = "bar_date",
+            interval: Optional[str] = None
+    ) -> DataFrame:
+        """
+        Add the 'Date' of the bar every article is assigned to.
+
+        Args:
+            news_df: Articles with a publication timestamp column (naive values are UTC),
+                     and a 'ticker' column if bars_df has several tickers
+            bars_df: Long-format bars with 'Date' (and 'ticker') columns (see to_long_format)
+            timestamp_column: Column holding the publication timestamps
+            output_column: Column receiving the bar 'Date' of every article; NaT for
+                           articles after the last bar of their ticker
+            interval: Bar interval, e.g. '1d', '1h' or '5m'. Inferred from the bars if None
+
+        Returns:
+            A shallow copy of news_df with the output column
+
+        Raises:
+            ValueError: If the interval is not supported
+        """
+        by = ["ticker"] if "ticker" in news_df.columns and "ticker" in bars_df.columns else []
+        edge = "_start" if self.cutoff == "open" else "_end"
+
+        windows = self.bar_windows(bars_df, interval=interval)
+        windows = windows.dropna(subset=[edge]).sort_values(edge, kind="stable")
+
+        published = pd.to_datetime(news_df[timestamp_column], utc=True)
+        articles = pd.DataFrame({"_published": published.to_numpy(), "_row": np.arange(len(news_df))})
+        if by:
+            articles["ticker"] = news_df["ticker"].astype(str).to_numpy()
+        articles = articles.dropna(subset=["_published"]).sort_values("_published", kind="stable")
+
+        merged = pd.merge_asof(
+            articles,
+            windows[by + [edge, "_bar"]],
+            left_on="_published",
+            right_on=edge,
+            by=by or None,
+            direction="forward",
+            # An article at the close is after the session; one at the open is known before it
+            allow_exact_matches=self.cutoff == "open",
+        )
+
+        bar_dates = merged.set_index("_row")["_bar"].reindex(np.arange(len(news_df)))
+        bar_dates.index = news_df.index
+        aligned = news_df.copy(deep=False)
+        aligned[output_column] = bar_dates
+
+        unassigned = int(aligned[output_column].isna().sum())
+        if unassigned:
+            logger.info(f"{unassigned} of {len(aligned)} articles have no later bar to be assigned to")
+        logger.info(f"Aligned {len(aligned) - unassigned} articles to {len(windows)} bars "
+                    f"at the session {self.cutoff}")
+        return aligned
+
+    def bar_windows(self, bars_df: DataFrame, interval: Optional[str] = None) -> DataFrame:
+        """
+        Get the UTC window of every bar.
+
+        Args:
+            bars_df: Long-format bars with 'Date' (and 'ticker') columns
+            interval: Bar interval, e.g. '1d', '1h' or '5m'. Inferred from the bars if None
+
+        Returns:
+            DataFrame with the bars' 'ticker' (if present), '_bar' (the original 'Date'),
+            '_start' and '_end' (UTC) columns, in the order of bars_df
+
+        Raises:
+            ValueError: If the interval is not supported
+        """
+        dates = pd.to_datetime(bars_df["Date"])
+        tickers = bars_df["ticker"].astype(str) if "ticker" in bars_df.columns else None
+        step = self._interval(dates, tickers, interval)
+
+        windows = pd.DataFrame({"_bar": bars_df["Date"].to_numpy()}, index=bars_df.index)
+        if tickers is not None:
+            windows["ticker"] = tickers
+        windows["_start"] = pd.Series(pd.NaT, index=bars_df.index, dtype="datetime64[ns, UTC]")
+        windows["_end"] = pd.Series(pd.NaT, index=bars_df.index, dtype="datetime64[ns, UTC]")
+
+        exchanges = (tickers.map(lambda t: exchange_for_ticker(t, self.exchange)) if tickers is not None
+                     else pd.Series(self.exchange, index=bars_df.index))
+        for exchange, rows in exchanges.groupby(exchanges).groups.items():
+            hours = EXCHANGE_HOURS[exchange]
+            bar_dates = dates.loc[rows]
+            if step is None:
+                # A daily bar is labelled with its session's day, whatever time zone the label has
+                local = None
+                day = (bar_dates.dt.tz_localize(None) if bar_dates.dt.tz is not None else bar_dates).dt.normalize()
+            else:
+                local = (bar_dates.dt.tz_convert(hours.timezone) if bar_dates.dt.tz is not None
+                         else bar_dates.dt.tz_localize(self.bar_timezone or hours.timezone)
+                         .dt.tz_convert(hours.timezone))
+                day = local.dt.tz_localize(None).dt.normalize()
+
+            session_open = (day + _offset(hours.open)).dt.tz_localize(hours.timezone)
+            session_close = (day + _offset(hours.close)).dt.tz_localize(hours.timezone)
+            if local is None:
+                start, end = session_open, session_close
+            else:
+                # The last bar of a session ends at the close; extended-hours bars keep their interval
+                start, end = local, local + step
+                end = end.where((end <= session_close) | (local >= session_close), session_close)
+            windows.loc[rows, "_start"] = start.dt.tz_convert("UTC")
+            windows.loc[rows, "_end"] = end.dt.tz_convert("UTC")
+        return windows
+
+    @staticmethod
+    def _interval(dates: pd.Series, tickers: Optional[pd.Series], interval: Optional[str]) -> Optional[pd.Timedelta]:
+        """
+        Length of an intraday bar, or None for daily bars.
+
+        Raises:
+            ValueError: If the interval is not supported
+        """
+        if interval is not None:
+            try:
+                step = pd.Timedelta(interval)
+            except ValueError:
+                raise ValueError(f"Unsupported bar interval: {interval}")
+            return None if step >= pd.Timedelta(days=1) else step
+
+        naive = dates.dt.tz_localize(None) if dates.dt.tz is not None else dates
+        if naive.empty or (naive == naive.dt.normalize()).all():
+            return None
+        # Smallest gap between consecutive bars of a ticker
+        gaps = dates.groupby(tickers).diff() if tickers is not None else dates.diff()
+        gaps = gaps[gaps > pd.Timedelta(0)]
+        if gaps.empty:
+            raise ValueError("Cannot infer the interval of intraday bars from a single bar; pass interval")
+        return gaps.min()
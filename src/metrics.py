@@ -0,0 +1,313 @@
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Unix only; the peak RSS gauge is not recorded elsewhere (e.g. on Windows)
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the default histogram buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets, with count, sum, min and max."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile as the upper bound of the bucket it falls into.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            The estimate (capped at the largest observed value), or None without observations
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.bucket_counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, gauges and histograms with labels.
+
+    Modules record into the process-wide ``metrics`` instance, much like they log
+    through their module logger; the CLI prints a summary at the end of a run and
+    can write everything as JSON or in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Increase a counter.
+
+        Args:
+            name: Counter name, e.g. 'http_bytes_downloaded_total'
+            value: Amount to add
+            **labels: Label values, e.g. host='example.com'
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_max(self, name: str, value: float, **labels) -> None:
+        """
+        Raise a gauge to value if it is higher than the current value (e.g. a peak).
+
+        Args:
+            name: Gauge name
+            value: Observed value
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._gauges.setdefault(name, {})
+            series[key] = max(series.get(key, value), value)
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """
+        Record a value in a histogram.
+
+        Args:
+            name: Histogram name, e.g. 'http_request_seconds'
+            value: Observed value
+            **labels: Label values
+        """
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            series.setdefault(key, Histogram()).observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """
+        Time a block into a histogram, also when it raises.
+
+        Args:
+            name: Histogram name
+            **labels: Label values
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_peak_memory(self) -> Optional[int]:
+        """
+        Record the peak resident set size of the process so far.
+
+        Returns:
+            Peak RSS in bytes, or None if the platform has no resource module
+        """
+        if resource is None:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+        peak_bytes = peak if sys.platform == "darwin" else peak * 1024
+        self.set_max("process_peak_rss_bytes", peak_bytes)
+        return peak_bytes
+
+    def counter_value(self, name: str, **labels) -> float:
+        """
+        Get the sum of a counter over the series matching the given labels.
+
+        Args:
+            name: Counter name
+            **labels: Label values the series must have
+
+        Returns:
+            The summed value (0 if there is none)
+        """
+        wanted = set(_label_key(labels))
+        with self._lock:
+            return sum(value for key, value in self._counters.get(name, {}).items() if wanted <= set(key))
+
+    def reset(self) -> None:
+        """Remove every metric."""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, object]]]:
+        """
+        Get every metric as plain data.
+
+        Returns:
+            Dict with 'counters', 'gauges' and 'histograms' lists of {name, labels, ...} entries
+        """
+        with self._lock:
+            return {
+                "counters": [{"name": name, "labels": dict(key), "value": value}
+                             for name, series in sorted(self._counters.items())
+                             for key, value in sorted(series.items())],
+                "gauges": [{"name": name, "labels": dict(key), "value": value}
+                           for name, series in sorted(self._gauges.items())
+                           for key, value in sorted(series.items())],
+                "histograms": [{"name": name, "labels": dict(key), **histogram.to_dict()}
+                               for name, series in sorted(self._histograms.items())
+                               for key, histogram in sorted(series.items())],
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            The metrics as text
+        """
+        def labels_text(labels: Dict[str, object], extra: Optional[Dict[str, str]] = None) -> str:
+            items = {**labels, **(extra or {})}
+            if not items:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in items.values())
+            return "{" + ",".join(f'{k}="{v}"' for k, v in zip(items, escaped)) + "}"
+
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        for kind, prom_type in (("counters", "counter"), ("gauges", "gauge")):
+            seen = set()
+            for entry in snapshot[kind]:
+                if entry["name"] not in seen:
+                    lines.append(f"# TYPE {entry['name']} {prom_type}")
+                    seen.add(entry["name"])
+                lines.append(f"{entry['name']}{labels_text(entry['labels'])} {entry['value']}")
+
+        seen = set()
+        for entry in snapshot["histograms"]:
+            name = entry["name"]
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            cumulative = 0
+            for bound, bucket_count in entry["buckets"].items():
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{labels_text(entry['labels'], {'le': bound})} {cumulative}")
+            lines.append(f"{name}_sum{labels_text(entry['labels'])} {entry['sum']}")
+            lines.append(f"{name}_count{labels_text(entry['labels'])} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """
+        Write every metric to a file: JSON for a '.json' path, Prometheus text otherwise.
+
+        Args:
+            path: Output file
+
+        Raises:
+            IOError: If the file cannot be written
+        """
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                if path.endswith(".json"):
+                    json.dump(self.snapshot(), f, indent=2)
+                else:
+                    f.write(self.to_prometheus())
+            logger.info(f"Wrote metrics to {path}")
+        except Exception as e:
+            logger.error(f"Error writing metrics: {e}")
+            raise IOError(f"Error writing metrics to {path}: {e}")
+
+    def summary(self) -> str:
+        """
+        Summarize the run: time per histogram, per-host fetch latency and bytes,
+        cache hit rates, rows processed and peak memory.
+
+        Returns:
+            Multi-line human readable summary
+        """
+        snapshot = self.snapshot()
+        lines = ["Run summary:"]
+
+        for entry in snapshot["histograms"]:
+            if entry["name"] == "http_request_seconds":
+                continue
+            labels = ",".join(f"{k}={v}" for k, v in entry["labels"].items())
+            lines.append(f"  {entry['name']}{f'[{labels}]' if labels else ''}: {entry['count']} x, "
+                         f"total {entry['sum']:.3f}s, p50 {entry['p50']:.3f}s, p95 {entry['p95']:.3f}s")
+
+        hosts = [e for e in snapshot["histograms"] if e["name"] == "http_request_seconds"]
+        for entry in sorted(hosts, key=lambda e: -e["sum"]):
+            host = entry["labels"].get("host", "")
+            downloaded = self.counter_value("http_bytes_downloaded_total", host=host)
+            lines.append(f"  fetch {host}: {entry['count']} requests, p50 {entry['p50']:.3f}s, "
+                         f"p95 {entry['p95']:.3f}s, {downloaded / 2 ** 20:.2f} MiB")
+
+        for cache, hit_results in (("article_cache_lookups_total", ("hit", "revalidated")),
+                                   ("price_store_lookups_total", ("hit",)),
+                                   ("pipeline_stages_total", ("skipped",)),
+                                   ("sentiment_texts_total", ("memo", "canonical", "batch_duplicate"))):
+            total = self.counter_value(cache)
+            if total:
+                hits = sum(self.counter_value(cache, result=result) for result in hit_results)
+                lines.append(f"  {cache}: {hits:.0f}/{total:.0f} served without work ({hits / total:.0%})")
+
+        for entry in snapshot["counters"]:
+            if entry["name"] == "rows_processed_total":
+                lines.append(f"  rows {entry['labels'].get('stage', '')}: {entry['value']:.0f}")
+
+        peak = self.record_peak_memory()
+        if peak is not None:
+            lines.append(f"  peak RSS: {peak / 2 ** 20:.1f} MiB")
+        return "\n".join(lines)
+
+
+# Process-wide registry used by every module
+metrics = MetricsRegistry()
@@ -1,18 +1,27 @@
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, Executor, Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from datetime import datetime, timedelta
-from typing import Dict, Any, Union, Optional, List
-from readability import Document
-from lxml import html
+from typing import Callable, Deque, Dict, Any, Union, Optional, List, Iterable, Iterator, Tuple
+from urllib.parse import urlparse
 import logging
 import requests
 from dotenv import load_dotenv
 import os
 from requests import Response
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from src.article_cache import ArticleCache, normalize_url
+from src.article_extraction import (
+    EXTRACTION_ERROR_PREFIX, ArticleExtractor, ExtractionPool, charset_from_content_type
 )
+from src.deduplication import ExactDuplicateFilter
+from src.http_transport import HttpTransport
+from src.metrics import metrics
+from src.rate_limiter import TokenBucket
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +30,16 @@ class NewsApiError(Exception):
     pass
 
 
+class NewsApiResultLimitError(NewsApiError):
+    """Raised when a page lies beyond the number of results the API plan may return."""
+    pass
+
+
+class NewsApiRateLimitError(NewsApiError):
+    """Raised when the API answers 429 or the request quota of the rate limiter is used up."""
+    pass
+
+
 class NewsApiClient:
     """Client for fetching news articles from the News API."""
 
@@ -30,7 +49,15 @@ class NewsApiClient:
             categories: Union[str, List[str]],
             search_days: int,
             api_key: Optional[str] = None,
-            log_level: int = logging.INFO
+            log_level: int = logging.INFO,
+            page_size: int = 100,
+            max_pages: Optional[int] = None,
+            transport: Optional[HttpTransport] = None,
+            cache: Optional[ArticleCache] = None,
+            since: Optional[str] = None,
+            dedup: Optional[ExactDuplicateFilter] = None,
+            extractor: Optional[ArticleExtractor] = None,
+            rate_limiter: Optional[TokenBucket] = None
     ) -> None:
         """
         Initialize the News API client.
@@ -41,6 +68,17 @@ class NewsApiClient:
             search_days: Number of days in the past to search for articles
             api_key: Optional API key. If not provided, will be loaded from environment
             log_level: Logging level (default: logging.INFO)
+            page_size: Number of articles requested per page (the API allows at most 100)
+            max_pages: Optional cap on the number of pages fetched per query
+            transport: Optional shared HTTP transport. A pooled, retrying one is created if omitted
+            cache: Optional on-disk cache of article pages consulted before each download
+            since: Optional watermark ('YYYY-MM-DDTHH:MM:SS', UTC). When it lies inside the
+                   search window, only articles published from that moment on are requested
+            dedup: Optional URL/title filter applied before any article page is downloaded
+            extractor: Optional article text extractor (byte cap, per-domain rules).
+                       A default ArticleExtractor is used if omitted
+            rate_limiter: Optional token bucket every API request takes a token from,
+                          shared by all clients drawing on the same quota
         """
         logger.info(f"Initializing NewsApiClient with query: '{search_query}'")
 
@@ -69,36 +107,89 @@ class NewsApiClient:
         self.start_date = self._get_start_date(search_days)
         self.language: str = "en"
 
+        # ISO 8601 strings sort chronologically, and a date sorts before any time on that day
+        if since and since > self.start_date:
+            logger.info(f"Incremental mode: requesting articles published since {since}")
+            self.start_date = since
+
+        if not 1 <= page_size <= 100:
+            raise ValueError("page_size must be between 1 and 100")
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._transport = transport or HttpTransport(pool_size=16)
+        self._cache = cache
+        self._dedup = dedup
+        self._extractor = extractor or ArticleExtractor()
+        self._rate_limiter = rate_limiter
+        # Whether the last pagination stopped before 'totalResults' (see iter_article_pages)
+        self.truncated = False
+
         logger.info(f"NewsApiClient initialized for date range: {self.start_date} to {self.end_date}")
 
-    def fetch_articles(self) -> Response:
+    @property
+    def query_key(self) -> str:
+        """Key identifying this query, e.g. for storing its ingestion watermark."""
+        return self.build_query_key(self.search_query, self.categories, self.language)
+
+    @staticmethod
+    def build_query_key(search_query: str, categories: Union[str, List[str]], language: str = "en") -> str:
+        """
+        Build the key identifying a query without creating a client.
+
+        Args:
+            search_query: The keyword to search for in news articles
+            categories: Category or list of categories to filter by
+            language: Article language
+
+        Returns:
+            Key of the form 'query|categories|language'
+        """
+        if isinstance(categories, list):
+            categories = ",".join(categories)
+        return f"{search_query}|{categories}|{language}"
+
+    def fetch_articles(self, page: int = 1) -> Response:
         """
-        Fetch news articles based on the configured parameters.
+        Fetch one page of news articles based on the configured parameters.
+
+        The request goes through the shared transport, so connections are reused and
+        429/5xx responses are retried with backoff before an error is raised.
+
+        Args:
+            page: 1-based page number to request
 
         Returns:
             Response: The HTTP response from the News API
 
         Raises:
             requests.RequestException: If there's a network error
+            NewsApiResultLimitError: If the page lies beyond the results the plan may access
+            NewsApiRateLimitError: If the API answers 429 or the rate limiter has no token in time
             NewsApiError: If the API returns an error
         """
-        url = (
-            f'{self.endpoint}'
-            f'?q={self.search_query}'
-            f'&categories={self.categories}'
-            f'&language={self.language}'
-            f'&from={self.start_date}'
-            f'&to={self.end_date}'
-            f'&apiKey={self._api_key}'
-        )
-
-        safe_url = url.replace(self._api_key, "API_KEY_REDACTED")
-        logger.debug(f"Making request to: {safe_url}")
+        params = {
+            "q": self.search_query,
+            "categories": self.categories,
+            "language": self.language,
+            "from": self.start_date,
+            "to": self.end_date,
+            "page": page,
+            "pageSize": self.page_size,
+        }
+        logger.debug(f"Making request to: {self.endpoint} with params {params}")
+
+        if self._rate_limiter is not None and not self._rate_limiter.acquire():
+            raise NewsApiRateLimitError("Request quota exhausted - try again later")
+        metrics.inc("news_api_requests_total")
 
         try:
-            response = requests.get(url)
+            response = self._transport.get(
+                self.endpoint,
+                params=params,
+                headers={"X-Api-Key": self._api_key}
+            )
             response.raise_for_status()
-            logger.info(f"API request successful: {response.status_code}")
+            logger.info(f"API request successful: {response.status_code} (page {page})")
             return response
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error occurred: {e}")
@@ -107,7 +198,11 @@ class NewsApiClient:
                 raise NewsApiError("Authentication failed - invalid API key") from e
             elif response.status_code == 429:
                 logger.error("Rate limit exceeded")
-                raise NewsApiError("Rate limit exceeded - try again later") from e
+                if self._rate_limiter is not None:
+                    self._rate_limiter.drain()
+                raise NewsApiRateLimitError("Rate limit exceeded - try again later") from e
+            elif self._error_code(response) == "maximumResultsReached":
+                raise NewsApiResultLimitError(f"Page {page} exceeds the results available to this plan") from e
             else:
                 logger.error(f"API error: {response.text}")
                 raise NewsApiError(f"API returned error {response.status_code}: {response.text}") from e
@@ -121,6 +216,22 @@ class NewsApiClient:
             logger.error(f"Request exception: {e}")
             raise NewsApiError(f"Request failed: {str(e)}") from e
 
+    @staticmethod
+    def _error_code(response: Response) -> Optional[str]:
+        """
+        Read the News API error code from an error response body.
+
+        Args:
+            response: The HTTP response to inspect
+
+        Returns:
+            The error code, or None if the body is not a News API error object
+        """
+        try:
+            return response.json().get("code")
+        except (ValueError, AttributeError):
+            return None
+
     def _get_start_date(self, days_from_now: int) -> str:
         """
         Calculate the start date for the search period.
@@ -147,9 +258,86 @@ class NewsApiClient:
         logger.debug(f"Calculated end date: {result}")
         return result
 
+    def iter_article_pages(self) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch articles page by page, yielding each page as soon as it arrives.
+
+        Pagination stops when a short or empty page is returned, when 'totalResults'
+        has been reached, when max_pages is hit, or when the API reports that the
+        plan's result limit has been reached. In the last two cases the older
+        results were not fetched (the API returns the newest first): 'truncated'
+        is then set, and the caller must not move its watermark past them.
+
+        Yields:
+            Dict[str, Any]: The parsed JSON response of each page
+
+        Raises:
+            NewsApiError: If the API request fails or returns an error
+        """
+        page = 1
+        fetched = 0
+        total_results = 0
+        oldest: Optional[str] = None
+        self.truncated = False
+
+        while True:
+            try:
+                data = self._get_page(page)
+            except NewsApiResultLimitError:
+                if page == 1:
+                    raise
+                logger.warning(f"Result limit reached after {page - 1} pages, stopping pagination")
+                self._mark_truncated(fetched, total_results, oldest)
+                return
+
+            articles = data.get("articles", [])
+            fetched += len(articles)
+            total_results = data.get("totalResults", 0)
+            published = [a["publishedAt"] for a in articles if a.get("publishedAt")]
+            if published:
+                oldest = min([oldest, *published] if oldest else published)
+            yield data
+
+            if len(articles) < self.page_size or fetched >= total_results:
+                return
+            if self.max_pages is not None and page >= self.max_pages:
+                self._mark_truncated(fetched, total_results, oldest)
+                return
+            page += 1
+
+    def _mark_truncated(self, fetched: int, total_results: int, oldest: Optional[str]) -> None:
+        """Record that pagination stopped early and log the publication window that was not fetched."""
+        self.truncated = True
+        metrics.inc("news_api_truncated_queries_total")
+        logger.warning(f"Fetched {fetched} of {total_results} results for '{self.search_query}': articles "
+                       f"published from {self.start_date} to {oldest or self.end_date} were not fetched")
+
     def get_articles(self) -> Dict[str, Any]:
         """
-        Fetch articles and return them as a dictionary.
+        Fetch all pages of articles and return them as a single dictionary.
+
+        Returns:
+            Dict[str, Any]: The parsed JSON response with the articles of every page
+
+        Raises:
+            NewsApiError: If the API request fails or returns an error
+        """
+        logger.info(f"Fetching articles for query: '{self.search_query}'")
+        result: Dict[str, Any] = {"status": "ok", "totalResults": 0, "articles": []}
+
+        for data in self.iter_article_pages():
+            result["totalResults"] = data.get("totalResults", 0)
+            result["articles"].extend(data.get("articles", []))
+
+        logger.info(f"Successfully fetched {len(result['articles'])} articles")
+        return result
+
+    def _get_page(self, page: int) -> Dict[str, Any]:
+        """
+        Fetch a single page and validate its payload.
+
+        Args:
+            page: 1-based page number to request
 
         Returns:
             Dict[str, Any]: The parsed JSON response as a dictionary
@@ -158,8 +346,7 @@ class NewsApiClient:
             NewsApiError: If the API request fails or returns an error
         """
         try:
-            logger.info(f"Fetching articles for query: '{self.search_query}'")
-            response = self.fetch_articles()
+            response = self.fetch_articles(page)
             data = response.json()
 
             if "status" in data and data["status"] == "error":
@@ -167,7 +354,7 @@ class NewsApiClient:
                 raise NewsApiError(f"News API error: {data.get('message', 'Unknown error')}")
 
             article_count = len(data.get("articles", []))
-            logger.info(f"Successfully fetched {article_count} articles")
+            logger.info(f"Successfully fetched {article_count} articles (page {page})")
             return data
         except NewsApiError:
             raise
@@ -178,52 +365,121 @@ class NewsApiClient:
             logger.error(f"Unexpected error in get_articles: {e}", exc_info=True)
             raise NewsApiError(f"Unexpected error: {str(e)}") from e
 
-    def extract_full_articles(self) -> List[Dict[str, Any]]:
+    def extract_full_articles(
+            self,
+            max_workers: int = 8,
+            max_per_host: int = 2,
+            pages: Optional[Iterable[Dict[str, Any]]] = None,
+            parse_workers: int = 1
+    ) -> List[Dict[str, Any]]:
         """
-        Fetch articles and then extract full article content for each using readability.
+        Fetch articles and then extract full article content for each (see ArticleExtractor).
+
+        Article pages are downloaded concurrently on a bounded worker pool. At most
+        ``max_workers`` requests are in flight overall and at most ``max_per_host``
+        against any single publisher. URLs of a host at its cap wait in a queue of
+        that host rather than in a pool worker (see _HostDispatcher), so one slow
+        site cannot occupy the whole pool.
+        The returned list keeps the order of the API response.
+
+        With parse_workers > 1, the download threads only download: their pages go
+        through a bounded queue to a process pool that extracts the text (see
+        ExtractionPool), so parsing scales with cores and a backlog of unparsed
+        pages blocks the downloads instead of growing in memory.
+
+        With a duplicate filter, articles whose normalized URL was already seen are
+        dropped, and articles whose normalized title was already seen are not
+        downloaded: they get the full text of the first article with that title and
+        its URL under 'duplicate_of'.
+
+        Args:
+            max_workers: Global cap on concurrent article downloads (1 fetches serially)
+            max_per_host: Cap on concurrent downloads against the same host
+            pages: Pages of articles to extract instead of this client's query results,
+                   e.g. [{"articles": NewsQueryScheduler(...).fetch(jobs)}]
+            parse_workers: Processes extracting article text (1 extracts in the download threads)
 
         Returns:
             List[Dict[str, Any]]: List of articles with full text added (under key 'full_text')
 
         Raises:
             NewsApiError: If the API request fails or returns an error
+            ValueError: If either concurrency cap or parse_workers is lower than 1
         """
+        if max_workers < 1 or max_per_host < 1:
+            raise ValueError("max_workers and max_per_host must be at least 1")
+        if parse_workers < 1:
+            raise ValueError("parse_workers must be at least 1")
+
+        parse_pool = ExtractionPool(self._extractor, parse_workers) if parse_workers > 1 else None
+
+        def fetch(index: int, article: Dict[str, Any], host: str) -> Dict[str, Any]:
+            if parse_pool is None:
+                return self._extract_article_content(index, article)
+            download = self._download_article(index, article)
+            if download is not None:
+                # Blocks while the parsers are behind, which holds back further downloads
+                parse_pool.submit(download.page, host, download.encoding,
+                                  partial(self._parsed, index, article, download))
+            return article
+
         try:
             logger.info("Extracting full content for articles")
-            articles_data = self.get_articles()
-            articles = articles_data.get("articles", [])
-
-            logger.info(f"Processing {len(articles)} articles for full content extraction")
-            full_articles = []
-
-            for i, article in enumerate(articles):
-                article_url = article.get("url")
-                if not article_url:
-                    logger.warning(f"Article {i + 1} missing URL, skipping")
-                    continue
-
+            started = time.perf_counter()
+            # One slot per returned article: a pending download, or the canonical URL of a title duplicate
+            slots: List[Union[Future, tuple]] = []
+            article_count = 0
+            dropped = 0
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                dispatcher = _HostDispatcher(executor, fetch, max_per_host)
                 try:
-                    logger.debug(f"Fetching content from URL: {article_url}")
-                    response = requests.get(article_url, timeout=10)
-                    response.raise_for_status()
-
-                    logger.debug(f"Extracting text with readability from article {i + 1}")
-                    content_html = Document(response.text).summary()
-                    content_text = html.fromstring(content_html).text_content()
-
-                    article['full_text'] = content_text.strip()
-                    logger.debug(f"Successfully extracted {len(content_text)} characters from article {i + 1}")
-                    full_articles.append(article)
-
-                except requests.exceptions.RequestException as e:
-                    logger.warning(f"Failed to fetch article {i + 1} ({article_url}): {e}")
-                    article['full_text'] = f"[Error fetching content: Network error]"
-                    full_articles.append(article)
-                except Exception as e:
-                    logger.warning(f"Failed to extract content for article {i + 1} ({article_url}): {e}")
-                    article['full_text'] = f"[Error extracting content: {type(e).__name__}]"
-                    full_articles.append(article)
-
+                    # Pages are handed to the pool as they arrive, so downloads of the first
+                    # page overlap with the API requests for the following ones
+                    for page in self.iter_article_pages() if pages is None else pages:
+                        for article in page.get("articles", []):
+                            article_count += 1
+                            if not article.get("url"):
+                                logger.warning(f"Article {article_count} missing URL, skipping")
+                                continue
+                            if self._dedup is not None:
+                                if self._dedup.seen_url(article):
+                                    dropped += 1
+                                    continue
+                                canonical_url = self._dedup.title_duplicate_of(article)
+                                if canonical_url is not None:
+                                    slots.append((article, canonical_url))
+                                    continue
+                                self._dedup.add(article)
+                            host = urlparse(article["url"]).netloc.lower()
+                            slots.append(dispatcher.submit(host, article_count - 1, article, host))
+
+                    downloads = sum(isinstance(slot, Future) for slot in slots)
+                    logger.info(f"Processing {downloads} articles for full content extraction "
+                                f"({len(slots) - downloads} title duplicates linked, {dropped} known URLs dropped)")
+                    full_articles = [slot.result() if isinstance(slot, Future) else slot for slot in slots]
+                finally:
+                    # Downloads still queued for a host would never start once the pool shuts down
+                    dispatcher.close(NewsApiError("Article extraction was aborted"))
+            if parse_pool is not None:
+                # Title duplicates below copy the text of their canonical article, so parsing must be done
+                parse_pool.close()
+
+            full_text_by_url = {
+                normalize_url(article["url"]): article.get("full_text")
+                for article in full_articles if isinstance(article, dict)
+            }
+            for position, slot in enumerate(full_articles):
+                if isinstance(slot, tuple):
+                    article, canonical_url = slot
+                    article["duplicate_of"] = canonical_url
+                    article["full_text"] = full_text_by_url.get(normalize_url(canonical_url))
+                    full_articles[position] = article
+
+            metrics.observe("stage_seconds", time.perf_counter() - started, stage="extract_full_articles")
+            metrics.inc("rows_processed_total", len(full_articles), stage="extract_full_articles")
+            metrics.inc("articles_deduplicated_total", dropped, kind="known_url")
+            metrics.inc("articles_deduplicated_total", len(slots) - downloads, kind="title")
             logger.info(f"Successfully processed {len(full_articles)} articles")
             return full_articles
 
@@ -231,4 +487,261 @@ class NewsApiClient:
             raise
         except Exception as e:
             logger.error(f"Unexpected error in extract_full_articles: {e}", exc_info=True)
-            raise NewsApiError(f"Failed to extract full articles: {str(e)}") from e
\ No newline at end of file
+            raise NewsApiError(f"Failed to extract full articles: {str(e)}") from e
+        finally:
+            if parse_pool is not None:
+                parse_pool.close()
+
+    def _extract_article_content(self, index: int, article: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Download a single article page, or reuse its cached copy, and attach its readable text.
+
+        The page is streamed and only its first max_bytes (see ArticleExtractor) are
+        kept, so very large pages cost no more than the cap to download and parse.
+
+        Failures never propagate: the article is returned with an error placeholder
+        in 'full_text' instead, so one broken page does not abort the whole batch.
+
+        Args:
+            index: Position of the article in the API response (used for logging)
+            article: Article dictionary with at least a 'url' key
+
+        Returns:
+            Dict[str, Any]: The same article dictionary with 'full_text' set
+        """
+        download = self._download_article(index, article)
+        if download is None:
+            return article
+
+        try:
+            start = time.perf_counter()
+            text, method = self._extractor.extract(
+                download.page, host=urlparse(article["url"]).netloc, encoding=download.encoding
+            )
+            self._finish_article(index, article, download, text, method, time.perf_counter() - start)
+        except Exception as e:
+            self._extraction_failed(index, article, e)
+        return article
+
+    def _download_article(self, index: int, article: Dict[str, Any]) -> Optional["_PageDownload"]:
+        """
+        Download an article page, unless the cache can serve its text.
+
+        Args:
+            index: Position of the article in the API response (used for logging)
+            article: Article dictionary with at least a 'url' key
+
+        Returns:
+            The downloaded page, or None if 'full_text' was already set from the
+            cache or to an error placeholder
+        """
+        article_url = article["url"]
+        try:
+            cached = self._cache.get(article_url) if self._cache else None
+            if cached and cached.is_fresh(self._cache.ttl_seconds):
+                logger.debug(f"Serving article {index + 1} from cache: {article_url}")
+                metrics.inc("article_cache_lookups_total", result="hit")
+                article['full_text'] = cached.full_text
+                return None
+
+            logger.debug(f"Fetching content from URL: {article_url}")
+            response = self._transport.get(
+                article_url,
+                headers=cached.conditional_headers() if cached else None,
+                timeout=10,
+                retries=1,
+                stream=True
+            )
+
+            if cached and response.status_code == 304:
+                logger.debug(f"Article {index + 1} not modified, reusing cached text")
+                response.close()
+                metrics.inc("article_cache_lookups_total", result="revalidated")
+                self._cache.mark_revalidated(
+                    article_url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+                article['full_text'] = cached.full_text
+                return None
+
+            if self._cache:
+                metrics.inc("article_cache_lookups_total", result="miss")
+            if response.status_code >= 400:
+                response.close()
+            response.raise_for_status()
+
+            page, truncated = self._transport.read_body(response, max_bytes=self._extractor.max_bytes)
+            if truncated:
+                logger.debug(f"Article {index + 1} is larger than {self._extractor.max_bytes} bytes, truncated")
+                metrics.inc("articles_truncated_total")
+
+            return _PageDownload(
+                page=page,
+                encoding=charset_from_content_type(response.headers.get("Content-Type")),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Failed to fetch article {index + 1} ({article_url}): {e}")
+            metrics.inc("articles_failed_total", reason="network")
+            article['full_text'] = f"{EXTRACTION_ERROR_PREFIX}fetching content: Network error]"
+        except Exception as e:
+            self._extraction_failed(index, article, e)
+        return None
+
+    def _finish_article(
+            self,
+            index: int,
+            article: Dict[str, Any],
+            download: "_PageDownload",
+            text: str,
+            method: str,
+            seconds: float
+    ) -> None:
+        """Attach the extracted text to an article and cache the page."""
+        article['full_text'] = text
+        metrics.observe("article_extract_seconds", seconds)
+        metrics.inc("article_extractions_total", method=method)
+        logger.debug(f"Extracted {len(text)} characters from article {index + 1} using {method}")
+
+        if self._cache:
+            self._cache.put(
+                article["url"],
+                html=download.page.decode(download.encoding or "utf-8", errors="replace"),
+                full_text=text,
+                etag=download.etag,
+                last_modified=download.last_modified
+            )
+
+    def _parsed(
+            self,
+            index: int,
+            article: Dict[str, Any],
+            download: "_PageDownload",
+            result: Optional[Tuple[str, str, float]],
+            error: Optional[BaseException]
+    ) -> None:
+        """ExtractionPool callback: finish the article, or set its error placeholder."""
+        if error is not None:
+            self._extraction_failed(index, article, error)
+            return
+        try:
+            self._finish_article(index, article, download, *result)
+        except Exception as e:
+            self._extraction_failed(index, article, e)
+
+    @staticmethod
+    def _extraction_failed(index: int, article: Dict[str, Any], error: BaseException) -> None:
+        """Set the error placeholder of an article whose page could not be processed."""
+        logger.warning(f"Failed to extract content for article {index + 1} ({article['url']}): {error}")
+        metrics.inc("articles_failed_total", reason="extraction")
+        article['full_text'] = f"{EXTRACTION_ERROR_PREFIX}extracting content: {type(error).__name__}]"
+
+
+class _HostDispatcher:
+    """
+    Submits per-host tasks to an executor with at most max_per_host running per host.
+
+    A task is only handed to the executor once its host has a free slot; until then
+    it waits in a queue of its host. Workers therefore never block waiting for a
+    host, and a slow host cannot hold workers that other hosts could use. Queued
+    tasks that can no longer start (see close) fail instead of staying pending.
+    """
+
+    def __init__(self, executor: Executor, fn: Callable[..., Any], max_per_host: int) -> None:
+        """
+        Initialize the dispatcher.
+
+        Args:
+            executor: Executor running the tasks
+            fn: Function called with the arguments of every task
+            max_per_host: Cap on the tasks of the same host handed to the executor
+        """
+        self._executor = executor
+        self._fn = fn
+        self._max_per_host = max_per_host
+        self._lock = threading.Lock()
+        self._active: Dict[str, int] = defaultdict(int)
+        self._queued: Dict[str, Deque[Tuple[Future, tuple]]] = defaultdict(deque)
+        self._error: Optional[BaseException] = None
+
+    def submit(self, host: str, *args: Any) -> Future:
+        """
+        Submit a task, or queue it until its host has a free slot.
+
+        Args:
+            host: Host the task runs against
+            *args: Arguments of fn
+
+        Returns:
+            Future receiving the result of fn
+        """
+        result: Future = Future()
+        with self._lock:
+            if self._active[host] >= self._max_per_host:
+                self._queued[host].append((result, args))
+                return result
+            self._active[host] += 1
+        self._start(host, result, args)
+        return result
+
+    def close(self, error: BaseException) -> None:
+        """
+        Fail every queued task and start no further tasks, e.g. before the executor shuts down.
+
+        Tasks already handed to the executor are not affected.
+
+        Args:
+            error: Exception set on the futures of the queued tasks
+        """
+        with self._lock:
+            self._error = error
+            queued = [result for queue in self._queued.values() for result, _ in queue]
+            self._queued.clear()
+        for result in queued:
+            result.set_exception(error)
+
+    def _start(self, host: str, result: Future, args: tuple) -> None:
+        try:
+            if self._error is not None:
+                raise self._error
+            future = self._executor.submit(self._fn, *args)
+        except Exception as e:
+            # The executor is shut down or the dispatcher closed: no task of the host can start
+            with self._lock:
+                failed = [result] + [queued for queued, _ in self._queued.pop(host, ())]
+                self._active[host] -= 1
+            for pending in failed:
+                pending.set_exception(e)
+            return
+        future.add_done_callback(partial(self._finished, host, result))
+
+    def _finished(self, host: str, result: Future, future: Future) -> None:
+        # The host's slot passes to its next queued task before the result is published
+        try:
+            with self._lock:
+                queue = self._queued.get(host)
+                following = queue.popleft() if queue else None
+                if following is None:
+                    self._active[host] -= 1
+            if following is not None:
+                self._start(host, *following)
+        finally:
+            if future.cancelled():
+                result.set_exception(CancelledError())
+            elif future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result(future.result())
+
+
+@dataclass
+class _PageDownload:
+    """A downloaded article page waiting for extraction."""
+
+    page: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
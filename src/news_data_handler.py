@@ -1,38 +1,153 @@
 import json
 import os
 import logging
-from typing import Any, Dict, Optional, List, Union
+import sqlite3
+from typing import Any, Dict, Iterator, Optional, List, Union
 
 import pandas as pd
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from src.columnar_store import ParquetStore, add_partition_columns
+from src.metrics import metrics
+from src.raw_archive import RawArticleArchive, iter_ndjson
+from src.sqlite_store import SQLiteStore
+
 logger = logging.getLogger(__name__)
 
+# Format of the News API 'publishedAt' timestamps, used to write parsed timestamps back unchanged
+PUBLISHED_AT_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# Text columns of the processed articles stored as Arrow-backed strings
+ARROW_STRING_COLUMNS = ("title", "description", "url", "urlToImage", "content", "full_text")
+# Low-cardinality columns stored as categoricals
+CATEGORICAL_COLUMNS = ("source_name", "author")
+
+
+def compact_articles(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert processed articles to compact dtypes, in place.
+
+    Text columns become Arrow-backed strings (one contiguous buffer instead of a
+    Python object per cell), 'source_name' and 'author' become categoricals and
+    'publishedAt' is parsed to UTC datetimes. Columns that already have their
+    compact dtype are left alone, so the conversion can be repeated after a concat.
+
+    'publishedAt' is only parsed if every timestamp is written back identically
+    with PUBLISHED_AT_FORMAT, so exports do not change.
+
+    Args:
+        df: Processed articles (see NewsDataHandler.articles_to_dataframe)
+
+    Returns:
+        The same DataFrame
+    """
+    for column in ARROW_STRING_COLUMNS:
+        if column in df.columns and df[column].dtype != "string[pyarrow]":
+            df[column] = df[column].astype("string[pyarrow]")
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype("category")
+
+    if "publishedAt" in df.columns and df["publishedAt"].dtype == object:
+        published = pd.to_datetime(df["publishedAt"], format=PUBLISHED_AT_FORMAT, utc=True, errors="coerce")
+        present = df["publishedAt"].notna()
+        if published[present].notna().all():
+            df["publishedAt"] = published
+        else:
+            logger.debug("Keeping 'publishedAt' as strings: not every timestamp has the News API format")
+    return df
+
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Get a shallow copy of articles with the original 'publishedAt' strings and plain object columns.
+
+    Used for formats that do not take the compact dtypes as they are (Excel has no
+    time zones) or would change their schema (the Parquet datasets store strings).
+    Only the converted columns are copied.
+
+    Args:
+        df: Articles, possibly with compact dtypes (see compact_articles)
+
+    Returns:
+        DataFrame with the dtypes the articles had before compact_articles
+    """
+    exported = df.copy(deep=False)
+    if "publishedAt" in df.columns and isinstance(df["publishedAt"].dtype, pd.DatetimeTZDtype):
+        exported["publishedAt"] = df["publishedAt"].dt.strftime(PUBLISHED_AT_FORMAT).astype(object)
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns and isinstance(df[column].dtype, pd.CategoricalDtype):
+            exported[column] = df[column].astype(object).where(df[column].notna(), None)
+    return exported
+
+
+def append_new_rows_to_csv(
+        df: pd.DataFrame,
+        path: str,
+        key_column: str = "url",
+        date_format: Optional[str] = None
+) -> int:
+    """
+    Append the rows of a dataframe whose key is not yet present in an existing CSV file.
+
+    Only the key column of the existing file is read. Columns are aligned to the
+    existing header and the index continues where the file left off, so the result
+    looks the same as a file written in one go. A missing file is written from scratch.
+
+    Args:
+        df: DataFrame with the rows to append
+        path: Path of the CSV file (written with its index, as the exporters do)
+        key_column: Column that identifies a row
+        date_format: Format of datetime columns, e.g. PUBLISHED_AT_FORMAT
+
+    Returns:
+        Number of rows appended
+    """
+    if not os.path.isfile(path):
+        df.reset_index(drop=True).to_csv(path, date_format=date_format)
+        return len(df)
+
+    header = pd.read_csv(path, nrows=0).columns
+    existing_keys = pd.read_csv(path, usecols=[key_column])[key_column]
+    new_rows = df[~df[key_column].isin(set(existing_keys))].drop_duplicates(subset=[key_column])
+    if new_rows.empty:
+        return 0
+
+    new_rows = new_rows.reindex(columns=header[1:])
+    new_rows.index = pd.RangeIndex(len(existing_keys), len(existing_keys) + len(new_rows))
+    new_rows.to_csv(path, mode="a", header=False, date_format=date_format)
+    return len(new_rows)
+
+
 class NewsDataHandler:
-    def __init__(self):
+    def __init__(self, ticker: Optional[str] = None, compact_dtypes: bool = True):
+        # Legacy single-document snapshot; new raw data goes to the append-only archive
         self.raw_output_path: str = f"./data/raw/raw_articles.json"
+        self.raw_archive: RawArticleArchive = RawArticleArchive("./data/raw/archive")
         self.processed_csv_output_path: str = f"./data/processed/articles.csv"
         self._processed_excel_output_path: str = f"./data/processed/articles.xlsx"
+        self.processed_parquet_output_path: str = f"./data/processed/articles_parquet"
+        self.sqlite_output_path: str = f"./data/insights.sqlite"
+        # Ticker the articles are about, used to partition the Parquet output and key the SQLite rows
+        self.ticker: Optional[str] = ticker
+        # Build article frames with Arrow strings, categoricals and parsed timestamps (see compact_articles)
+        self.compact_dtypes: bool = compact_dtypes
 
     def save_raw_data(self, data_to_save: Union[Dict[str, Any], List[Dict[str, Any]]]) -> str:
         """
-        Save the JSON response from the News API to a file.
+        Append the articles from the News API to the raw NDJSON archive.
 
         Args:
-            data_to_save (Union[Dict[str, Any], List[Dict[str, Any]]]): The JSON data to save.
+            data_to_save (Union[Dict[str, Any], List[Dict[str, Any]]]): A News API response
+                or a list of articles.
 
         Returns:
-            str: The name of the file where the data was saved.
+            str: The name of the archive file the articles were appended to.
 
         Raises:
             IOError: If there is an error writing to the file.
             TypeError: If the data cannot be serialized to JSON.
         """
-        logger.info("Saving raw data to JSON file.")
+        logger.info("Saving raw data to NDJSON archive.")
         if not isinstance(data_to_save, (dict, list)):
             logger.error("Invalid data type for saving: expected dict or list.")
             raise TypeError("Data to save must be a dictionary or list of dictionaries")
@@ -40,80 +155,214 @@ class NewsDataHandler:
             logger.error("Invalid list format: all items must be dictionaries.")
             raise TypeError("All items in the list must be dictionaries")
 
+        articles = data_to_save.get("articles", []) if isinstance(data_to_save, dict) else data_to_save
+
         try:
-            os.makedirs(os.path.dirname(self.raw_output_path), exist_ok=True)
-            with open(self.raw_output_path, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=4)
-            logger.info(f"Successfully saved raw data to {self.raw_output_path}")
-            return self.raw_output_path
+            with metrics.timer("stage_seconds", stage="save_raw_data"):
+                path = self.raw_archive.append(articles)
+            metrics.inc("rows_processed_total", len(articles), stage="save_raw_data")
+            logger.info(f"Successfully saved raw data to {path}")
+            return path
 
         except (IOError, OSError) as e:
-            logger.exception(f"Failed to save data to {self.raw_output_path}")
-            raise IOError(f"Failed to save data to {self.raw_output_path}: {str(e)}")
+            logger.exception(f"Failed to save data to {self.raw_archive.root}")
+            raise IOError(f"Failed to save data to {self.raw_archive.root}: {str(e)}")
         except TypeError as e:
             logger.exception("Failed to serialize data to JSON")
             raise TypeError(f"Failed to serialize data to JSON: {str(e)}")
 
-    def process_raw_data(self, file_path: str) -> pd.DataFrame:
+    def merge_raw_data(self, articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        Read a JSON file containing news data and convert it to a pandas DataFrame.
+        Append the articles whose URL is not archived yet to the raw archive.
+
+        The URLs are looked up in the archive's URL index, so the cost depends on the
+        number of fetched articles rather than on the size of the archive. URLs from
+        the legacy JSON snapshot (raw_output_path) count as known too: the snapshot
+        is indexed once, so switching an existing data directory to the archive does
+        not duplicate articles.
 
         Args:
-            file_path: Path to the JSON file containing news data.
+            articles: Articles returned by the current run.
+
+        Returns:
+            List[Dict[str, Any]]: The articles that were not stored before.
+
+        Raises:
+            IOError: If there is an error reading or writing the archive.
+            TypeError: If the data cannot be serialized to JSON.
+        """
+        try:
+            if os.path.isfile(self.raw_output_path):
+                self.raw_archive.url_index().add_source_once(
+                    os.path.abspath(self.raw_output_path),
+                    lambda: (article.get("url") for article in self._load_json_articles(self.raw_output_path))
+                )
+            known_urls = self.raw_archive.archived_urls(article.get("url") for article in articles)
+        except (IOError, OSError, json.JSONDecodeError, sqlite3.Error) as e:
+            logger.exception("Failed to read existing raw data")
+            raise IOError(f"Failed to read existing raw data: {str(e)}")
+
+        new_articles = []
+        for article in articles:
+            if article.get("url") in known_urls:
+                continue
+            known_urls.add(article.get("url"))
+            new_articles.append(article)
+
+        logger.info(f"Merging {len(new_articles)} new of {len(articles)} fetched articles into the archive.")
+        if new_articles:
+            self.save_raw_data(new_articles)
+        return new_articles
+
+    def process_raw_data(self, file_path: str, chunk_size: int = 10000) -> pd.DataFrame:
+        """
+        Read raw news data and convert it to a pandas DataFrame.
+
+        Args:
+            file_path: Path to a JSON file, an NDJSON(.gz) file or an archive directory.
+            chunk_size: Number of articles decoded per chunk (see iter_raw_data).
 
         Returns:
             DataFrame containing the cleaned news articles.
 
         Raises:
             FileNotFoundError: If the specified file does not exist.
-            json.JSONDecodeError: If the file does not contain valid JSON.
-            RuntimeError: If there's any other error processing the data.
+            RuntimeError: If the data is not valid JSON or has an unexpected structure.
         """
-        logger.info(f"Processing raw data from file: {file_path}")
-        if not os.path.isfile(file_path):
-            logger.error(f"File not found: {file_path}")
-            raise FileNotFoundError(f"File not found: {file_path}")
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            logger.info("Successfully loaded JSON data.")
-
-            if isinstance(data, dict):
-                articles = data.get('articles', [])
-            elif isinstance(data, list):
-                articles = data
-            else:
-                logger.error("Unexpected JSON structure: expected dict or list.")
-                raise TypeError("Unexpected data format: Expected dict or list")
-
-            if not articles:
-                logger.warning("No articles found in data.")
+        with metrics.timer("stage_seconds", stage="process_raw_data"):
+            frames = list(self.iter_raw_data(file_path, chunk_size=chunk_size))
+            if not frames:
                 return pd.DataFrame()
+            articles_dataframe = pd.concat(frames, ignore_index=True)
+            del frames
+            if self.compact_dtypes:
+                # Categoricals of chunks with different categories are concatenated as objects
+                compact_articles(articles_dataframe)
+        return articles_dataframe
+
+    def iter_raw_data(self, file_path: Optional[str] = None, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Stream raw news data as DataFrames of at most chunk_size articles.
 
-            articles_dataframe = pd.DataFrame(articles)
+        NDJSON files and archive directories are read one line at a time, so memory
+        use depends on chunk_size rather than on the size of the archive.
 
-            if 'source' in articles_dataframe.columns:
-                articles_dataframe['source_name'] = articles_dataframe['source'].apply(
-                    lambda x: x.get('name') if isinstance(x, dict) else None
-                )
-                articles_dataframe = articles_dataframe.drop('source', axis=1)
+        Args:
+            file_path: Path to a JSON file, an NDJSON(.gz) file or an archive directory.
+                       Defaults to the raw archive.
+            chunk_size: Maximum number of articles per DataFrame.
+
+        Yields:
+            pd.DataFrame: The next chunk of articles.
+
+        Raises:
+            FileNotFoundError: If the specified file does not exist.
+            RuntimeError: If the data is not valid JSON or has an unexpected structure.
+        """
+        file_path = file_path or self.raw_archive.root
+        logger.info(f"Processing raw data from: {file_path}")
 
-            logger.info(f"Processed {len(articles_dataframe)} articles into DataFrame.")
-            return articles_dataframe
+        if os.path.isdir(file_path):
+            records = RawArticleArchive(file_path).iter_records()
+        elif not os.path.isfile(file_path):
+            logger.error(f"File not found: {file_path}")
+            raise FileNotFoundError(f"File not found: {file_path}")
+        elif file_path.endswith(".json"):
+            records = None
+        else:
+            records = iter_ndjson(file_path)
+
+        try:
+            if records is None:
+                records = iter(self._load_json_articles(file_path))
+
+            chunk: List[Dict[str, Any]] = []
+            for record in records:
+                chunk.append(record)
+                if len(chunk) >= chunk_size:
+                    metrics.inc("rows_processed_total", len(chunk), stage="process_raw_data")
+                    yield self.articles_to_dataframe(chunk)
+                    chunk = []
+            if chunk:
+                metrics.inc("rows_processed_total", len(chunk), stage="process_raw_data")
+                yield self.articles_to_dataframe(chunk)
 
         except (json.JSONDecodeError, TypeError) as e:
             logger.exception("Failed to process JSON data.")
             raise RuntimeError(f"Error processing news data: {str(e)}")
 
-    def export_articles(self, df: pd.DataFrame, formats: Optional[List[str]] = None) -> Dict[str, bool]:
+    def _load_json_articles(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Load the articles of a single JSON document (a News API response or a list).
+
+        Args:
+            file_path: Path to the JSON file.
+
+        Returns:
+            List of articles.
+
+        Raises:
+            TypeError: If the document is neither a dict nor a list.
+        """
+        with open(file_path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        logger.info("Successfully loaded JSON data.")
+
+        if isinstance(data, dict):
+            return data.get('articles', [])
+        elif isinstance(data, list):
+            return data
+        logger.error("Unexpected JSON structure: expected dict or list.")
+        raise TypeError("Unexpected data format: Expected dict or list")
+
+    def articles_to_dataframe(self, articles: List[Dict[str, Any]]) -> pd.DataFrame:
+        """
+        Convert a list of News API articles to a DataFrame with a flat 'source_name' column.
+
+        With compact_dtypes the frame is converted by compact_articles.
+
+        Args:
+            articles: Articles as returned by the News API.
+
+        Returns:
+            DataFrame containing the articles.
+        """
+        if not articles:
+            logger.warning("No articles found in data.")
+            return pd.DataFrame()
+
+        articles_dataframe = pd.DataFrame(articles)
+
+        if 'source' in articles_dataframe.columns:
+            source_names = [
+                source.get('name') if isinstance(source, dict) else None
+                for source in articles_dataframe['source']
+            ]
+            articles_dataframe = articles_dataframe.drop('source', axis=1)
+            articles_dataframe['source_name'] = source_names
+
+        if self.compact_dtypes:
+            compact_articles(articles_dataframe)
+
+        logger.info(f"Processed {len(articles_dataframe)} articles into DataFrame.")
+        return articles_dataframe
+
+    def export_articles(
+            self,
+            df: pd.DataFrame,
+            formats: Optional[List[str]] = None,
+            append: bool = False
+    ) -> Dict[str, bool]:
         """
         Export dataframe to specified formats.
 
         Args:
             df: DataFrame to export.
             formats: List of formats to export to. Defaults to ['csv', 'excel'] if None.
-                     Valid values are 'csv' and 'excel'.
+                     Valid values are 'csv', 'excel', 'parquet' and 'sqlite'.
+            append: If True, add only articles with new URLs to the existing CSV
+                    instead of rewriting it, and keep the stored articles of the
+                    Parquet partitions written (incremental mode).
 
         Returns:
             Dictionary with format names as keys and success status as values.
@@ -128,23 +377,31 @@ class NewsDataHandler:
         results = {}
 
         for format_type in formats:
-            if format_type.lower() == 'csv':
-                results['csv'] = self._export_to_csv(df)
-            elif format_type.lower() == 'excel':
-                results['excel'] = self._export_to_excel(df)
-            else:
+            if format_type.lower() not in ('csv', 'excel', 'parquet', 'sqlite'):
                 logger.error(f"Unsupported format specified: {format_type}")
                 raise ValueError(f"Unsupported export format: {format_type}")
 
+            with metrics.timer("export_seconds", target="articles", format=format_type.lower()):
+                if format_type.lower() == 'csv':
+                    results['csv'] = self._export_to_csv(df, append=append)
+                elif format_type.lower() == 'excel':
+                    results['excel'] = self._export_to_excel(df)
+                elif format_type.lower() == 'parquet':
+                    results['parquet'] = self._export_to_parquet(df, append=append)
+                else:
+                    results['sqlite'] = self._export_to_sqlite(df)
+            metrics.inc("rows_exported_total", len(df), target="articles", format=format_type.lower())
+
         logger.info(f"Export results: {results}")
         return results
 
-    def _export_to_csv(self, articles_dataframe: pd.DataFrame) -> bool:
+    def _export_to_csv(self, articles_dataframe: pd.DataFrame, append: bool = False) -> bool:
         """
         Export dataframe to CSV format.
 
         Args:
             articles_dataframe: DataFrame to export.
+            append: If True, append only articles whose URL is not in the file yet.
 
         Returns:
             True if export was successful, False otherwise.
@@ -152,10 +409,15 @@ class NewsDataHandler:
         try:
             os.makedirs(os.path.dirname(self.processed_csv_output_path), exist_ok=True)
 
-            file_exists = os.path.isfile(self.processed_csv_output_path)
+            if append:
+                appended = append_new_rows_to_csv(articles_dataframe, self.processed_csv_output_path,
+                                                  date_format=PUBLISHED_AT_FORMAT)
+                logger.info(f"Appended {appended} articles to CSV at: {self.processed_csv_output_path}")
+                return True
 
             articles_dataframe.to_csv(
-                self.processed_csv_output_path
+                self.processed_csv_output_path,
+                date_format=PUBLISHED_AT_FORMAT
             )
             logger.info(f"Data exported to CSV at: {self.processed_csv_output_path}")
             return True
@@ -176,10 +438,55 @@ class NewsDataHandler:
         """
         try:
             os.makedirs(os.path.dirname(self._processed_excel_output_path), exist_ok=True)
-            articles_dataframe.to_excel(self._processed_excel_output_path, index=False)
+            export_frame(articles_dataframe).to_excel(self._processed_excel_output_path, index=False)
             logger.info(f"Data exported to Excel at: {self._processed_excel_output_path}")
             return True
         except Exception as e:
             logger.exception(f"Error exporting to Excel: {self._processed_excel_output_path}")
             print(f"Error exporting to Excel {self._processed_excel_output_path}: {e}")
             return False
+
+    def _export_to_parquet(self, articles_dataframe: pd.DataFrame, append: bool = False) -> bool:
+        """
+        Export dataframe to a Parquet dataset partitioned by ticker and publication date.
+
+        Args:
+            articles_dataframe: DataFrame to export.
+            append: If True, keep the stored articles of the partitions written,
+                    replacing those with the URL of a new article.
+
+        Returns:
+            True if export was successful, False otherwise.
+        """
+        try:
+            partitioned = add_partition_columns(export_frame(articles_dataframe), "publishedAt", ticker=self.ticker)
+            ParquetStore(self.processed_parquet_output_path).write(partitioned, append=append, key="url")
+            logger.info(f"Data exported to Parquet at: {self.processed_parquet_output_path}")
+            return True
+        except Exception as e:
+            logger.exception(f"Error exporting to Parquet: {self.processed_parquet_output_path}")
+            print(f"Error exporting to Parquet {self.processed_parquet_output_path}: {e}")
+            return False
+
+    def _export_to_sqlite(self, articles_dataframe: pd.DataFrame) -> bool:
+        """
+        Upsert the articles into the SQLite store, keyed by URL.
+
+        Args:
+            articles_dataframe: DataFrame to export.
+
+        Returns:
+            True if export was successful, False otherwise.
+        """
+        try:
+            store = SQLiteStore(self.sqlite_output_path)
+            try:
+                store.upsert_articles(articles_dataframe, ticker=self.ticker)
+            finally:
+                store.close()
+            logger.info(f"Data exported to SQLite at: {self.sqlite_output_path}")
+            return True
+        except Exception as e:
+            logger.exception(f"Error exporting to SQLite: {self.sqlite_output_path}")
+            print(f"Error exporting to SQLite {self.sqlite_output_path}: {e}")
+            return False
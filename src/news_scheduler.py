@@ -0,0 +1,384 @@
+import logging
+import re
+from collections import deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.article_cache import normalize_url
+from src.http_transport import HttpTransport
+from src.metrics import metrics
+from src.news_api import NewsApiClient, NewsApiRateLimitError
+from src.rate_limiter import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Longest 'q' parameter the News API accepts
+MAX_QUERY_LENGTH = 500
+
+_TERM_RE = re.compile(r'([+-]?)"([^"]+)"|([+-]?)(\S+)')
+
+
+def _window_start(value: str) -> str:
+    """Lower bound of a 'from' value as a comparable 'YYYY-MM-DDTHH:MM:SS' string."""
+    return value[:19] if len(value) > 10 else f"{value}T00:00:00"
+
+
+def _window_end(value: str) -> str:
+    """Upper bound of a 'to' value; a bare date includes the whole day."""
+    return value[:19] if len(value) > 10 else f"{value}T23:59:59"
+
+
+@dataclass(frozen=True)
+class QueryJob:
+    """
+    One watchlist entry: a News API query over a publication window.
+
+    Attributes:
+        query: Search query ('q'), e.g. 'apple' or '"interest rates" AND fed'
+        categories: Comma-separated categories
+        start: Start of the window ('YYYY-MM-DD' or 'YYYY-MM-DDTHH:MM:SS', UTC)
+        end: End of the window, in the same format; a bare date includes the whole day
+        language: Article language
+    """
+
+    query: str
+    categories: str
+    start: str
+    end: str
+    language: str = "en"
+
+    @property
+    def key(self) -> str:
+        """Key of the query, the same as NewsApiClient.query_key."""
+        return NewsApiClient.build_query_key(self.query, self.categories, self.language)
+
+    def covers(self, article: Dict[str, Any]) -> bool:
+        """Whether the article was published inside the window of this job."""
+        published = (article.get("publishedAt") or "")[:19]
+        return bool(published) and _window_start(self.start) <= published <= _window_end(self.end)
+
+    def matches(self, article: Dict[str, Any]) -> bool:
+        """
+        Check locally whether the query matches an article's title, description or content.
+
+        This approximates the News API syntax: OR separates alternatives, and an
+        alternative matches when all its words and quoted phrases occur, apart from
+        words after NOT or prefixed with '-', which must not occur.
+
+        Args:
+            article: News API article
+
+        Returns:
+            True if the query matches the article text
+        """
+        text = " ".join(str(article.get(f) or "") for f in ("title", "description", "content")).casefold()
+        for alternative in re.split(r"\s+OR\s+", self.query.strip("() ")):
+            required, excluded, negate = [], [], False
+            for sign, phrase, word_sign, word in _TERM_RE.findall(alternative.replace("(", " ").replace(")", " ")):
+                term = (phrase or word).casefold()
+                if word in ("AND", "OR"):
+                    continue
+                if word == "NOT":
+                    negate = True
+                    continue
+                (excluded if negate or "-" in (sign, word_sign) else required).append(term)
+                negate = False
+            if all(t in text for t in required) and not any(t in text for t in excluded):
+                return True
+        return False
+
+
+@dataclass
+class MergedRequest:
+    """
+    Jobs served by a single paginated API query: their queries joined with OR over the union of their windows.
+
+    Attributes:
+        jobs: The jobs the request serves
+        categories: Categories shared by the jobs
+        language: Language shared by the jobs
+        start: Earliest start of the jobs
+        end: Latest end of the jobs
+    """
+
+    jobs: List[QueryJob]
+    categories: str
+    language: str
+    start: str
+    end: str
+
+    @property
+    def query(self) -> str:
+        if len(self.jobs) == 1:
+            return self.jobs[0].query
+        return " OR ".join(f"({job.query})" for job in self.jobs)
+
+    @classmethod
+    def of(cls, jobs: Sequence[QueryJob]) -> "MergedRequest":
+        return cls(
+            jobs=list(jobs),
+            categories=jobs[0].categories,
+            language=jobs[0].language,
+            start=min(jobs, key=lambda j: _window_start(j.start)).start,
+            end=max(jobs, key=lambda j: _window_end(j.end)).end,
+        )
+
+
+@dataclass
+class ScheduleResult:
+    """
+    Outcome of NewsQueryScheduler.fetch.
+
+    Attributes:
+        articles: Distinct articles, each with 'matched_queries' listing the keys of the jobs it matched
+        requests: Number of API requests made
+        pending: Jobs that were not (completely) fetched because the quota ran out, with their
+                 windows narrowed to what is left to fetch
+        truncated: Jobs whose oldest results were not fetched because pagination stopped at the
+                   result limit or max_pages, with their windows narrowed to what was missed
+    """
+
+    articles: List[Dict[str, Any]] = field(default_factory=list)
+    requests: int = 0
+    pending: List[QueryJob] = field(default_factory=list)
+    truncated: List[QueryJob] = field(default_factory=list)
+
+
+class NewsQueryScheduler:
+    """
+    Covers a watchlist of News API queries with as few requests as possible.
+
+    Jobs are merged before anything is requested: duplicate jobs and overlapping
+    windows of the same query collapse into one job, and jobs sharing categories
+    and language with overlapping windows are combined into OR queries of at most
+    MAX_QUERY_LENGTH characters. Every request takes a token from a shared token
+    bucket sized to the plan's quota. Articles returned for several queries are
+    kept once and tagged with every job they match.
+
+    A merged request whose results exceed what the plan can page through
+    (max_results) is split in two, so no query loses articles to the merge. A
+    single query that still exceeds it is fetched newest first as far as the plan
+    allows and reported as truncated.
+    """
+
+    def __init__(
+            self,
+            api_key: Optional[str] = None,
+            rate_limiter: Optional[TokenBucket] = None,
+            transport: Optional[HttpTransport] = None,
+            page_size: int = 100,
+            max_pages: Optional[int] = None,
+            max_results: Optional[int] = 100,
+            max_query_length: int = MAX_QUERY_LENGTH,
+            endpoint: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the scheduler.
+
+        Args:
+            api_key: Optional API key. If not provided, it is loaded from the environment
+            rate_limiter: Token bucket shared by all requests (see TokenBucket.for_daily_quota)
+            transport: Optional shared HTTP transport
+            page_size: Articles requested per page
+            max_pages: Optional cap on pages per merged request
+            max_results: Results the plan can page through per query (100 on the developer
+                         plan), None if unlimited
+            max_query_length: Longest merged query
+            endpoint: Optional News API endpoint override
+        """
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.transport = transport or HttpTransport(pool_size=4)
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.max_results = max_results
+        self.max_query_length = max_query_length
+        self.endpoint = endpoint
+
+    def merge(self, jobs: Sequence[QueryJob]) -> List[MergedRequest]:
+        """
+        Plan the requests covering the jobs.
+
+        Args:
+            jobs: Watchlist jobs
+
+        Returns:
+            The merged requests, each serving one or more jobs
+        """
+        # The same query with overlapping windows becomes one job over the union
+        by_key: Dict[str, List[QueryJob]] = {}
+        for job in jobs:
+            by_key.setdefault(job.key, []).append(job)
+        distinct: List[QueryJob] = []
+        for same_query in by_key.values():
+            for cluster in self._overlapping(same_query):
+                merged = MergedRequest.of(cluster)
+                distinct.append(QueryJob(cluster[0].query, cluster[0].categories, merged.start, merged.end,
+                                         cluster[0].language))
+
+        groups: Dict[Tuple[str, str], List[QueryJob]] = {}
+        for job in distinct:
+            groups.setdefault((job.categories, job.language), []).append(job)
+
+        requests: List[MergedRequest] = []
+        for group in groups.values():
+            for cluster in self._overlapping(group):
+                batch: List[QueryJob] = []
+                for job in cluster:
+                    if batch and len(MergedRequest.of(batch + [job]).query) > self.max_query_length:
+                        requests.append(MergedRequest.of(batch))
+                        batch = []
+                    batch.append(job)
+                requests.append(MergedRequest.of(batch))
+
+        logger.info(f"Merged {len(jobs)} jobs into {len(requests)} requests")
+        return requests
+
+    def fetch(self, jobs: Sequence[QueryJob]) -> ScheduleResult:
+        """
+        Fetch the articles of every job.
+
+        Stops early, keeping what was fetched so far, when the rate limiter runs
+        out of quota or the API answers 429; the unserved jobs are returned as pending.
+        Jobs of the interrupted request are narrowed to the part of their window its
+        pages have not reached (see _unserved), and dropped if the pages covered them.
+        Jobs whose pagination stopped at the result limit or max_pages are returned
+        as truncated, narrowed the same way; their watermarks must not advance.
+
+        Args:
+            jobs: Watchlist jobs
+
+        Returns:
+            The distinct articles tagged with the jobs they matched, the request count, and the
+            pending and truncated jobs
+        """
+        result = ScheduleResult()
+        articles: Dict[str, Dict[str, Any]] = {}
+        queue: Deque[MergedRequest] = deque(self.merge(jobs))
+
+        while queue:
+            request = queue.popleft()
+            client = self._client(request)
+            # Oldest publication time among the pages of this request fetched so far
+            oldest: Optional[str] = None
+            try:
+                for page_number, page in enumerate(client.iter_article_pages(), start=1):
+                    result.requests += 1
+                    self._collect(request, page.get("articles", []), articles)
+                    published = [a["publishedAt"][:19] for a in page.get("articles", []) if a.get("publishedAt")]
+                    if published:
+                        oldest = min([oldest, *published] if oldest else published)
+                    if page_number == 1 and self._exceeds_result_limit(request, page):
+                        half = len(request.jobs) // 2
+                        logger.info(f"{page.get('totalResults')} results for {len(request.jobs)} merged queries "
+                                    f"exceed the plan limit, splitting the request")
+                        queue.appendleft(MergedRequest.of(request.jobs[half:]))
+                        queue.appendleft(MergedRequest.of(request.jobs[:half]))
+                        break
+                else:
+                    if client.truncated:
+                        result.truncated.extend(self._unserved(request, oldest))
+            except NewsApiRateLimitError as e:
+                logger.warning(f"Stopping the schedule: {e}")
+                result.pending = self._unserved(request, oldest) + [job for pending in queue for job in pending.jobs]
+                break
+
+        result.articles = list(articles.values())
+        metrics.inc("news_scheduler_requests_total", result.requests)
+        logger.info(f"Fetched {len(result.articles)} distinct articles for {len(jobs)} jobs "
+                    f"with {result.requests} requests ({len(result.pending)} jobs pending, "
+                    f"{len(result.truncated)} truncated)")
+        return result
+
+    def _client(self, request: MergedRequest) -> NewsApiClient:
+        """Client for one merged request, sharing the transport and rate limiter."""
+        client = NewsApiClient(
+            search_query=request.query,
+            categories=request.categories,
+            search_days=0,
+            api_key=self.api_key,
+            page_size=self.page_size,
+            max_pages=self.max_pages,
+            transport=self.transport,
+            rate_limiter=self.rate_limiter,
+        )
+        client.language = request.language
+        client.start_date = request.start
+        client.end_date = request.end
+        if self.endpoint:
+            client.endpoint = self.endpoint
+        return client
+
+    @staticmethod
+    def _unserved(request: MergedRequest, oldest: Optional[str]) -> List[QueryJob]:
+        """
+        Jobs of a partly fetched request, narrowed to the part of their window that is left.
+
+        The API returns the newest articles first, so the fetched pages cover every
+        article published from the oldest of their articles on. A job starting after
+        that is fully served; the others end at that time instead (inclusive, so no
+        article of the same second is lost; repeated articles collapse by URL).
+
+        Args:
+            request: The interrupted request
+            oldest: Oldest publication time of its fetched pages, None if none were fetched
+
+        Returns:
+            The jobs that still need fetching
+        """
+        if oldest is None:
+            return list(request.jobs)
+        return [
+            job if _window_end(job.end) <= oldest else replace(job, end=oldest)
+            for job in request.jobs
+            if _window_start(job.start) <= oldest
+        ]
+
+    def _exceeds_result_limit(self, request: MergedRequest, page: Dict[str, Any]) -> bool:
+        """Whether a merged request has more results than the plan lets it page through."""
+        return (
+            len(request.jobs) > 1
+            and self.max_results is not None
+            and page.get("totalResults", 0) > self.max_results
+        )
+
+    @staticmethod
+    def _collect(request: MergedRequest, page_articles: List[Dict[str, Any]],
+                 articles: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Add the articles of a page, tagging each with the jobs of the request it matches.
+
+        An article the API returned for a merged query that no job matches locally
+        (e.g. a match on text the API does not return) is tagged with every job
+        whose window covers it.
+        """
+        for article in page_articles:
+            if not article.get("url"):
+                continue
+            covering = [job for job in request.jobs if job.covers(article)]
+            if len(request.jobs) == 1:
+                matched = request.jobs
+            else:
+                matched = [job for job in covering if job.matches(article)] or covering
+            if not matched:
+                continue
+
+            key = normalize_url(article["url"])
+            stored = articles.setdefault(key, {**article, "matched_queries": []})
+            for job in matched:
+                if job.key not in stored["matched_queries"]:
+                    stored["matched_queries"].append(job.key)
+
+    @staticmethod
+    def _overlapping(jobs: List[QueryJob]) -> List[List[QueryJob]]:
+        """Group jobs into clusters whose windows overlap, in window order."""
+        clusters: List[List[QueryJob]] = []
+        cluster_end = ""
+        for job in sorted(jobs, key=lambda j: (_window_start(j.start), j.query)):
+            if clusters and _window_start(job.start) <= cluster_end:
+                clusters[-1].append(job)
+                cluster_end = max(cluster_end, _window_end(job.end))
+            else:
+                clusters.append([job])
+                cluster_end = _window_end(job.end)
+        return clusters
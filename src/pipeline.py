@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(value: Any) -> str:
+    """
+    Compute a content fingerprint of a stage output.
+
+    DataFrames are hashed row by row with pandas, so equal frames have equal
+    fingerprints regardless of how they were built; other values are pickled.
+
+    Args:
+        value: Stage output
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    return digest.hexdigest()
+
+
+@dataclass
+class Stage:
+    """
+    A node of the pipeline.
+
+    Attributes:
+        name: Unique stage name
+        func: Callable receiving the outputs of its inputs as keyword arguments
+        inputs: Names of the stages whose outputs it consumes
+        params: Settings that change the output, part of the skip key
+        volatile: Whether the stage reads an external source (an API, the clock)
+                  and must therefore always run
+    """
+
+    name: str
+    func: Callable[..., Any]
+    inputs: Sequence[str] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    volatile: bool = False
+
+
+class Pipeline:
+    """
+    In-memory DAG runner.
+
+    Stage outputs are passed to downstream stages in memory, and independent
+    stages run concurrently on a thread pool. After a stage ran, its output is
+    written to a checkpoint together with a key built from its parameters and
+    the fingerprints of its inputs. A non-volatile stage whose key matches the
+    stored one is skipped and its checkpoint is loaded instead.
+    """
+
+    def __init__(self, checkpoint_dir: str = "./data/state/checkpoints", max_workers: int = 2) -> None:
+        """
+        Initialize an empty pipeline.
+
+        Args:
+            checkpoint_dir: Directory holding the checkpoints and their manifest
+            max_workers: Maximum number of stages running at the same time
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.max_workers = max_workers
+        self._stages: Dict[str, Stage] = {}
+        self._manifest_path = os.path.join(checkpoint_dir, "manifest.json")
+
+    def add(
+            self,
+            name: str,
+            func: Callable[..., Any],
+            inputs: Sequence[str] = (),
+            params: Optional[Dict[str, Any]] = None,
+            volatile: bool = False
+    ) -> "Pipeline":
+        """
+        Add a stage.
+
+        Args:
+            name: Unique stage name
+            func: Callable receiving the outputs of its inputs as keyword arguments
+            inputs: Names of previously added stages whose outputs it consumes
+            params: Settings that change the output of the stage
+            volatile: Whether the stage must always run
+
+        Returns:
+            The pipeline, to allow chaining
+
+        Raises:
+            ValueError: If the name is taken or an input is unknown
+        """
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        unknown = [stage for stage in inputs if stage not in self._stages]
+        if unknown:
+            raise ValueError(f"Unknown inputs of stage '{name}': {', '.join(unknown)}")
+        self._stages[name] = Stage(name, func, tuple(inputs), params or {}, volatile)
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every stage once its inputs are available.
+
+        Returns:
+            Mapping from stage name to its output
+
+        Raises:
+            Exception: The first exception raised by a stage; stages that have not
+                       started yet are not run
+        """
+        manifest = self._load_manifest()
+        outputs: Dict[str, Any] = {}
+        output_fingerprints: Dict[str, str] = {}
+        pending = dict(self._stages)
+        running: Dict[Future, Tuple[Stage, str]] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for stage in [s for s in pending.values() if all(i in outputs for i in s.inputs)]:
+                    del pending[stage.name]
+                    key = self._stage_key(stage, output_fingerprints)
+                    if not stage.volatile and self._is_current(stage, key, manifest):
+                        outputs[stage.name] = self._load_checkpoint(stage.name)
+                        output_fingerprints[stage.name] = manifest[stage.name]["output"]
+                        metrics.inc("pipeline_stages_total", result="skipped")
+                        logger.info(f"Skipping stage '{stage.name}': inputs unchanged")
+                        continue
+                    metrics.inc("pipeline_stages_total", result="run")
+                    logger.info(f"Starting stage '{stage.name}'")
+                    kwargs = {name: outputs[name] for name in stage.inputs}
+                    running[executor.submit(self._run_stage, stage, kwargs)] = (stage, key)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = running.pop(future)
+                    try:
+                        output = future.result()
+                    except Exception:
+                        logger.error(f"Stage '{stage.name}' failed")
+                        for other in running:
+                            other.cancel()
+                        raise
+                    outputs[stage.name] = output
+                    output_fingerprints[stage.name] = fingerprint(output)
+                    self._save_checkpoint(stage.name, output)
+                    manifest[stage.name] = {"key": key, "output": output_fingerprints[stage.name]}
+                    self._save_manifest(manifest)
+                    logger.info(f"Finished stage '{stage.name}'")
+
+        return outputs
+
+    @staticmethod
+    def _run_stage(stage: Stage, kwargs: Dict[str, Any]) -> Any:
+        """Run a stage, recording its duration in the pipeline_stage_seconds histogram."""
+        with metrics.timer("pipeline_stage_seconds", stage=stage.name):
+            return stage.func(**kwargs)
+
+    def _stage_key(self, stage: Stage, output_fingerprints: Dict[str, str]) -> str:
+        """Key of a stage run: its parameters and the fingerprints of its inputs."""
+        material = {
+            "params": stage.params,
+            "inputs": {name: output_fingerprints[name] for name in stage.inputs},
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _is_current(self, stage: Stage, key: str, manifest: Dict[str, Dict[str, str]]) -> bool:
+        """Whether the stored checkpoint of a stage was produced from the same key."""
+        entry = manifest.get(stage.name)
+        return bool(entry) and entry["key"] == key and os.path.isfile(self._checkpoint_path(stage.name))
+
+    def _checkpoint_path(self, name: str) -> str:
+        return os.path.join(self.checkpoint_dir, f"{name}.pkl")
+
+    def _load_checkpoint(self, name: str) -> Any:
+        with open(self._checkpoint_path(name), "rb") as f:
+            return pickle.load(f)
+
+    def _save_checkpoint(self, name: str, output: Any) -> None:
+        """Write a checkpoint atomically."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = f"{self._checkpoint_path(name)}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._checkpoint_path(name))
+
+    def _load_manifest(self) -> Dict[str, Dict[str, str]]:
+        if not os.path.isfile(self._manifest_path):
+            return {}
+        with open(self._manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Dict[str, str]]) -> None:
+        """Write the manifest atomically."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = f"{self._manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path)
@@ -0,0 +1,362 @@
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+# On-disk dtype of every column a bar can have. Prices are stored as float32,
+# which halves the size of long histories. float32 keeps about 7 significant
+# digits (a relative error below 6e-8): prices below ~$260,000 round to less
+# than a cent, while e.g. a $600,000 share is only exact to about 3 cents.
+COLUMN_DTYPES: Dict[str, type] = {
+    "Open": np.float32,
+    "High": np.float32,
+    "Low": np.float32,
+    "Close": np.float32,
+    "Adj Close": np.float32,
+    "Volume": np.int64,
+}
+
+# Earliest start used for period='max' (the same lower bound yfinance uses)
+MAX_PERIOD_START = datetime(1900, 1, 1)
+
+# A closed range of naive UTC timestamps that has been downloaded
+Range = Tuple[pd.Timestamp, pd.Timestamp]
+
+_PERIOD_RE = re.compile(r"^(\d+)(d|mo|y)$")
+
+
+def period_to_range(period: str, now: Optional[datetime] = None) -> Range:
+    """
+    Convert a yfinance period such as '5d', '6mo' or 'max' to a date range.
+
+    Day periods are widened by a few calendar days so that weekends and holidays
+    still leave enough trading days in the range (see PriceStore.read).
+
+    Args:
+        period: yfinance period
+        now: End of the range (defaults to the current UTC time)
+
+    Returns:
+        (start, end) as naive UTC timestamps
+
+    Raises:
+        ValueError: If the period is not understood
+    """
+    end = pd.Timestamp(now or datetime.now(timezone.utc))
+    end = end.tz_convert("UTC").tz_localize(None) if end.tzinfo else end
+
+    if period == "max":
+        return pd.Timestamp(MAX_PERIOD_START), end
+    if period == "ytd":
+        return pd.Timestamp(end.year, 1, 1), end
+
+    match = _PERIOD_RE.match(period)
+    if not match:
+        raise ValueError(f"Unsupported period: {period}")
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "d":
+        start = end - pd.Timedelta(days=amount + 4)
+    elif unit == "mo":
+        start = end - pd.DateOffset(months=amount)
+    else:
+        start = end - pd.DateOffset(years=amount)
+    return start.normalize(), end
+
+
+def missing_ranges(covered: Iterable[Range], start: pd.Timestamp, end: pd.Timestamp) -> List[Range]:
+    """
+    Work out which parts of [start, end] are not covered yet.
+
+    Args:
+        covered: Ranges that have already been downloaded
+        start: Start of the requested range
+        end: End of the requested range
+
+    Returns:
+        The uncovered ranges, in order
+    """
+    gaps: List[Range] = []
+    cursor = start
+    for covered_start, covered_end in sorted(covered):
+        if covered_end < cursor:
+            continue
+        if covered_start > end:
+            break
+        if covered_start > cursor:
+            gaps.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def _merge_ranges(ranges: Iterable[Range]) -> List[Range]:
+    """Merge overlapping or touching ranges."""
+    merged: List[Range] = []
+    for range_start, range_end in sorted(ranges):
+        if merged and range_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], range_end))
+        else:
+            merged.append((range_start, range_end))
+    return merged
+
+
+class PriceStore:
+    """
+    Local store of OHLCV bars per (ticker, interval).
+
+    Every series is a directory ``root/<interval>/<TICKER>/`` holding one ``.npy``
+    file per column (int64 nanosecond timestamps, float32 prices, int64 volume)
+    and a ``meta.json`` recording which date ranges have been downloaded. Reads
+    memory-map the files and binary-search the timestamps, so only the requested
+    slice is ever copied into memory.
+    """
+
+    def __init__(self, root: str = "./data/prices") -> None:
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the series
+        """
+        self.root = root
+        self._lock = threading.Lock()
+
+    def series_path(self, ticker: str, interval: str) -> str:
+        """
+        Get the directory of a series.
+
+        Args:
+            ticker: Ticker symbol
+            interval: Bar interval, e.g. '1d'
+
+        Returns:
+            Path of the series directory
+        """
+        return os.path.join(self.root, interval, ticker.upper())
+
+    def covered_ranges(self, ticker: str, interval: str) -> List[Range]:
+        """
+        Get the date ranges of a series that have been downloaded.
+
+        Args:
+            ticker: Ticker symbol
+            interval: Bar interval
+
+        Returns:
+            Downloaded ranges as naive UTC timestamps, in order
+        """
+        meta = self._load_meta(ticker, interval)
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in meta.get("covered", [])]
+
+    def missing_ranges(self, ticker: str, interval: str, start: pd.Timestamp, end: pd.Timestamp) -> List[Range]:
+        """
+        Work out which parts of [start, end] still have to be downloaded for a series.
+
+        Args:
+            ticker: Ticker symbol
+            interval: Bar interval
+            start: Start of the requested range
+            end: End of the requested range
+
+        Returns:
+            The ranges to download, in order
+        """
+        return missing_ranges(self.covered_ranges(ticker, interval), start, end)
+
+    def write(
+            self,
+            ticker: str,
+            interval: str,
+            bars: DataFrame,
+            covered: Optional[Range] = None,
+            cap_at_newest: bool = True
+    ) -> None:
+        """
+        Merge bars into a series and record the range they were downloaded for.
+
+        Bars with a timestamp that is already stored replace the stored bar. By
+        default the recorded range stops at the newest stored bar, so the latest
+        (possibly still forming) bar is downloaded again on the next run.
+
+        Args:
+            ticker: Ticker symbol
+            interval: Bar interval
+            bars: Bars with a 'Date' column and OHLCV columns (any extra columns are ignored)
+            covered: Range the bars were downloaded for, if any
+            cap_at_newest: Whether to cut the recorded range at the newest stored bar.
+                           Pass False for a range that is known to be complete
+        """
+        with self._lock:
+            path = self.series_path(ticker, interval)
+            meta = self._load_meta(ticker, interval)
+            stored = self._load_arrays(path, meta, mmap=False)
+
+            new = self._to_arrays(bars)
+            columns = [col for col in COLUMN_DTYPES if col in stored or col in new]
+            merged = self._merge_arrays(stored, new, columns)
+
+            ranges = self.covered_ranges(ticker, interval)
+            if covered is not None and not cap_at_newest:
+                ranges.append(covered)
+            elif covered is not None and len(merged["timestamp"]):
+                newest = pd.Timestamp(int(merged["timestamp"][-1]))
+                covered_start, covered_end = covered
+                if covered_start <= newest:
+                    ranges.append((covered_start, min(covered_end, newest)))
+
+            os.makedirs(path, exist_ok=True)
+            for name, values in merged.items():
+                tmp_path = os.path.join(path, f"{name}.tmp.npy")
+                np.save(tmp_path, values)
+                os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+
+            meta = {
+                "columns": columns,
+                "rows": int(len(merged["timestamp"])),
+                "covered": [[start.isoformat(), end.isoformat()] for start, end in _merge_ranges(ranges)],
+            }
+            tmp_path = os.path.join(path, "meta.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=4)
+            os.replace(tmp_path, os.path.join(path, "meta.json"))
+        logger.info(f"Stored {len(new['timestamp'])} bars for {ticker} ({interval}); series has {meta['rows']} bars")
+
+    def read(
+            self,
+            ticker: str,
+            interval: str,
+            start: Optional[pd.Timestamp] = None,
+            end: Optional[pd.Timestamp] = None,
+            last_days: Optional[int] = None
+    ) -> DataFrame:
+        """
+        Read the bars of a series between two timestamps.
+
+        Args:
+            ticker: Ticker symbol
+            interval: Bar interval
+            start: First timestamp to include (from the first bar if None)
+            end: Last timestamp to include (up to the last bar if None)
+            last_days: Keep only the bars of the last N distinct trading days in the range
+
+        Returns:
+            Long-format DataFrame with 'ticker', 'Date' and the stored OHLCV columns
+        """
+        meta = self._load_meta(ticker, interval)
+        arrays = self._load_arrays(self.series_path(ticker, interval), meta, mmap=True)
+        if not arrays:
+            return pd.DataFrame(columns=["ticker", "Date"])
+
+        timestamps = arrays["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, pd.Timestamp(start).value, side="left"))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, pd.Timestamp(end).value, side="right"))
+
+        if last_days is not None and hi > lo:
+            days = timestamps[lo:hi] // (24 * 3600 * 10 ** 9)
+            unique_days = np.unique(days)
+            if len(unique_days) > last_days:
+                lo += int(np.searchsorted(days, unique_days[-last_days], side="left"))
+
+        df = pd.DataFrame({"Date": pd.to_datetime(np.array(timestamps[lo:hi]))})
+        for column in meta["columns"]:
+            df[column] = np.array(arrays[column][lo:hi])
+        df.insert(0, "ticker", ticker.upper())
+        return df
+
+    def read_many(
+            self,
+            tickers: Iterable[str],
+            interval: str,
+            start: Optional[pd.Timestamp] = None,
+            end: Optional[pd.Timestamp] = None
+    ) -> DataFrame:
+        """
+        Read several series into one long-format frame.
+
+        Args:
+            tickers: Ticker symbols
+            interval: Bar interval
+            start: First timestamp to include
+            end: Last timestamp to include
+
+        Returns:
+            Long-format DataFrame sorted by ticker and date
+        """
+        frames = [self.read(ticker, interval, start, end) for ticker in tickers]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame(columns=["ticker", "Date"])
+        return pd.concat(frames, ignore_index=True)
+
+    def _load_meta(self, ticker: str, interval: str) -> dict:
+        """Load the metadata of a series, or an empty dict if it does not exist."""
+        meta_path = os.path.join(self.series_path(ticker, interval), "meta.json")
+        if not os.path.isfile(meta_path):
+            return {}
+        with open(meta_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _load_arrays(path: str, meta: dict, mmap: bool) -> Dict[str, np.ndarray]:
+        """Load the column arrays of a series, memory-mapped if requested."""
+        if not meta.get("rows"):
+            return {}
+        mode = "r" if mmap else None
+        return {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+            for name in ["timestamp", *meta["columns"]]
+        }
+
+    @staticmethod
+    def _to_arrays(bars: DataFrame) -> Dict[str, np.ndarray]:
+        """Convert bars to sorted, de-duplicated column arrays in the on-disk dtypes."""
+        dates = pd.to_datetime(bars["Date"])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert("UTC").dt.tz_localize(None)
+
+        frame = bars.assign(Date=dates.astype("datetime64[ns]"))
+        frame = frame.drop_duplicates(subset="Date", keep="last").sort_values("Date")
+        arrays = {"timestamp": frame["Date"].to_numpy().astype(np.int64)}
+        for column, dtype in COLUMN_DTYPES.items():
+            if column in frame.columns:
+                values = pd.to_numeric(frame[column], errors="coerce")
+                if dtype is np.int64:
+                    values = values.fillna(0)
+                arrays[column] = values.to_numpy(dtype=dtype)
+        return arrays
+
+    @staticmethod
+    def _merge_arrays(
+            stored: Dict[str, np.ndarray],
+            new: Dict[str, np.ndarray],
+            columns: List[str]
+    ) -> Dict[str, np.ndarray]:
+        """Merge two sets of sorted column arrays, letting new bars replace stored bars."""
+        def column_of(arrays: Dict[str, np.ndarray], name: str) -> np.ndarray:
+            if name in arrays:
+                return arrays[name]
+            size = len(arrays.get("timestamp", []))
+            if COLUMN_DTYPES[name] is np.int64:
+                return np.zeros(size, dtype=np.int64)
+            return np.full(size, np.nan, dtype=np.float32)
+
+        if not stored:
+            return {"timestamp": new["timestamp"], **{col: column_of(new, col) for col in columns}}
+
+        keep = ~np.isin(stored["timestamp"], new["timestamp"])
+        timestamps = np.concatenate([stored["timestamp"][keep], new["timestamp"]])
+        order = np.argsort(timestamps, kind="stable")
+        merged = {"timestamp": timestamps[order]}
+        for col in columns:
+            merged[col] = np.concatenate([column_of(stored, col)[keep], column_of(new, col)])[order]
+        return merged
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket pacing requests against an API quota.
+
+    The bucket holds up to capacity tokens and refills continuously at
+    refill_per_second; every request takes one token. With a state path the
+    fill level is kept in a small JSON file, so consecutive runs (and every
+    client sharing the bucket) see the same remaining quota.
+    """
+
+    def __init__(
+            self,
+            capacity: float,
+            refill_per_second: float,
+            state_path: Optional[str] = None,
+            max_wait: float = 60.0
+    ) -> None:
+        """
+        Initialize the bucket, restoring its fill level from state_path if it exists.
+
+        Args:
+            capacity: Maximum number of tokens (the burst size)
+            refill_per_second: Tokens added per second
+            state_path: Optional JSON file persisting the fill level between runs
+            max_wait: Longest time in seconds acquire waits for a token by default
+
+        Raises:
+            ValueError: If capacity or refill_per_second is not positive
+        """
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.state_path = state_path
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = time.time()
+
+        if state_path and os.path.isfile(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self._tokens = min(float(state["tokens"]), capacity)
+            self._updated = float(state["updated"])
+            logger.info(f"Restored rate limit state from {state_path}: {self.available():.1f} tokens available")
+
+    @classmethod
+    def for_daily_quota(cls, requests_per_day: int, state_path: Optional[str] = None,
+                        max_wait: float = 60.0) -> "TokenBucket":
+        """
+        Create a bucket for a plan allowing requests_per_day requests per 24 hours.
+
+        Args:
+            requests_per_day: Requests the plan allows per day
+            state_path: Optional JSON file persisting the fill level between runs
+            max_wait: Longest time in seconds acquire waits for a token by default
+
+        Returns:
+            A bucket holding a full day of quota that refills evenly over the day
+        """
+        return cls(requests_per_day, requests_per_day / 86400, state_path=state_path, max_wait=max_wait)
+
+    def available(self) -> float:
+        """Number of tokens currently in the bucket."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def acquire(self, tokens: float = 1, max_wait: Optional[float] = None) -> bool:
+        """
+        Take tokens, waiting for the bucket to refill if needed.
+
+        Args:
+            tokens: Number of tokens to take
+            max_wait: Longest time in seconds to wait (defaults to the bucket's max_wait)
+
+        Returns:
+            True if the tokens were taken, False if they would not be available in time
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            self._refill()
+            wait = max(tokens - self._tokens, 0) / self.refill_per_second
+            if wait > max_wait:
+                logger.warning(f"Rate limit: next token in {wait:.0f}s exceeds the {max_wait:g}s wait limit")
+                return False
+            # Tokens are reserved before sleeping, so concurrent callers queue up behind each other
+            self._tokens -= tokens
+            self._save()
+        if wait > 0:
+            logger.debug(f"Rate limit: waiting {wait:.1f}s for a token")
+            time.sleep(wait)
+        return True
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. after the API answered 429 despite the pacing."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+            self._save()
+
+    def _refill(self) -> None:
+        now = time.time()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def _save(self) -> None:
+        """Write the fill level atomically, if the bucket is persistent."""
+        if not self.state_path:
+            return
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"tokens": self._tokens, "updated": self._updated}, f)
+        os.replace(tmp_path, self.state_path)
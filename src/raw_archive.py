@@ -0,0 +1,282 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.article_cache import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+def open_ndjson(path: str, mode: str = "rt") -> IO:
+    """
+    Open a plain or gzip-compressed NDJSON file in text mode.
+
+    Args:
+        path: File path; files ending in '.gz' are treated as gzip
+        mode: 'rt' to read or 'at' to append
+
+    Returns:
+        An open text file object
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def iter_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the records of an NDJSON file one line at a time.
+
+    Args:
+        path: Plain or gzip-compressed NDJSON file
+
+    Yields:
+        Dict[str, Any]: One decoded record per non-empty line
+
+    Raises:
+        json.JSONDecodeError: If a line is not valid JSON
+    """
+    with open_ndjson(path, "rt") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class ArchiveUrlIndex:
+    """
+    Persistent SQLite index of the article URLs in a raw archive.
+
+    Every URL is stored as is and normalized (see normalize_url), so a run can
+    check whether its articles are archived with indexed lookups instead of
+    decoding the whole archive. Sources indexed once, such as the existing archive
+    files or the legacy JSON snapshot, are recorded and never scanned again.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the index, creating the database file if needed.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                url_key TEXT NOT NULL
+            )
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_urls_key ON urls (url_key)")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS indexed_sources (source TEXT PRIMARY KEY)")
+        self._connection.commit()
+
+    def add(self, urls: Iterable[str]) -> None:
+        """
+        Add URLs to the index.
+
+        Args:
+            urls: Article URLs; empty values are skipped
+        """
+        rows = [(url, normalize_url(url)) for url in urls if url]
+        with self._lock:
+            self._connection.executemany("INSERT OR IGNORE INTO urls (url, url_key) VALUES (?, ?)", rows)
+            self._connection.commit()
+
+    def add_source_once(self, source: str, load: Callable[[], Iterable[str]]) -> bool:
+        """
+        Index the URLs of a source unless it was indexed before.
+
+        Args:
+            source: Name of the source, e.g. the path of a snapshot file
+            load: Returns the URLs of the source; only called the first time
+
+        Returns:
+            True if the source was indexed now
+        """
+        with self._lock:
+            if self._connection.execute("SELECT 1 FROM indexed_sources WHERE source = ?", (source,)).fetchone():
+                return False
+        self.add(load())
+        with self._lock:
+            self._connection.execute("INSERT OR IGNORE INTO indexed_sources (source) VALUES (?)", (source,))
+            self._connection.commit()
+        logger.info(f"Indexed the article URLs of {source}")
+        return True
+
+    def contains(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given URLs are indexed, compared exactly.
+
+        Args:
+            urls: Article URLs
+
+        Returns:
+            The indexed URLs among them
+        """
+        urls = list({url for url in urls if url})
+        found: Set[str] = set()
+        with self._lock:
+            # Stay well below SQLite's limit on the number of bound parameters
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT url FROM urls WHERE url IN ({','.join('?' * len(batch))})", batch
+                )
+                found.update(row[0] for row in rows)
+        return found
+
+    def contains_key(self, url_key: str) -> bool:
+        """
+        Check whether an article with the same normalized URL is indexed.
+
+        Args:
+            url_key: URL normalized with normalize_url
+
+        Returns:
+            True if it is indexed
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM urls WHERE url_key = ? LIMIT 1", (url_key,)
+            ).fetchone() is not None
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+class RawArticleArchive:
+    """
+    Append-only archive of raw News API articles as newline-delimited JSON.
+
+    Each run appends its articles to the file of the current UTC day
+    (``articles-YYYY-MM-DD.ndjson[.gz]``), so files never have to be rewritten
+    and history can be read back one record at a time. The URLs of the archived
+    articles are kept in an ArchiveUrlIndex next to the files.
+    """
+
+    def __init__(self, root: str = "./data/raw/archive", compress: bool = True) -> None:
+        """
+        Initialize the archive.
+
+        Args:
+            root: Directory holding the daily files
+            compress: Whether new files are gzip-compressed
+        """
+        self.root = root
+        self.compress = compress
+        self._url_index: Optional[ArchiveUrlIndex] = None
+
+    def current_path(self, day: Optional[datetime] = None) -> str:
+        """
+        Get the path of the file that articles are appended to on a given day.
+
+        Args:
+            day: Day of the file (defaults to the current UTC day)
+
+        Returns:
+            Path of the daily file
+        """
+        day = day or datetime.now(timezone.utc)
+        suffix = ".ndjson.gz" if self.compress else ".ndjson"
+        return os.path.join(self.root, f"articles-{day.strftime('%Y-%m-%d')}{suffix}")
+
+    def append(self, articles: List[Dict[str, Any]]) -> str:
+        """
+        Append articles to the current daily file.
+
+        Args:
+            articles: Articles to append
+
+        Returns:
+            Path of the file the articles were appended to
+
+        Raises:
+            TypeError: If an article cannot be serialized to JSON
+        """
+        path = self.current_path()
+        os.makedirs(self.root, exist_ok=True)
+        # Files written before the index existed are indexed first
+        url_index = self.url_index()
+        with open_ndjson(path, "at") as f:
+            for article in articles:
+                f.write(json.dumps(article, ensure_ascii=False))
+                f.write("\n")
+        url_index.add(article.get("url") for article in articles)
+        logger.info(f"Appended {len(articles)} articles to {path}")
+        return path
+
+    def files(self) -> List[str]:
+        """
+        List the archive files in chronological order.
+
+        Returns:
+            Paths of the daily files, oldest first
+        """
+        paths = glob.glob(os.path.join(self.root, "articles-*.ndjson")) + \
+            glob.glob(os.path.join(self.root, "articles-*.ndjson.gz"))
+        return sorted(paths, key=os.path.basename)
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every archived article, oldest file first.
+
+        Yields:
+            Dict[str, Any]: One archived article at a time
+        """
+        for path in self.files():
+            yield from iter_ndjson(path)
+
+    def url_index(self) -> ArchiveUrlIndex:
+        """
+        Get the URL index of the archive, opening it on first use.
+
+        The first time the index is opened for an archive, the existing files are
+        scanned once to fill it.
+
+        Returns:
+            The URL index
+        """
+        if self._url_index is None:
+            self._url_index = ArchiveUrlIndex(os.path.join(self.root, "url_index.sqlite"))
+            self._url_index.add_source_once(
+                "archive",
+                lambda: (record.get("url") for record in self.iter_records())
+            )
+        return self._url_index
+
+    def archived_urls(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Get which of the given URLs are already archived.
+
+        Args:
+            urls: Article URLs
+
+        Returns:
+            The archived URLs among them
+        """
+        return self.url_index().contains(urls)
+
+    def has_url_key(self, url_key: str) -> bool:
+        """
+        Check whether an article with the same normalized URL is archived.
+
+        Args:
+            url_key: URL normalized with normalize_url
+
+        Returns:
+            True if it is archived
+        """
+        return self.url_index().contains_key(url_key)
@@ -1,16 +1,26 @@
+import hashlib
+import json
 import logging
+import math
 import os
+import re
+import string
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import nltk
 import pandas as pd
 from pandas import DataFrame
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
+from nltk.sentiment.vader import SentimentIntensityAnalyzer, VaderConstants
+
+from src.columnar_store import ParquetStore, add_partition_columns
+from src.metrics import metrics
+from src.news_data_handler import PUBLISHED_AT_FORMAT, append_new_rows_to_csv, export_frame
+from src.sentiment_memo import SentimentMemo, text_hash
+from src.sqlite_store import SQLiteStore
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +28,7 @@ class NLTKResourceManager:
     """Manages downloading and verifying NLTK resources."""
 
     _vader_lexicon_downloaded = False
+    _resource_cache_path = "./data/cache/nltk_resources.json"
 
     @classmethod
     def ensure_vader_lexicon(cls) -> None:
@@ -25,18 +36,374 @@ class NLTKResourceManager:
         Ensure the VADER lexicon resource is downloaded.
 
         This method downloads the VADER lexicon if not already present
-        in the NLTK data directory.
+        in the NLTK data directory. The location found is remembered in a small
+        cache file, so later processes only check that the file still exists
+        instead of searching every NLTK data directory.
         """
         if cls._vader_lexicon_downloaded:
             return
 
-        try:
-            nltk.data.find('sentiment/vader_lexicon.zip')
+        cached_path = cls._read_resource_cache().get("vader_lexicon")
+        if cached_path and os.path.isfile(cached_path):
             cls._vader_lexicon_downloaded = True
+            return
+
+        try:
+            lexicon_path = nltk.data.find('sentiment/vader_lexicon.zip')
         except LookupError:
             logger.info("Downloading VADER lexicon")
             nltk.download("vader_lexicon", quiet=True)
-            cls._vader_lexicon_downloaded = True
+            lexicon_path = nltk.data.find('sentiment/vader_lexicon.zip')
+
+        cls._write_resource_cache({"vader_lexicon": getattr(lexicon_path, "path", str(lexicon_path))})
+        cls._vader_lexicon_downloaded = True
+
+    @classmethod
+    def _read_resource_cache(cls) -> Dict[str, str]:
+        """Read the cached resource locations, returning an empty mapping if unavailable."""
+        try:
+            with open(cls._resource_cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def _write_resource_cache(cls, resources: Dict[str, str]) -> None:
+        """Remember resource locations; failing to do so only costs a lookup next time."""
+        merged = {**cls._read_resource_cache(), **resources}
+        try:
+            os.makedirs(os.path.dirname(cls._resource_cache_path), exist_ok=True)
+            with open(cls._resource_cache_path, "w", encoding="utf-8") as f:
+                json.dump(merged, f, indent=4)
+        except OSError as e:
+            logger.debug(f"Could not write NLTK resource cache: {e}")
+
+
+class CompiledVaderScorer:
+    """
+    Fast re-implementation of NLTK's VADER scoring.
+
+    NLTK's analyzer rebuilds a punctuation/word product table for every document and
+    looks up each word's position with ``list.index``, which is quadratic in the
+    document length. This engine compiles the lexicon, booster words and negations
+    into a single token table once, tokenizes with one compiled regex, and scores the
+    valence of each distinct token once per document. It follows NLTK's rules,
+    including its quirks (a repeated word is scored in the context of its first
+    occurrence), so its scores match ``SentimentIntensityAnalyzer.polarity_scores``.
+    """
+
+    def __init__(self, lexicon: Dict[str, float]) -> None:
+        """
+        Compile the lookup structures.
+
+        Args:
+            lexicon: VADER lexicon mapping lower-case tokens to valences,
+                     e.g. ``SentimentIntensityAnalyzer().lexicon``
+        """
+        constants = VaderConstants
+        self.lexicon = lexicon
+
+        # Per lower-case token: (lexicon valence or None, booster scalar, is negation)
+        self._tokens: Dict[str, Tuple[Optional[float], float, bool]] = {}
+        for word in set(lexicon) | set(constants.BOOSTER_DICT) | constants.NEGATE:
+            self._tokens[word] = (
+                lexicon.get(word),
+                constants.BOOSTER_DICT.get(word, 0.0),
+                word in constants.NEGATE or "n't" in word,
+            )
+        self._multiword_boosters = frozenset(word for word in constants.BOOSTER_DICT if " " in word)
+        self._idioms = dict(constants.SPECIAL_CASE_IDIOMS)
+
+        # A whitespace-separated token of 2+ characters, with one PUNC_LIST entry removed
+        # from its start or end when the rest is a punctuation-free word of 2+ characters
+        punctuation = re.escape(string.punctuation)
+        punc_list = "|".join(re.escape(p) for p in sorted(constants.PUNC_LIST, key=len, reverse=True))
+        word = rf"[^\s{punctuation}]{{2,}}"
+        self._token_re = re.compile(
+            rf"(?<!\S)(?:(?:{punc_list})({word})|({word})(?:{punc_list})|(\S{{2,}}))(?!\S)"
+        )
+
+    def polarity_scores(self, text: str) -> Dict[str, float]:
+        """
+        Score a single document.
+
+        Args:
+            text: Document to score
+
+        Returns:
+            VADER polarity scores ('neg', 'neu', 'pos', 'compound')
+        """
+        tokens = [a or b or c for a, b, c in self._token_re.findall(text)]
+        n_tokens = len(tokens)
+        lowered = [token.lower() for token in tokens]
+        n_caps = sum(1 for token in tokens if token.isupper())
+        is_cap_diff = 0 < n_tokens - n_caps < n_tokens
+
+        first_index: Dict[str, int] = {}
+        for i, token in enumerate(tokens):
+            first_index.setdefault(token, i)
+
+        valences: Dict[int, float] = {}
+        sentiments = []
+        for token in tokens:
+            i = first_index[token]
+            if i not in valences:
+                valences[i] = self._token_valence(tokens, lowered, i, is_cap_diff)
+            sentiments.append(valences[i])
+
+        if "but" in lowered:
+            but_index = lowered.index("but")
+            sentiments = [
+                s * 0.5 if idx < but_index else s * 1.5 if idx > but_index else s
+                for idx, s in enumerate(sentiments)
+            ]
+
+        return self._score_valence(sentiments, text)
+
+    def score_batch(self, texts: Iterable[str]) -> List[Dict[str, float]]:
+        """
+        Score a batch of documents.
+
+        Args:
+            texts: Documents to score
+
+        Returns:
+            VADER polarity scores of each document, in input order
+        """
+        return [self.polarity_scores(text) for text in texts]
+
+    def _lookup(self, word_lower: str) -> Tuple[Optional[float], float, bool]:
+        """Return the compiled (valence, booster, negation) entry of a lower-case token."""
+        entry = self._tokens.get(word_lower)
+        if entry is None:
+            return None, 0.0, "n't" in word_lower
+        return entry
+
+    def _token_valence(self, tokens: List[str], lowered: List[str], i: int, is_cap_diff: bool) -> float:
+        """
+        Compute the valence of the token at position i, as NLTK's sentiment_valence does.
+
+        Args:
+            tokens: Document tokens
+            lowered: Lower-case document tokens
+            i: Position of the token
+            is_cap_diff: Whether some but not all tokens are in ALL CAPS
+
+        Returns:
+            Valence of the token (0 for tokens without sentiment)
+        """
+        item = tokens[i]
+        item_lower = lowered[i]
+        if (i < len(tokens) - 1 and item_lower == "kind" and lowered[i + 1] == "of") \
+                or self._lookup(item_lower)[1]:
+            return 0
+
+        valence = self._lookup(item_lower)[0]
+        if valence is None:
+            return 0
+
+        if item.isupper() and is_cap_diff:
+            valence += VaderConstants.C_INCR if valence > 0 else -VaderConstants.C_INCR
+
+        for start_i in range(0, 3):
+            if i > start_i and self._lookup(lowered[i - (start_i + 1)])[0] is None:
+                previous = tokens[i - (start_i + 1)]
+                scalar = self._lookup(lowered[i - (start_i + 1)])[1]
+                if scalar:
+                    if valence < 0:
+                        scalar *= -1
+                    if previous.isupper() and is_cap_diff:
+                        scalar += VaderConstants.C_INCR if valence > 0 else -VaderConstants.C_INCR
+                    if start_i == 1:
+                        scalar = scalar * 0.95
+                    if start_i == 2:
+                        scalar = scalar * 0.9
+                valence = valence + scalar
+                valence = self._never_check(valence, tokens, lowered, start_i, i)
+                if start_i == 2:
+                    valence = self._idioms_check(valence, tokens, i)
+
+        return self._least_check(valence, lowered, i)
+
+    def _never_check(self, valence: float, tokens: List[str], lowered: List[str], start_i: int, i: int) -> float:
+        """Apply negations and 'never so/this' emphasis from the preceding tokens."""
+        negated = self._lookup(lowered[i - (start_i + 1)])[2]
+        if start_i == 0:
+            if negated:
+                valence = valence * VaderConstants.N_SCALAR
+        elif start_i == 1:
+            if tokens[i - 2] == "never" and tokens[i - 1] in ("so", "this"):
+                valence = valence * 1.5
+            elif negated:
+                valence = valence * VaderConstants.N_SCALAR
+        else:
+            if (tokens[i - 3] == "never" and tokens[i - 2] in ("so", "this")) or tokens[i - 1] in ("so", "this"):
+                valence = valence * 1.25
+            elif negated:
+                valence = valence * VaderConstants.N_SCALAR
+        return valence
+
+    def _idioms_check(self, valence: float, tokens: List[str], i: int) -> float:
+        """Apply special-case idioms and multi-word dampeners around position i."""
+        one_zero = f"{tokens[i - 1]} {tokens[i]}"
+        two_one_zero = f"{tokens[i - 2]} {tokens[i - 1]} {tokens[i]}"
+        two_one = f"{tokens[i - 2]} {tokens[i - 1]}"
+        three_two_one = f"{tokens[i - 3]} {tokens[i - 2]} {tokens[i - 1]}"
+        three_two = f"{tokens[i - 3]} {tokens[i - 2]}"
+
+        for sequence in (one_zero, two_one_zero, two_one, three_two_one, three_two):
+            if sequence in self._idioms:
+                valence = self._idioms[sequence]
+                break
+
+        if len(tokens) - 1 > i:
+            zero_one = f"{tokens[i]} {tokens[i + 1]}"
+            if zero_one in self._idioms:
+                valence = self._idioms[zero_one]
+        if len(tokens) - 1 > i + 1:
+            zero_one_two = f"{tokens[i]} {tokens[i + 1]} {tokens[i + 2]}"
+            if zero_one_two in self._idioms:
+                valence = self._idioms[zero_one_two]
+
+        if three_two in self._multiword_boosters or two_one in self._multiword_boosters:
+            valence = valence + VaderConstants.B_DECR
+        return valence
+
+    def _least_check(self, valence: float, lowered: List[str], i: int) -> float:
+        """Negate the valence after 'least', except in 'at least' and 'very least'."""
+        if i > 0 and lowered[i - 1] == "least" and self._lookup("least")[0] is None:
+            if i == 1 or lowered[i - 2] not in ("at", "very"):
+                valence = valence * VaderConstants.N_SCALAR
+        return valence
+
+    @staticmethod
+    def _score_valence(sentiments: List[float], text: str) -> Dict[str, float]:
+        """Turn token valences into the neg/neu/pos/compound scores, as NLTK does."""
+        if not sentiments:
+            return {"neg": 0.0, "neu": 0.0, "pos": 0.0, "compound": 0.0}
+
+        sum_s = float(sum(sentiments))
+
+        ep_count = min(text.count("!"), 4)
+        qm_count = text.count("?")
+        qm_amplifier = 0 if qm_count <= 1 else qm_count * 0.18 if qm_count <= 3 else 0.96
+        punct_emph_amplifier = ep_count * 0.292 + qm_amplifier
+
+        if sum_s > 0:
+            sum_s += punct_emph_amplifier
+        elif sum_s < 0:
+            sum_s -= punct_emph_amplifier
+        compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+        pos_sum = 0.0
+        neg_sum = 0.0
+        neu_count = 0
+        for sentiment in sentiments:
+            if sentiment > 0:
+                pos_sum += float(sentiment) + 1
+            if sentiment < 0:
+                neg_sum += float(sentiment) - 1
+            if sentiment == 0:
+                neu_count += 1
+
+        if pos_sum > math.fabs(neg_sum):
+            pos_sum += punct_emph_amplifier
+        elif pos_sum < math.fabs(neg_sum):
+            neg_sum -= punct_emph_amplifier
+
+        total = pos_sum + math.fabs(neg_sum) + neu_count
+        return {
+            "neg": round(math.fabs(neg_sum / total), 3),
+            "neu": round(math.fabs(neu_count / total), 3),
+            "pos": round(math.fabs(pos_sum / total), 3),
+            "compound": round(compound, 4),
+        }
+
+
+SENTIMENT_ENGINES = ("nltk", "compiled")
+SENTIMENT_OUTPUTS = ("copy", "attach", "scores")
+
+
+def _as_text(value: object) -> str:
+    """Text of a 'full_text' cell; a missing Arrow string reads as None did in an object column."""
+    return str(None if value is pd.NA else value)
+
+
+def _create_scorer(engine: str) -> Union[SentimentIntensityAnalyzer, CompiledVaderScorer]:
+    """
+    Create the scorer of a sentiment engine.
+
+    Args:
+        engine: 'nltk' for NLTK's analyzer, 'compiled' for CompiledVaderScorer
+
+    Returns:
+        An object with a polarity_scores(text) method
+    """
+    analyzer = SentimentIntensityAnalyzer()
+    if engine == "compiled":
+        return CompiledVaderScorer(analyzer.lexicon)
+    return analyzer
+
+
+# Scorer of a scoring worker process, created once per process by _init_sentiment_worker
+_worker_analyzer: Optional[Union[SentimentIntensityAnalyzer, CompiledVaderScorer]] = None
+
+
+def _init_sentiment_worker(engine: str = "nltk") -> None:
+    """Load the VADER lexicon once when a scoring worker process starts."""
+    global _worker_analyzer
+    NLTKResourceManager.ensure_vader_lexicon()
+    _worker_analyzer = _create_scorer(engine)
+
+
+def _score_chunk(texts: List[str]) -> List[Dict[str, float]]:
+    """
+    Score a chunk of texts in a worker process.
+
+    Args:
+        texts: Texts to score
+
+    Returns:
+        VADER polarity scores of each text, in input order
+    """
+    if isinstance(_worker_analyzer, CompiledVaderScorer):
+        return _worker_analyzer.score_batch(texts)
+    return [_worker_analyzer.polarity_scores(text) for text in texts]
+
+
+def verify_compiled_engine(
+        csv_path: str = "./data/processed/articles_with_sentiment_score.csv",
+        tolerance: float = 1e-4
+) -> float:
+    """
+    Check that CompiledVaderScorer matches NLTK's compound scores on stored articles.
+
+    Args:
+        csv_path: CSV file with a 'full_text' column
+        tolerance: Largest accepted absolute difference of a compound score
+
+    Returns:
+        The largest absolute difference found
+
+    Raises:
+        ValueError: If any compound score differs by more than the tolerance
+    """
+    NLTKResourceManager.ensure_vader_lexicon()
+    analyzer = SentimentIntensityAnalyzer()
+    scorer = CompiledVaderScorer(analyzer.lexicon)
+
+    texts = [str(x) for x in pd.read_csv(csv_path, usecols=["full_text"])["full_text"]]
+    compiled_scores = scorer.score_batch(texts)
+    max_difference = max(
+        (abs(analyzer.polarity_scores(text)["compound"] - compiled["compound"])
+         for text, compiled in zip(texts, compiled_scores)),
+        default=0.0
+    )
+
+    logger.info("Compiled engine max compound difference on %d articles: %g", len(texts), max_difference)
+    if max_difference > tolerance:
+        raise ValueError(f"Compiled engine differs from NLTK by {max_difference} (tolerance {tolerance})")
+    return max_difference
 
 
 class NewsSentimentAnalyzer:
@@ -45,55 +412,209 @@ class NewsSentimentAnalyzer:
     def __init__(
             self,
             full_output_path: str = "./data/processed/articles_with_sentiment_score.csv",
+            n_workers: Optional[int] = 1,
+            chunk_size: int = 64,
+            memo: Optional[SentimentMemo] = None,
+            engine: str = "nltk",
+            parquet_output_path: str = "./data/processed/articles_with_sentiment_parquet",
+            sqlite_output_path: str = "./data/insights.sqlite",
     ) -> None:
         """
         Initialize the sentiment analyzer.
 
         Args:
             full_output_path: Path to save the full sentiment analysis results
+            n_workers: Number of scoring processes. 1 scores in this process,
+                       None uses one process per CPU core
+            chunk_size: Number of articles sent to a worker process at a time
+            memo: Optional persistent memo table. Texts already scored by the same
+                  analyzer version are read from it instead of being rescored
+            engine: Scoring engine, 'nltk' (SentimentIntensityAnalyzer) or 'compiled'
+                    (CompiledVaderScorer, much faster on long texts)
+            parquet_output_path: Directory of the Parquet dataset written by export_to_parquet
+            sqlite_output_path: Database file written by export_to_sqlite
+
+        Raises:
+            ValueError: If n_workers or chunk_size is lower than 1, or the engine is unknown
         """
+        if n_workers is not None and n_workers < 1:
+            raise ValueError("n_workers must be at least 1")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if engine not in SENTIMENT_ENGINES:
+            raise ValueError(f"Unknown sentiment engine: {engine}. Must be one of {SENTIMENT_ENGINES}")
+
         NLTKResourceManager.ensure_vader_lexicon()
 
-        self._sentiment_analyzer = SentimentIntensityAnalyzer()
+        self._engine = engine
+        self._sentiment_analyzer = _create_scorer(engine)
         self._full_output_path = full_output_path
+        self._parquet_output_path = parquet_output_path
+        self._sqlite_output_path = sqlite_output_path
+        self._n_workers = n_workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._memo = memo
+        self._analyzer_version: Optional[str] = None
 
         Path(self._full_output_path).parent.mkdir(parents=True, exist_ok=True)
 
-    def calculate_articles_sentiment(self, news_data: DataFrame) -> DataFrame:
+    @property
+    def analyzer_version(self) -> str:
+        """Identifier of the NLTK version and lexicon contents used for scoring."""
+        if self._analyzer_version is None:
+            lexicon = repr(sorted(self._sentiment_analyzer.lexicon.items()))
+            lexicon_digest = hashlib.sha256(lexicon.encode("utf-8")).hexdigest()[:16]
+            self._analyzer_version = f"nltk-{nltk.__version__}-vader-{lexicon_digest}-{self._engine}"
+        return self._analyzer_version
+
+    def calculate_articles_sentiment(
+            self,
+            news_data: DataFrame,
+            include_components: bool = False,
+            output: str = "copy",
+            drop_full_text: bool = False
+    ) -> DataFrame:
         """
         Calculate sentiment for each article and store it in the dataframe.
 
+        Identical texts are scored once per call, and with a memo table texts scored
+        in earlier runs are not scored again. Articles with a 'canonical_hash' (see
+        NearDuplicateIndex.link) reuse the score of their canonical article when it is
+        in the same batch or in the memo table.
+
         Args:
             news_data: DataFrame containing news articles with at least 'full_text'
                       and 'publishedAt' columns
+            include_components: If True, also add the 'sentiment_neg', 'sentiment_neu'
+                                and 'sentiment_pos' columns
+            output: 'copy' returns a copy of news_data with the score columns added,
+                    'attach' adds them to news_data itself and returns it, and 'scores'
+                    returns only the score and 'date' columns, with the index of news_data.
+                    'attach' and 'scores' do not copy the article texts
+            drop_full_text: If True, the returned articles have no 'full_text' column
+                            (with 'attach' it is removed from news_data)
 
         Returns:
             DataFrame with added 'sentiment' and 'date' columns
 
         Raises:
-            ValueError: If required columns are missing
+            ValueError: If required columns are missing or the output mode is unknown
         """
         required_columns = ["full_text", "publishedAt"]
         missing_columns = [col for col in required_columns if col not in news_data.columns]
         if missing_columns:
             raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+        if output not in SENTIMENT_OUTPUTS:
+            raise ValueError(f"Unknown sentiment output: {output}. Must be one of {SENTIMENT_OUTPUTS}")
 
-        result_data = news_data.copy()
-
-        logger.info("Calculating sentiment for %d articles", len(result_data))
-        result_data["sentiment"] = result_data["full_text"].apply(
-            lambda x: self._sentiment_analyzer.polarity_scores(str(x))["compound"]
+        logger.info("Calculating sentiment for %d articles", len(news_data))
+        # Texts are converted one at a time; only the ones that need scoring are kept
+        text_hashes = [text_hash(_as_text(x)) for x in news_data["full_text"]]
+        canonical_hashes = (
+            [h if isinstance(h, str) else None for h in news_data["canonical_hash"]]
+            if "canonical_hash" in news_data.columns else [None] * len(text_hashes)
         )
 
-        result_data["date"] = pd.to_datetime(result_data["publishedAt"]).dt.date
+        lookup = set(text_hashes) | {h for h in canonical_hashes if h}
+        scores = self._memo.get_many(lookup, self.analyzer_version) if self._memo else {}
+
+        # Near-duplicates take the score of their canonical article when it is available
+        in_batch = set(text_hashes)
+        hashes = [
+            canonical if canonical and (canonical in scores or canonical in in_batch) else hash_
+            for hash_, canonical in zip(text_hashes, canonical_hashes)
+        ]
+        unseen: Dict[str, str] = {}
+        sources: Counter = Counter()
+        for hash_, own_hash, text in zip(hashes, text_hashes, news_data["full_text"]):
+            if hash_ in scores:
+                sources["memo"] += 1
+            elif hash_ != own_hash:
+                sources["canonical"] += 1
+            elif hash_ in unseen:
+                sources["batch_duplicate"] += 1
+            else:
+                sources["scored"] += 1
+                unseen[hash_] = _as_text(text)
+        for source, count in sources.items():
+            metrics.inc("sentiment_texts_total", count, result=source)
+        logger.info("%d distinct texts need scoring, %d served from memo", len(unseen), len(scores))
+
+        if unseen:
+            with metrics.timer("sentiment_scoring_seconds", engine=self._engine):
+                scored = self._score_texts(list(unseen.values()))
+            new_scores = dict(zip(unseen, scored))
+            if self._memo:
+                self._memo.put_many(new_scores, self.analyzer_version)
+            scores.update(new_scores)
+
+        if output == "scores":
+            result_data = DataFrame(index=news_data.index)
+        elif output == "attach":
+            result_data = news_data
+            if drop_full_text:
+                del result_data["full_text"]
+        else:
+            result_data = news_data.drop(columns="full_text") if drop_full_text else news_data.copy()
+
+        result_data["sentiment"] = [scores[hash_]["compound"] for hash_ in hashes]
+        if include_components:
+            for component in ("neg", "neu", "pos"):
+                result_data[f"sentiment_{component}"] = [scores[hash_][component] for hash_ in hashes]
+
+        result_data["date"] = pd.to_datetime(news_data["publishedAt"]).dt.date
+        metrics.inc("rows_processed_total", len(result_data), stage="calculate_articles_sentiment")
         return result_data
 
-    def export_to_csv(self, news_data: DataFrame) -> None:
+    def _score_texts(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Score texts in this process or, for large batches, on the process pool.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            VADER polarity scores of each text, in input order
+        """
+        if self._n_workers > 1 and len(texts) > self._chunk_size:
+            return self._score_in_parallel(texts)
+        if self._engine == "compiled":
+            return self._sentiment_analyzer.score_batch(texts)
+        return [self._sentiment_analyzer.polarity_scores(text) for text in texts]
+
+    def _score_in_parallel(self, texts: List[str]) -> List[Dict[str, float]]:
+        """
+        Score texts in chunks across a pool of worker processes.
+
+        Every worker runs the same VADER analyzer as the serial path, so the
+        scores are identical; only the work is spread over several cores.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            VADER polarity scores of each text, in input order
+        """
+        chunks = [texts[i:i + self._chunk_size] for i in range(0, len(texts), self._chunk_size)]
+        n_workers = min(self._n_workers, len(chunks))
+        logger.info("Scoring %d chunks of up to %d articles on %d processes",
+                    len(chunks), self._chunk_size, n_workers)
+
+        with ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_init_sentiment_worker,
+                initargs=(self._engine,)
+        ) as executor:
+            return [score for chunk_scores in executor.map(_score_chunk, chunks) for score in chunk_scores]
+
+    def export_to_csv(self, news_data: DataFrame, append: bool = False) -> None:
         """
         Export both detailed and aggregated sentiment data to CSV files.
 
         Args:
             news_data: DataFrame with article-level sentiment data
+            append: If True, add only articles whose URL is not in the file yet
+                    instead of rewriting it (incremental mode)
 
         Raises:
             IOError: If there's an issue writing the files
@@ -105,12 +626,71 @@ class NewsSentimentAnalyzer:
                 file_exists = os.path.isfile(self._full_output_path)
 
                 logger.info(f"Exporting detailed sentiment data to {self._full_output_path} "
-                            f"({'appending' if file_exists else 'writing new file'})")
+                            f"({'appending' if append and file_exists else 'writing new file'})")
+
+                with metrics.timer("export_seconds", target="sentiment", format="csv"):
+                    if append:
+                        appended = append_new_rows_to_csv(news_data, self._full_output_path,
+                                                          date_format=PUBLISHED_AT_FORMAT)
+                        logger.info(f"Appended {appended} articles with sentiment")
+                    else:
+                        news_data.to_csv(
+                            self._full_output_path,
+                            date_format=PUBLISHED_AT_FORMAT
+                        )
+                metrics.inc("rows_exported_total", len(news_data), target="sentiment", format="csv")
+
+        except Exception as e:
+            logger.error(f"Error exporting data: {str(e)}")
+            raise IOError(f"Failed to export sentiment data: {str(e)}") from e
+
+    def export_to_parquet(self, news_data: DataFrame, ticker: Optional[str] = None, append: bool = False) -> None:
+        """
+        Export article-level sentiment data to a Parquet dataset partitioned by ticker and date.
+
+        Readers can then load e.g. one ticker's scores for a month without
+        decoding the article bodies (see ParquetStore.read).
+
+        Args:
+            news_data: DataFrame with article-level sentiment data
+            ticker: Ticker the articles are about, if news_data has no 'ticker' column
+            append: If True, keep the stored scores of the partitions written,
+                    replacing those with the URL of a new article (incremental mode)
+
+        Raises:
+            IOError: If there's an issue writing the files
+        """
+        try:
+            with metrics.timer("export_seconds", target="sentiment", format="parquet"):
+                partitioned = add_partition_columns(export_frame(news_data), "publishedAt", ticker=ticker)
+                ParquetStore(self._parquet_output_path).write(partitioned, append=append, key="url")
+            metrics.inc("rows_exported_total", len(news_data), target="sentiment", format="parquet")
+        except Exception as e:
+            logger.error(f"Error exporting data: {str(e)}")
+            raise IOError(f"Failed to export sentiment data: {str(e)}") from e
+
+    def export_to_sqlite(self, news_data: DataFrame, ticker: Optional[str] = None) -> None:
+        """
+        Upsert article-level sentiment scores into the SQLite store, keyed by URL.
 
-                news_data.to_csv(
-                    self._full_output_path
-                )
+        Readers can then load e.g. one ticker's scores for a month through
+        SQLiteStore.read_sentiment instead of reading the whole CSV.
 
+        Args:
+            news_data: DataFrame with article-level sentiment data
+            ticker: Ticker the articles are about, if news_data has no 'ticker' column
+
+        Raises:
+            IOError: If there's an issue writing the database
+        """
+        try:
+            with metrics.timer("export_seconds", target="sentiment", format="sqlite"):
+                store = SQLiteStore(self._sqlite_output_path)
+                try:
+                    store.upsert_sentiment(news_data, ticker=ticker)
+                finally:
+                    store.close()
+            metrics.inc("rows_exported_total", len(news_data), target="sentiment", format="sqlite")
         except Exception as e:
             logger.error(f"Error exporting data: {str(e)}")
             raise IOError(f"Failed to export sentiment data: {str(e)}") from e
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Mapping
+
+logger = logging.getLogger(__name__)
+
+SCORE_COMPONENTS = ("neg", "neu", "pos", "compound")
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash an article text after normalizing its whitespace.
+
+    Only whitespace is normalized: VADER splits on whitespace and is sensitive to
+    case and punctuation, so texts with the same hash always get the same scores.
+
+    Args:
+        text: Article text
+
+    Returns:
+        Hex SHA-256 digest of the normalized text
+    """
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class SentimentMemo:
+    """
+    Persistent memo table of sentiment scores keyed by text hash and analyzer version.
+
+    Every VADER component (neg, neu, pos, compound) is stored, so features built
+    on any of them can be read back without rescoring. Including the analyzer
+    version in the key keeps scores from an older lexicon from being reused.
+    """
+
+    def __init__(self, path: str = "./data/cache/sentiment_memo.sqlite") -> None:
+        """
+        Initialize the memo table, creating the database file if needed.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_memo (
+                text_hash TEXT NOT NULL,
+                analyzer_version TEXT NOT NULL,
+                neg REAL NOT NULL,
+                neu REAL NOT NULL,
+                pos REAL NOT NULL,
+                compound REAL NOT NULL,
+                PRIMARY KEY (text_hash, analyzer_version)
+            )
+        """)
+        self._connection.commit()
+        logger.info(f"SentimentMemo opened at {self.path}")
+
+    def get_many(self, hashes: Iterable[str], analyzer_version: str) -> Dict[str, Dict[str, float]]:
+        """
+        Look up the scores of several texts.
+
+        Args:
+            hashes: Text hashes as returned by text_hash
+            analyzer_version: Version of the analyzer that produced the scores
+
+        Returns:
+            Mapping from text hash to its score components, for the hashes found
+        """
+        hashes = list(hashes)
+        found: Dict[str, Dict[str, float]] = {}
+
+        with self._lock:
+            # Stay well below SQLite's limit on the number of bound parameters
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._connection.execute(
+                    f"SELECT text_hash, neg, neu, pos, compound FROM sentiment_memo "
+                    f"WHERE analyzer_version = ? AND text_hash IN ({placeholders})",
+                    [analyzer_version, *batch]
+                )
+                for row in rows:
+                    found[row[0]] = dict(zip(SCORE_COMPONENTS, row[1:]))
+
+        return found
+
+    def put_many(self, scores: Mapping[str, Mapping[str, float]], analyzer_version: str) -> None:
+        """
+        Store the scores of several texts.
+
+        Args:
+            scores: Mapping from text hash to VADER polarity scores
+            analyzer_version: Version of the analyzer that produced the scores
+        """
+        rows: List[tuple] = [
+            (hash_, analyzer_version, *(score[component] for component in SCORE_COMPONENTS))
+            for hash_, score in scores.items()
+        ]
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sentiment_memo "
+                "(text_hash, analyzer_version, neg, neu, pos, compound) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
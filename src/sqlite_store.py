@@ -0,0 +1,387 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime]
+
+# DataFrame column -> SQLite column of every table; columns not listed are not stored
+ARTICLE_COLUMNS = {
+    "url": "url",
+    "ticker": "ticker",
+    "publishedAt": "published_at",
+    "date": "date",
+    "source_name": "source_name",
+    "author": "author",
+    "title": "title",
+    "description": "description",
+    "content": "content",
+    "full_text": "full_text",
+    "urlToImage": "url_to_image",
+    "duplicate_of": "duplicate_of",
+    "matched_queries": "matched_queries",
+}
+SENTIMENT_COLUMNS = {
+    "url": "url",
+    "ticker": "ticker",
+    "publishedAt": "published_at",
+    "date": "date",
+    "title": "title",
+    "sentiment": "sentiment",
+    "sentiment_neg": "sentiment_neg",
+    "sentiment_neu": "sentiment_neu",
+    "sentiment_pos": "sentiment_pos",
+}
+PRICE_COLUMNS = {
+    "ticker": "ticker",
+    "Date": "date",
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+_KEYS = {
+    "articles": ("url",),
+    "article_sentiment": ("url",),
+    "prices": ("ticker", "date"),
+}
+
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS articles (
+        url TEXT PRIMARY KEY,
+        ticker TEXT,
+        published_at TEXT,
+        date TEXT,
+        source_name TEXT,
+        author TEXT,
+        title TEXT,
+        description TEXT,
+        content TEXT,
+        full_text TEXT,
+        url_to_image TEXT,
+        duplicate_of TEXT,
+        matched_queries TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_articles_ticker_published ON articles (ticker, published_at);
+    CREATE INDEX IF NOT EXISTS idx_articles_date ON articles (date);
+
+    CREATE TABLE IF NOT EXISTS article_sentiment (
+        url TEXT PRIMARY KEY,
+        ticker TEXT,
+        published_at TEXT,
+        date TEXT,
+        title TEXT,
+        sentiment REAL,
+        sentiment_neg REAL,
+        sentiment_neu REAL,
+        sentiment_pos REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_sentiment_ticker_published ON article_sentiment (ticker, published_at);
+    CREATE INDEX IF NOT EXISTS idx_sentiment_date ON article_sentiment (date);
+
+    CREATE TABLE IF NOT EXISTS prices (
+        ticker TEXT NOT NULL,
+        date TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        adj_close REAL,
+        volume REAL,
+        PRIMARY KEY (ticker, date)
+    );
+    CREATE INDEX IF NOT EXISTS idx_prices_date ON prices (date);
+"""
+
+
+def _day(value: DateLike) -> str:
+    """'YYYY-MM-DD' of a date, datetime or ISO string."""
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def _next_day(value: DateLike) -> str:
+    """'YYYY-MM-DD' of the day after value, the exclusive upper bound of an inclusive end date."""
+    return (datetime.strptime(_day(value), "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def _to_sql_value(value: Any) -> Any:
+    """Convert a DataFrame cell to a value SQLite can bind."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, "item"):
+        # numpy scalars
+        return value.item()
+    return value
+
+
+class SQLiteStore:
+    """
+    Indexed SQLite database of the articles, their sentiment scores and the stock prices.
+
+    The flat file exports are always read whole; this store is written with bulk
+    upserts (re-running a day updates its rows instead of duplicating them) and
+    read by slice. Articles and scores are indexed on (ticker, published_at) and
+    on date, prices on (ticker, date) and date, so loading one ticker's month
+    only touches the matching rows.
+
+    Timestamps are stored as ISO strings, which sort and compare chronologically.
+    """
+
+    def __init__(self, path: str = "./data/insights.sqlite") -> None:
+        """
+        Open the database, creating the file, tables and indexes if needed.
+
+        Args:
+            path: Path of the SQLite database file
+        """
+        self.path = path
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Durable at every checkpoint, without an fsync per upsert batch
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._connection.commit()
+        logger.info(f"SQLiteStore opened at {self.path}")
+
+    def upsert_articles(self, df: DataFrame, ticker: Optional[str] = None) -> int:
+        """
+        Insert or update processed articles, keyed by URL.
+
+        Args:
+            df: Processed articles with at least 'url' and 'publishedAt' columns
+            ticker: Ticker the articles are about, if df has no 'ticker' column
+
+        Returns:
+            Number of rows written
+        """
+        return self._upsert("articles", self._with_keys(df, ticker), ARTICLE_COLUMNS)
+
+    def upsert_sentiment(self, df: DataFrame, ticker: Optional[str] = None) -> int:
+        """
+        Insert or update article sentiment scores, keyed by URL.
+
+        Only the score columns present in df are written, so scoring without
+        components does not erase components stored earlier.
+
+        Args:
+            df: Scored articles with 'url', 'publishedAt' and 'sentiment' columns
+            ticker: Ticker the articles are about, if df has no 'ticker' column
+
+        Returns:
+            Number of rows written
+        """
+        return self._upsert("article_sentiment", self._with_keys(df, ticker), SENTIMENT_COLUMNS)
+
+    def upsert_prices(self, df: DataFrame) -> int:
+        """
+        Insert or update price bars, keyed by ticker and bar timestamp.
+
+        Args:
+            df: Long-format prices with 'ticker', 'Date' and OHLCV columns (see to_long_format)
+
+        Returns:
+            Number of rows written
+        """
+        return self._upsert("prices", df, PRICE_COLUMNS)
+
+    def read_articles(
+            self,
+            ticker: Optional[str] = None,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None,
+            columns: Optional[Sequence[str]] = None
+    ) -> DataFrame:
+        """
+        Read a slice of the processed articles, ordered by publication time.
+
+        Args:
+            ticker: Only articles about this ticker
+            start: First publication day (inclusive)
+            end: Last publication day (inclusive)
+            columns: DataFrame columns to load, e.g. ['url', 'title'] (all if None)
+
+        Returns:
+            DataFrame with the selected articles and columns
+        """
+        articles = self._read("articles", ARTICLE_COLUMNS, "published_at", ticker, start, end, columns)
+        if "matched_queries" in articles.columns:
+            articles["matched_queries"] = articles["matched_queries"].map(
+                lambda value: json.loads(value) if isinstance(value, str) else value
+            )
+        return articles
+
+    def read_sentiment(
+            self,
+            ticker: Optional[str] = None,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None,
+            columns: Optional[Sequence[str]] = None
+    ) -> DataFrame:
+        """
+        Read a slice of the article sentiment scores, ordered by publication time.
+
+        Args:
+            ticker: Only articles about this ticker
+            start: First publication day (inclusive)
+            end: Last publication day (inclusive)
+            columns: DataFrame columns to load, e.g. ['date', 'sentiment'] (all if None)
+
+        Returns:
+            DataFrame with the selected scores; 'date' holds datetime.date values
+            as in NewsSentimentAnalyzer.calculate_articles_sentiment
+        """
+        scores = self._read("article_sentiment", SENTIMENT_COLUMNS, "published_at", ticker, start, end, columns)
+        if "date" in scores.columns:
+            scores["date"] = pd.to_datetime(scores["date"]).dt.date
+        return scores
+
+    def read_prices(
+            self,
+            ticker: Optional[str] = None,
+            start: Optional[DateLike] = None,
+            end: Optional[DateLike] = None,
+            columns: Optional[Sequence[str]] = None
+    ) -> DataFrame:
+        """
+        Read a slice of the price bars, ordered by ticker and date.
+
+        Args:
+            ticker: Only bars of this ticker
+            start: First day (inclusive)
+            end: Last day (inclusive)
+            columns: DataFrame columns to load (all if None)
+
+        Returns:
+            Long-format DataFrame with 'ticker', 'Date' and OHLCV columns
+        """
+        prices = self._read("prices", PRICE_COLUMNS, "date", ticker, start, end, columns)
+        if columns is None and not prices.empty:
+            # e.g. 'Adj Close', which not every download includes
+            prices = prices.dropna(axis=1, how="all")
+        if "Date" in prices.columns:
+            prices["Date"] = pd.to_datetime(prices["Date"])
+        return prices
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _with_keys(df: DataFrame, ticker: Optional[str]) -> DataFrame:
+        """
+        Add the 'ticker' and the UTC 'date' of publication the article tables are indexed on.
+
+        Raises:
+            ValueError: If there is neither a 'ticker' column nor a ticker argument
+        """
+        if "ticker" not in df.columns and ticker is None:
+            raise ValueError("A ticker is required to store articles without a 'ticker' column")
+        published = pd.to_datetime(df["publishedAt"], utc=True)
+        keyed = df.assign(publishedAt=published.dt.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                          date=published.dt.strftime("%Y-%m-%d"))
+        if "ticker" not in keyed.columns:
+            keyed["ticker"] = ticker
+        return keyed
+
+    def _upsert(self, table: str, df: DataFrame, column_map: Dict[str, str]) -> int:
+        """
+        Write the mapped columns of df with one INSERT ... ON CONFLICT DO UPDATE batch.
+
+        Raises:
+            ValueError: If a key column of the table is missing
+        """
+        frame_columns = [col for col in column_map if col in df.columns]
+        sql_columns = [column_map[col] for col in frame_columns]
+        keys = _KEYS[table]
+        missing_keys = [key for key in keys if key not in sql_columns]
+        if missing_keys:
+            raise ValueError(f"Missing key columns for {table}: {', '.join(missing_keys)}")
+        if df.empty:
+            return 0
+
+        updates = [col for col in sql_columns if col not in keys]
+        sql = (
+            f"INSERT INTO {table} ({', '.join(sql_columns)}) VALUES ({', '.join('?' * len(sql_columns))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO "
+            + (f"UPDATE SET {', '.join(f'{col} = excluded.{col}' for col in updates)}" if updates else "NOTHING")
+        )
+        rows = [
+            tuple(_to_sql_value(value) for value in row)
+            for row in df[frame_columns].itertuples(index=False, name=None)
+        ]
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(sql, rows)
+        logger.info(f"Upserted {len(rows)} rows into {table} at {self.path}")
+        return len(rows)
+
+    def _read(
+            self,
+            table: str,
+            column_map: Dict[str, str],
+            time_column: str,
+            ticker: Optional[str],
+            start: Optional[DateLike],
+            end: Optional[DateLike],
+            columns: Optional[Sequence[str]]
+    ) -> DataFrame:
+        """
+        Select rows of a table by ticker and day range, with the DataFrame column names.
+
+        The range is applied to the time column, so it uses the (ticker, time)
+        index together with the ticker, and the date index otherwise.
+
+        Raises:
+            ValueError: If a requested column is not stored
+        """
+        columns = list(columns) if columns else list(column_map)
+        unknown = [col for col in columns if col not in column_map]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+
+        conditions: List[str] = []
+        params: List[Any] = []
+        if ticker is not None:
+            conditions.append("ticker = ?")
+            params.append(ticker)
+        range_column = time_column if ticker is not None else "date"
+        if start is not None:
+            conditions.append(f"{range_column} >= ?")
+            params.append(_day(start))
+        if end is not None:
+            conditions.append(f"{range_column} < ?")
+            params.append(_next_day(end))
+
+        select = ", ".join(f'{column_map[col]} AS "{col}"' for col in columns)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        order = "ticker, date" if table == "prices" else time_column
+        sql = f"SELECT {select} FROM {table}{where} ORDER BY {order}"
+
+        with self._lock:
+            cursor = self._connection.execute(sql, params)
+            rows: List[Tuple] = cursor.fetchall()
+        logger.info(f"Read {len(rows)} rows from {table} at {self.path}")
+        return pd.DataFrame(rows, columns=columns)
@@ -1,17 +1,67 @@
 import logging
+from typing import List, Optional
+
+import pandas as pd
 from pandas import DataFrame
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from src.columnar_store import ParquetStore, add_partition_columns
+from src.metrics import metrics
+from src.sqlite_store import SQLiteStore
+
 logger = logging.getLogger(__name__)
 
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+
+
+def to_long_format(df: DataFrame, ticker: Optional[str] = None) -> DataFrame:
+    """
+    Convert a yfinance frame to a flat long-format frame with one row per ticker and bar.
+
+    yfinance returns (Price, Ticker) multi-index columns, which is what forces the
+    ``skiprows=[1]`` and numeric coercion when the CSV export is read back. The long
+    format has flat columns: 'ticker', 'Date' and the OHLCV columns present.
+
+    Args:
+        df (DataFrame): yfinance frame, with the date as index or as a 'Date'/'Datetime' column
+        ticker (str, optional): Ticker of a frame with flat single-ticker columns
+
+    Returns:
+        DataFrame: Long-format frame sorted by ticker and date
+
+    Raises:
+        ValueError: If the frame has flat columns and no ticker is given
+    """
+    if not isinstance(df.columns, pd.MultiIndex):
+        if ticker is None and "ticker" not in df.columns:
+            raise ValueError("A ticker is required for a frame with flat columns")
+        flat = df.reset_index() if "Date" not in df.columns and "Datetime" not in df.columns else df.copy()
+        flat = flat.rename(columns={"Datetime": "Date"})
+        if "ticker" not in flat.columns:
+            flat.insert(0, "ticker", ticker)
+        return flat
+
+    if "Date" not in df.columns.get_level_values(0) and "Datetime" not in df.columns.get_level_values(0):
+        df = df.reset_index()
+    df = df.rename(columns={"Datetime": "Date"}, level=0)
+
+    long_df = (
+        df.set_index("Date")
+        .rename_axis(columns=["Price", "Ticker"])
+        .stack(level="Ticker", future_stack=True)
+        .reset_index()
+        .rename(columns={"Ticker": "ticker"})
+    )
+    long_df.columns.name = None
+    columns = ["ticker", "Date"] + [col for col in PRICE_COLUMNS if col in long_df.columns]
+    return long_df[columns].dropna(subset=["Close"]).sort_values(["ticker", "Date"]).reset_index(drop=True)
+
+
 class StockDataHandler:
     def __init__(self):
         self.csv_path: str = f"./data/processed/stock_data.csv"
         self.excel_path: str = f"./data/processed/stock_data.xlsx"
+        self.parquet_path: str = f"./data/processed/stock_data_parquet"
+        self.sqlite_path: str = f"./data/insights.sqlite"
         logger.info(f"StockDataHandler initialized with CSV path {self.csv_path} and Excel path {self.excel_path}")
 
     def export_to_csv(self, df: DataFrame) -> bool:
@@ -29,13 +79,40 @@ class StockDataHandler:
         """
         logger.info(f"Exporting data to CSV at {self}")
         try:
-            df.to_csv(self.csv_path, index=False, encoding='utf-8')
+            with metrics.timer("export_seconds", target="stock", format="csv"):
+                df.to_csv(self.csv_path, index=False, encoding='utf-8')
+            metrics.inc("rows_exported_total", len(df), target="stock", format="csv")
             logger.info("Successfully exported data to CSV")
             return True
         except Exception as e:
             logger.error(f"Error exporting data to CSV: {e}")
             raise IOError(f"Error exporting data to CSV at {self.csv_path}: {e}")
 
+    def read_csv(self) -> DataFrame:
+        """
+        Read the exported CSV back as a long-format frame.
+
+        Handles both long-format exports and yfinance exports, whose second header
+        row holds the ticker of every price column.
+
+        Returns:
+            DataFrame: Long-format frame with 'ticker', 'Date' and OHLCV columns
+
+        Raises:
+            IOError: If the file cannot be read
+        """
+        logger.info(f"Reading stock data from {self.csv_path}")
+        try:
+            header = pd.read_csv(self.csv_path, nrows=1)
+            if "ticker" in header.columns:
+                return pd.read_csv(self.csv_path, parse_dates=["Date"])
+            ticker = str(header.iloc[0, 1])
+            df = pd.read_csv(self.csv_path, skiprows=[1], parse_dates=["Date"])
+            return to_long_format(df, ticker=ticker)
+        except Exception as e:
+            logger.error(f"Error reading stock data from CSV: {e}")
+            raise IOError(f"Error reading stock data from {self.csv_path}: {e}")
+
     def export_to_excel(self, df: DataFrame) -> bool:
         """
         Export dataframe to Excel format.
@@ -51,37 +128,107 @@ class StockDataHandler:
         """
         logger.info(f"Exporting data to Excel at {self.excel_path}")
         try:
-            df.to_excel(self.excel_path, index=False)
+            with metrics.timer("export_seconds", target="stock", format="excel"):
+                df.to_excel(self.excel_path, index=False)
+            metrics.inc("rows_exported_total", len(df), target="stock", format="excel")
             logger.info("Successfully exported data to Excel")
             return True
         except Exception as e:
             logger.error(f"Error exporting data to Excel {e}")
             raise IOError(f"Error exporting data to Excel at {self.excel_path}: {e}")
 
-    def export_to_all_formats(self, df: DataFrame) -> dict:
+    def export_to_parquet(self, df: DataFrame, ticker: Optional[str] = None) -> bool:
+        """
+        Export dataframe to a Parquet dataset partitioned by ticker and date.
+
+        Args:
+            df (DataFrame): Pandas DataFrame containing stock data, as returned by yfinance
+            ticker (str, optional): Ticker of a frame with flat single-ticker columns
+
+        Returns:
+            bool: True if export was successful, False otherwise
+
+        Raises:
+            IOError: If there's an issue writing to the specified path
+        """
+        logger.info(f"Exporting data to Parquet at {self.parquet_path}")
+        try:
+            with metrics.timer("export_seconds", target="stock", format="parquet"):
+                long_df = to_long_format(df, ticker=ticker)
+                ParquetStore(self.parquet_path).write(add_partition_columns(long_df, "Date"))
+            metrics.inc("rows_exported_total", len(long_df), target="stock", format="parquet")
+            logger.info("Successfully exported data to Parquet")
+            return True
+        except Exception as e:
+            logger.error(f"Error exporting data to Parquet: {e}")
+            raise IOError(f"Error exporting data to Parquet at {self.parquet_path}: {e}")
+
+    def export_to_sqlite(self, df: DataFrame, ticker: Optional[str] = None) -> bool:
         """
-        Export dataframe to all supported formats.
+        Upsert the bars into the SQLite store, keyed by ticker and date.
+
+        Args:
+            df (DataFrame): Pandas DataFrame containing stock data, as returned by yfinance
+            ticker (str, optional): Ticker of a frame with flat single-ticker columns
+
+        Returns:
+            bool: True if export was successful, False otherwise
+
+        Raises:
+            IOError: If there's an issue writing to the specified path
+        """
+        logger.info(f"Exporting data to SQLite at {self.sqlite_path}")
+        try:
+            with metrics.timer("export_seconds", target="stock", format="sqlite"):
+                long_df = to_long_format(df, ticker=ticker)
+                store = SQLiteStore(self.sqlite_path)
+                try:
+                    store.upsert_prices(long_df)
+                finally:
+                    store.close()
+            metrics.inc("rows_exported_total", len(long_df), target="stock", format="sqlite")
+            logger.info("Successfully exported data to SQLite")
+            return True
+        except Exception as e:
+            logger.error(f"Error exporting data to SQLite: {e}")
+            raise IOError(f"Error exporting data to SQLite at {self.sqlite_path}: {e}")
+
+    def export_to_all_formats(self, df: DataFrame, formats: Optional[List[str]] = None) -> dict:
+        """
+        Export dataframe to the selected formats.
 
         Args:
             df (DataFrame): Pandas DataFrame containing stock data
+            formats (list, optional): Formats to export to. Defaults to ['csv'] if None.
+                                      Valid values are 'csv', 'excel', 'parquet' and 'sqlite'
 
         Returns:
             dict: Dictionary with format names as keys and export status as values
+
+        Raises:
+            ValueError: If an invalid format is specified
         """
+        exporters = {
+            'csv': self.export_to_csv,
+            'excel': self.export_to_excel,
+            'parquet': self.export_to_parquet,
+            'sqlite': self.export_to_sqlite,
+        }
+        formats = [format_type.lower() for format_type in formats or ['csv']]
+        for format_type in formats:
+            if format_type not in exporters:
+                logger.error(f"Unsupported format specified: {format_type}")
+                raise ValueError(f"Unsupported export format: {format_type}")
+
         results = {}
 
-        logger.info("Starting export to all formats")
-        try:
-            results['csv'] = self.export_to_csv(df)
-        except IOError as e:
-            logger.warning(f"CSV export failed: {e}")
-            results['csv'] = False
-
-        """try:
-            results['excel'] = self.export_to_excel(df)
-        except IOError as e:
-            logger.warning(f"Excel export failed: {e}")
-            results['excel'] = False"""
+        logger.info(f"Starting export to formats: {', '.join(formats)}")
+        for format_type in formats:
+            try:
+                results[format_type] = exporters[format_type](df)
+            except IOError as e:
+                logger.warning(f"{format_type} export failed: {e}")
+                results[format_type] = False
 
         logger.info(f"Export results: {results}")
         return results
@@ -1,15 +1,32 @@
 import pandas as pd
 import yfinance as yf
 import logging
-from typing import List, Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+from src.metrics import metrics
+from src.price_store import PriceStore, period_to_range
+from src.stock_data_handler import to_long_format
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class BatchDownloadResult:
+    """
+    Result of a multi-ticker download.
+
+    Attributes:
+        data (pd.DataFrame): Long-format frame with flat columns 'ticker', 'Date' and OHLCV
+        failed (Dict[str, str]): Symbols without data, mapped to the reason
+    """
+
+    data: pd.DataFrame
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
 class YahooFinanceClient:
     """
     A client to fetch stock data from Yahoo Finance using the yfinance library.
@@ -24,7 +41,25 @@ class YahooFinanceClient:
     VALID_PERIODS = ['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max']
     VALID_INTERVALS = ['1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo']
 
-    def __init__(self, stock_symbol: str, period: str = '1mo', interval: str = '1d') -> None:
+    # Yahoo limits of intraday intervals: (max days per request, max days back from today)
+    INTRADAY_LIMITS = {
+        '1m': (7, 30),
+        '2m': (60, 60),
+        '5m': (60, 60),
+        '15m': (60, 60),
+        '30m': (60, 60),
+        '90m': (60, 60),
+        '60m': (730, 730),
+        '1h': (730, 730),
+    }
+
+    def __init__(
+            self,
+            stock_symbol: str,
+            period: str = '1mo',
+            interval: str = '1d',
+            store: Optional[PriceStore] = None
+    ) -> None:
         """
         Initialize the YahooFinanceClient object.
 
@@ -32,28 +67,120 @@ class YahooFinanceClient:
             stock_symbol (str): The ticker symbol for the stock
             period (str, optional): The time period to retrieve data for. Defaults to '1mo'.
             interval (str, optional): The data interval. Defaults to '1d'.
+            store (PriceStore, optional): Local price store. If given, only the date ranges
+                                          missing from the store are downloaded
 
         Raises:
             ValueError: If the provided period or interval is not valid
         """
         self.stock_symbol: str = stock_symbol
 
-        # Validate period and interval
-        if period not in self.VALID_PERIODS:
-            logger.error(f"Invalid period: {period}")
-            raise ValueError(f"Invalid period: {period}. Must be one of {self.VALID_PERIODS}")
-        if interval not in self.VALID_INTERVALS:
-            logger.error(f"Invalid interval: {interval}")
-            raise ValueError(f"Invalid interval: {interval}. Must be one of {self.VALID_INTERVALS}")
+        self._validate(period, interval)
 
         self.period: str = period
         self.interval: str = interval
+        self.store: Optional[PriceStore] = store
         logger.info(f"YahooFinanceClient initialized for {self.stock_symbol} with period={self.period}, interval={self.interval}")
 
+    @classmethod
+    def _validate(cls, period: str, interval: str) -> None:
+        """
+        Validate the period and interval parameters.
+
+        Args:
+            period (str): The time period to retrieve data for
+            interval (str): The data interval
+
+        Raises:
+            ValueError: If the provided period or interval is not valid
+        """
+        if period not in cls.VALID_PERIODS:
+            logger.error(f"Invalid period: {period}")
+            raise ValueError(f"Invalid period: {period}. Must be one of {cls.VALID_PERIODS}")
+        if interval not in cls.VALID_INTERVALS:
+            logger.error(f"Invalid interval: {interval}")
+            raise ValueError(f"Invalid interval: {interval}. Must be one of {cls.VALID_INTERVALS}")
+
+    @classmethod
+    def fetch_batch(
+            cls,
+            stock_symbols: List[str],
+            period: str = '1mo',
+            interval: str = '1d',
+            max_workers: int = 8,
+            batch_size: int = 100
+    ) -> BatchDownloadResult:
+        """
+        Fetch stock data for many symbols with bounded parallelism.
+
+        Symbols are downloaded in batches of batch_size, one yf.download call per
+        batch with at most max_workers requests in flight. Batches run one after
+        another because yfinance keeps per-call state in module globals. A symbol
+        without data, or a batch that fails as a whole, is reported in the result
+        instead of aborting the download.
+
+        Args:
+            stock_symbols (List[str]): Ticker symbols to fetch
+            period (str, optional): The time period to retrieve data for. Defaults to '1mo'.
+            interval (str, optional): The data interval. Defaults to '1d'.
+            max_workers (int, optional): Maximum concurrent requests. Defaults to 8.
+            batch_size (int, optional): Maximum symbols per yf.download call. Defaults to 100.
+
+        Returns:
+            BatchDownloadResult: Long-format data of all symbols and the failed symbols
+
+        Raises:
+            ValueError: If the period, interval, max_workers or batch_size is not valid
+        """
+        cls._validate(period, interval)
+        if max_workers < 1 or batch_size < 1:
+            raise ValueError("max_workers and batch_size must be at least 1")
+
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in stock_symbols))
+        logger.info(f"Fetching data for {len(symbols)} symbols (period={period}, interval={interval})")
+
+        frames: List[pd.DataFrame] = []
+        failed: Dict[str, str] = {}
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            try:
+                with metrics.timer("yahoo_download_seconds", mode="batch"):
+                    batch_data: pd.DataFrame = yf.download(
+                        tickers=batch,
+                        period=period,
+                        interval=interval,
+                        group_by='column',
+                        threads=min(max_workers, len(batch)),
+                        progress=False
+                    )
+                errors = dict(getattr(yf.shared, "_ERRORS", {}) or {})
+            except Exception as e:
+                logger.exception(f"Batch download failed for {len(batch)} symbols")
+                failed.update({symbol: f"Batch download failed: {e}" for symbol in batch})
+                continue
+
+            long_data = to_long_format(batch_data) if not batch_data.empty else pd.DataFrame()
+            received = set(long_data["ticker"]) if not long_data.empty else set()
+            for symbol in batch:
+                if symbol not in received:
+                    failed[symbol] = str(errors.get(symbol, "No data found"))
+            if not long_data.empty:
+                frames.append(long_data)
+
+        data = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["ticker", "Date"])
+        metrics.inc("rows_processed_total", len(data), stage="stock_download")
+        if failed:
+            logger.warning(f"No data for {len(failed)} symbols: {', '.join(sorted(failed))}")
+        logger.info(f"Successfully fetched {len(data)} rows for {len(symbols) - len(failed)} symbols")
+        return BatchDownloadResult(data=data, failed=failed)
+
     def fetch_stock_data(self) -> pd.DataFrame:
         """
         Fetch stock data for the specified symbol, period, and interval from Yahoo Finance.
 
+        With a price store, the missing date ranges are downloaded into the store and
+        the period is served from disk as a long-format frame (see fetch_from_store).
+
         Returns:
             pd.DataFrame: A pandas DataFrame containing the stock data with columns for
                          Open, High, Low, Close, Adj Close, and Volume
@@ -63,21 +190,26 @@ class YahooFinanceClient:
             ConnectionError: If there's a network issue connecting to Yahoo Finance
             Exception: For any other unexpected errors
         """
+        if self.store is not None:
+            return self.fetch_from_store()
+
         logger.info(f"Fetching data for {self.stock_symbol} (period={self.period}, interval={self.interval})")
         try:
             # Note: yfinance.download always returns a pandas DataFrame
-            stock_data: pd.DataFrame = yf.download(
-                tickers=self.stock_symbol,
-                period=self.period,
-                interval=self.interval,
-                progress=False  # Disable progress bar for cleaner output
-            )
+            with metrics.timer("yahoo_download_seconds", mode="period"):
+                stock_data: pd.DataFrame = yf.download(
+                    tickers=self.stock_symbol,
+                    period=self.period,
+                    interval=self.interval,
+                    progress=False  # Disable progress bar for cleaner output
+                )
 
             if stock_data.empty:
                 logger.warning(f"No data found for symbol: {self.stock_symbol}")
                 raise ValueError(f"No data found for symbol: {self.stock_symbol}")
 
             stock_data = stock_data.reset_index()
+            metrics.inc("rows_processed_total", len(stock_data), stage="stock_download")
 
             logger.info(f"Successfully fetched data for {self.stock_symbol}")
             return stock_data
@@ -91,3 +223,176 @@ class YahooFinanceClient:
         except Exception as e:
             logger.exception(f"Unexpected error fetching data for {self.stock_symbol}")
             raise Exception(f"Error fetching stock data: {str(e)}")
+
+    def fetch_from_store(self) -> pd.DataFrame:
+        """
+        Download the date ranges missing from the price store and read the period from it.
+
+        Returns:
+            pd.DataFrame: Long-format frame with 'ticker', 'Date' and OHLCV columns
+
+        Raises:
+            ValueError: If no price store is configured or no data is found
+            ConnectionError: If there's a network issue connecting to Yahoo Finance
+        """
+        if self.store is None:
+            raise ValueError("No price store configured")
+
+        start, end = period_to_range(self.period)
+        if self.interval in self.INTRADAY_LIMITS:
+            self.fetch_intraday(start, end)
+            start = max(start, self._earliest_intraday_start(end))
+            gaps = []
+        else:
+            gaps = self.store.missing_ranges(self.stock_symbol, self.interval, start, end)
+            metrics.inc("price_store_lookups_total", result="miss" if gaps else "hit")
+            logger.info(f"{len(gaps)} missing ranges for {self.stock_symbol} ({self.interval}) "
+                        f"between {start.date()} and {end.date()}")
+
+        for gap_start, gap_end in gaps:
+            try:
+                with metrics.timer("yahoo_download_seconds", mode="gap"):
+                    gap_data: pd.DataFrame = yf.download(
+                        tickers=self.stock_symbol,
+                        start=gap_start.to_pydatetime(),
+                        end=(gap_end + pd.Timedelta(days=1)).to_pydatetime(),
+                        interval=self.interval,
+                        progress=False
+                    )
+            except ConnectionError as e:
+                logger.error(f"ConnectionError fetching data for {self.stock_symbol}: {e}")
+                raise ConnectionError(f"Failed to connect to Yahoo Finance: {str(e)}")
+
+            bars = to_long_format(gap_data) if not gap_data.empty else pd.DataFrame(columns=["Date"])
+            metrics.inc("rows_processed_total", len(bars), stage="stock_download")
+            self.store.write(self.stock_symbol, self.interval, bars, covered=(gap_start, gap_end))
+
+        last_days = int(self.period[:-1]) if self.period.endswith("d") else None
+        stock_data = self.store.read(self.stock_symbol, self.interval, start, end, last_days=last_days)
+        if stock_data.empty:
+            logger.warning(f"No data found for symbol: {self.stock_symbol}")
+            raise ValueError(f"No data found for symbol: {self.stock_symbol}")
+
+        logger.info(f"Served {len(stock_data)} bars for {self.stock_symbol} from {self.store.root}")
+        return stock_data
+
+    def fetch_intraday(
+            self,
+            start: pd.Timestamp,
+            end: pd.Timestamp,
+            max_workers: int = 4,
+            window_days: Optional[int] = None
+    ) -> int:
+        """
+        Download a long intraday range into the price store in concurrent windows.
+
+        The ranges missing from the store are split into windows Yahoo accepts for the
+        interval (see INTRADAY_LIMITS), and the part of the range older than Yahoo
+        serves is skipped. Every window is merged into the store as soon as it
+        arrives, so at most max_workers windows are held in memory; bars repeated at
+        window edges are stored once. Only the window reaching the end of the range is
+        downloaded again on the next call, since its last bar may still be forming. A
+        failed window is logged and left uncovered, so the next call retries it.
+
+        Args:
+            start (pd.Timestamp): Start of the range (naive UTC)
+            end (pd.Timestamp): End of the range (naive UTC)
+            max_workers (int, optional): Maximum concurrent window downloads. Defaults to 4.
+            window_days (int, optional): Days per request, capped at the Yahoo limit
+
+        Returns:
+            int: Number of bars downloaded
+
+        Raises:
+            ValueError: If no price store is configured or the interval is not intraday
+            ConnectionError: If every window failed
+        """
+        if self.store is None:
+            raise ValueError("No price store configured")
+        if self.interval not in self.INTRADAY_LIMITS:
+            raise ValueError(f"Not an intraday interval: {self.interval}")
+
+        max_window, _ = self.INTRADAY_LIMITS[self.interval]
+        window = pd.Timedelta(days=min(window_days or max_window, max_window))
+
+        earliest = self._earliest_intraday_start(end)
+        if start < earliest:
+            logger.info(f"Yahoo serves {self.interval} bars from {earliest} only; skipping older data")
+            start = earliest
+
+        windows: List[Tuple[pd.Timestamp, pd.Timestamp]] = []
+        for gap_start, gap_end in self.store.missing_ranges(self.stock_symbol, self.interval, start, end):
+            window_start = gap_start
+            while window_start < gap_end:
+                windows.append((window_start, min(window_start + window, gap_end)))
+                window_start += window
+        metrics.inc("price_store_lookups_total", result="miss" if windows else "hit")
+        if not windows:
+            logger.info(f"No missing {self.interval} bars for {self.stock_symbol}")
+            return 0
+
+        logger.info(f"Downloading {len(windows)} {self.interval} windows for {self.stock_symbol} "
+                    f"with {max_workers} workers")
+        downloaded = 0
+        failures = 0
+        pending = iter(windows)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # At most max_workers windows are in flight; a finished window is stored and
+            # released before the next one is submitted
+            futures: Dict[Future, Tuple[pd.Timestamp, pd.Timestamp]] = {}
+            for w in islice(pending, max_workers):
+                futures[executor.submit(self._download_window, *w)] = w
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window_start, window_end = futures.pop(future)
+                    for w in islice(pending, 1):
+                        futures[executor.submit(self._download_window, *w)] = w
+                    try:
+                        bars = future.result()
+                    except Exception as e:
+                        failures += 1
+                        logger.error(f"Failed to fetch {self.stock_symbol} {self.interval} bars "
+                                     f"from {window_start} to {window_end}: {e}")
+                        continue
+                    self.store.write(
+                        self.stock_symbol,
+                        self.interval,
+                        bars,
+                        covered=(window_start, window_end),
+                        cap_at_newest=window_end >= end
+                    )
+                    downloaded += len(bars)
+                    del bars
+                del done
+
+        metrics.inc("rows_processed_total", downloaded, stage="stock_download")
+        if failures == len(windows):
+            raise ConnectionError(f"Failed to fetch any {self.interval} window for {self.stock_symbol}")
+        logger.info(f"Downloaded {downloaded} {self.interval} bars for {self.stock_symbol} "
+                    f"({failures} of {len(windows)} windows failed)")
+        return downloaded
+
+    def _earliest_intraday_start(self, end: pd.Timestamp) -> pd.Timestamp:
+        """Earliest start Yahoo accepts for the intraday interval, with a day of margin."""
+        _, max_lookback = self.INTRADAY_LIMITS[self.interval]
+        now = pd.Timestamp.now(tz="UTC").tz_localize(None)
+        return min(end, now) - pd.Timedelta(days=max_lookback - 1)
+
+    def _download_window(self, window_start: pd.Timestamp, window_end: pd.Timestamp) -> pd.DataFrame:
+        """
+        Download one intraday window.
+
+        Uses Ticker.history rather than yf.download, which keeps per-call state in
+        module globals and is not safe to call from several threads.
+        """
+        with metrics.timer("yahoo_download_seconds", mode="window"):
+            window_data = yf.Ticker(self.stock_symbol).history(
+                start=window_start.tz_localize("UTC").to_pydatetime(),
+                end=window_end.tz_localize("UTC").to_pydatetime(),
+                interval=self.interval,
+                raise_errors=True
+            )
+        if window_data.empty:
+            return pd.DataFrame(columns=["Date"])
+        return to_long_format(window_data, ticker=self.stock_symbol)
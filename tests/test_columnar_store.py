@@ -0,0 +1,43 @@
+import pandas as pd
+
+from src.columnar_store import ParquetStore, add_partition_columns
+
+
+def articles(*rows) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=["url", "publishedAt", "title"])
+    return add_partition_columns(frame, "publishedAt", ticker="AAPL")
+
+
+def stored(store: ParquetStore) -> pd.DataFrame:
+    return store.read(columns=["url", "title", "ticker", "date"]).sort_values("url", ignore_index=True)
+
+
+def test_append_keeps_rows_of_the_same_partition(tmp_path) -> None:
+    store = ParquetStore(str(tmp_path / "articles"))
+
+    store.write(articles(("u1", "2025-05-08T09:00:00Z", "first")), append=True, key="url")
+    store.write(articles(("u2", "2025-05-08T15:00:00Z", "second")), append=True, key="url")
+
+    assert stored(store)["url"].tolist() == ["u1", "u2"]
+
+
+def test_append_replaces_rows_with_the_same_key(tmp_path) -> None:
+    store = ParquetStore(str(tmp_path / "articles"))
+
+    store.write(articles(("u1", "2025-05-08T09:00:00Z", "first"),
+                         ("u2", "2025-05-09T09:00:00Z", "other day")), append=True, key="url")
+    store.write(articles(("u1", "2025-05-08T09:00:00Z", "updated")), append=True, key="url")
+
+    result = stored(store)
+    assert result["url"].tolist() == ["u1", "u2"]
+    assert result["title"].tolist() == ["updated", "other day"]
+
+
+def test_write_without_append_replaces_the_partition(tmp_path) -> None:
+    store = ParquetStore(str(tmp_path / "articles"))
+
+    store.write(articles(("u1", "2025-05-08T09:00:00Z", "first"),
+                         ("u3", "2025-05-09T09:00:00Z", "other day")))
+    store.write(articles(("u2", "2025-05-08T15:00:00Z", "second")))
+
+    assert stored(store)["url"].tolist() == ["u2", "u3"]
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from src.deduplication import NearDuplicateIndex
+
+BODY = "Shares of the company rose after it reported quarterly earnings above analyst expectations " * 3
+FAILED = "[Error extracting content: ValueError]"
+
+
+@pytest.fixture
+def index(tmp_path) -> NearDuplicateIndex:
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.sqlite"))
+    yield index
+    index.close()
+
+
+def test_placeholder_texts_are_not_linked(index: NearDuplicateIndex) -> None:
+    articles = pd.DataFrame({"url": ["a", "b", "c", "d", "e"], "full_text": [FAILED, FAILED, "", BODY, BODY]})
+
+    linked = index.link(articles)
+
+    assert linked["duplicate_of"].tolist() == [None, None, None, None, "d"]
+
+
+def test_existing_duplicate_links_are_kept(index: NearDuplicateIndex) -> None:
+    # 'b' is a title duplicate of 'a' and copied its failed extraction
+    articles = pd.DataFrame({
+        "url": ["a", "b", "c", "d"],
+        "full_text": [FAILED, FAILED, BODY, BODY],
+        "duplicate_of": [None, "a", None, None],
+    })
+
+    linked = index.link(articles)
+
+    assert linked["duplicate_of"].tolist() == [None, "a", None, "c"]
@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering import FeatureEngine, OnlineFeatureEngine
+
+
+@pytest.fixture
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    frames = []
+    for ticker, price in (("AAPL", 190.0), ("BRK-A", 620000.0)):
+        dates = pd.bdate_range("2025-01-01", periods=30)
+        close = price * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        frames.append(pd.DataFrame({
+            "Date": dates,
+            "ticker": ticker,
+            "Open": close * (1 + rng.normal(0, 0.005, len(dates))),
+            "Close": close,
+            "Volume": rng.integers(1_000, 1_000_000, len(dates)).astype("float64"),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.fixture
+def news() -> pd.DataFrame:
+    rng = np.random.default_rng(11)
+    n = 400
+    return pd.DataFrame({
+        "Date": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 42 * 24 * 60, n), unit="min"),
+        "ticker": rng.choice(["AAPL", "BRK-A"], n),
+        "Sentiment Score": rng.uniform(-1, 1, n).round(4),
+    }).sort_values("Date", ignore_index=True)
+
+
+def online_features(news: pd.DataFrame, bars: pd.DataFrame, chunks: int, tmp_path) -> pd.DataFrame:
+    """
+    Feed the inputs chunk by chunk in date order, saving and reloading the engine after every
+    chunk, and upsert the features of every chunk into a CSV file as the CLI does.
+    """
+    state_path = str(tmp_path / "state.json")
+    exporter = FeatureEngine(output_path=str(tmp_path / "online_features.csv"))
+    cutoffs = pd.date_range(news["Date"].min().normalize(), news["Date"].max() + pd.Timedelta(days=1),
+                            periods=chunks + 1)
+    engine = OnlineFeatureEngine()
+    for number, (start, end) in enumerate(zip(cutoffs[:-1], cutoffs[1:])):
+        engine.add_articles(news[(news["Date"] >= start) & (news["Date"] < end)])
+        engine.add_bars(bars[(bars["Date"] >= start) & (bars["Date"] < end)])
+        engine.save(state_path)
+        exporter.export_to_csv(engine.features(), upsert=number > 0)
+        engine = OnlineFeatureEngine.load(state_path)
+    return pd.read_csv(exporter.output_path, parse_dates=["Date"])
+
+
+@pytest.mark.parametrize("chunks", [1, 3, 7])
+def test_online_features_match_batch_build(tmp_path, news: pd.DataFrame, bars: pd.DataFrame, chunks: int) -> None:
+    expected = FeatureEngine(output_path=str(tmp_path / "features.csv")).build(news, bars)
+    expected = expected.sort_values(["ticker", "Date"]).reset_index(drop=True)
+
+    actual = online_features(news, bars, chunks, tmp_path)
+
+    pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False, rtol=1e-9)
+
+
+def test_refeeding_downloaded_bars_keeps_features(tmp_path, news: pd.DataFrame, bars: pd.DataFrame) -> None:
+    state_path = str(tmp_path / "state.json")
+    first_download = bars[bars["Date"] <= "2025-01-20"].copy()
+    # The latest bar of the first download was still forming
+    first_download.loc[first_download["Date"] == "2025-01-20", "Close"] *= 1.02
+
+    exporter = FeatureEngine(output_path=str(tmp_path / "online_features.csv"))
+
+    engine = OnlineFeatureEngine()
+    engine.add_articles(news)
+    engine.add_bars(first_download)
+    engine.save(state_path)
+    exporter.export_to_csv(engine.features())
+    # Every later download returns the whole period again
+    engine = OnlineFeatureEngine.load(state_path)
+    engine.add_bars(bars)
+    engine.add_bars(bars)
+    exporter.export_to_csv(engine.features(), upsert=True)
+    actual = pd.read_csv(exporter.output_path, parse_dates=["Date"])
+
+    expected = FeatureEngine(output_path=str(tmp_path / "features.csv")).build(news, bars)
+    expected = expected.sort_values(["ticker", "Date"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected[actual.columns], check_dtype=False, rtol=1e-9)
+
+
+def test_state_keeps_only_recent_days(tmp_path, news: pd.DataFrame, bars: pd.DataFrame) -> None:
+    state_path = str(tmp_path / "state.json")
+    engine = OnlineFeatureEngine(retention_days=7)
+    engine.add_articles(news)
+    engine.add_bars(bars)
+    engine.save(state_path)
+
+    state = OnlineFeatureEngine.load(state_path)
+    latest = bars["Date"].max()
+    for ticker in ("AAPL", "BRK-A"):
+        kept_days = pd.to_datetime(list(state._news[ticker]) + list(state._stock_rows[ticker]))
+        assert kept_days.min() >= latest - pd.Timedelta(days=7)
+    assert state.features().empty or state.features()["Date"].min() >= latest - pd.Timedelta(days=7)
+    # Articles of a final day are too late to be counted
+    assert state.add_article("AAPL", "2025-01-02", 0.5) is None
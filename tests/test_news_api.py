@@ -0,0 +1,102 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+from src.news_api import NewsApiClient, NewsApiError, NewsApiResultLimitError, _HostDispatcher
+
+
+def page(total_results: int, *published: str) -> Dict[str, Any]:
+    return {
+        "totalResults": total_results,
+        "articles": [{"url": f"https://example.com/{p}", "publishedAt": p} for p in published],
+    }
+
+
+def client_serving(pages: List[Dict[str, Any]], **kwargs: Any) -> NewsApiClient:
+    client = NewsApiClient("apple", "business", 7, api_key="test", page_size=2, **kwargs)
+
+    def get_page(number: int) -> Dict[str, Any]:
+        if number > len(pages):
+            raise NewsApiResultLimitError("maximumResultsReached")
+        return pages[number - 1]
+
+    client._get_page = get_page
+    return client
+
+
+def test_complete_pagination_is_not_truncated() -> None:
+    client = client_serving([page(3, "2025-01-03T10:00:00Z", "2025-01-02T10:00:00Z"),
+                             page(3, "2025-01-01T10:00:00Z")])
+
+    assert len(list(client.iter_article_pages())) == 2
+    assert not client.truncated
+
+
+@pytest.mark.parametrize("kwargs, pages", [
+    ({"max_pages": 1}, [page(4, "2025-01-03T10:00:00Z", "2025-01-02T10:00:00Z")]),
+    ({}, [page(6, "2025-01-03T10:00:00Z", "2025-01-02T10:00:00Z")]),
+])
+def test_pagination_stopped_early_is_truncated(kwargs: Dict[str, Any], pages: List[Dict[str, Any]]) -> None:
+    client = client_serving(pages, **kwargs)
+
+    assert len(list(client.iter_article_pages())) == 1
+    assert client.truncated
+
+
+def run_with_timeout(fn: Callable[[], Any], timeout: float = 10.0) -> Any:
+    """Run fn on a thread and fail instead of hanging if it does not return in time."""
+    outcome: Dict[str, Any] = {}
+
+    def target() -> None:
+        try:
+            outcome["result"] = fn()
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "call did not return"
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def test_failing_host_does_not_leave_downloads_pending() -> None:
+    client = NewsApiClient("apple", "business", 7, api_key="test")
+
+    def extract(index: int, article: Dict[str, Any]) -> Dict[str, Any]:
+        if "bad.example.com" in article["url"]:
+            time.sleep(0.01)
+            raise RuntimeError("worker crashed")
+        article["full_text"] = "text"
+        return article
+
+    client._extract_article_content = extract
+    articles = ([{"url": f"https://bad.example.com/{i}"} for i in range(5)]
+                + [{"url": f"https://good.example.com/{i}"} for i in range(5)])
+
+    with pytest.raises(NewsApiError, match="worker crashed"):
+        run_with_timeout(lambda: client.extract_full_articles(
+            max_workers=2, max_per_host=1, pages=[{"articles": articles}]
+        ))
+
+
+def test_closed_dispatcher_fails_queued_tasks() -> None:
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        dispatcher = _HostDispatcher(executor, lambda value: release.wait(5) and value, max_per_host=1)
+        running = dispatcher.submit("example.com", 1)
+        queued = [dispatcher.submit("example.com", value) for value in (2, 3)]
+
+        dispatcher.close(NewsApiError("aborted"))
+        late = dispatcher.submit("other.example.com", 4)
+        release.set()
+
+        assert running.result(timeout=5) == 1
+        for future in queued + [late]:
+            with pytest.raises(NewsApiError, match="aborted"):
+                future.result(timeout=5)
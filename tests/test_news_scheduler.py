@@ -0,0 +1,143 @@
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+from src.news_api import NewsApiRateLimitError
+from src.news_scheduler import MergedRequest, NewsQueryScheduler, QueryJob
+
+
+def article(url: str, title: str, published: str = "2025-01-02T12:00:00Z") -> Dict[str, Any]:
+    return {"url": url, "title": title, "description": "", "content": "", "publishedAt": published}
+
+
+class FakeClient:
+    """Serves the pages a FakeScheduler holds for a query instead of calling the API."""
+
+    def __init__(self, scheduler: "FakeScheduler", request: MergedRequest) -> None:
+        self.scheduler = scheduler
+        self.request = request
+        self.truncated = False
+
+    def iter_article_pages(self) -> Iterator[Dict[str, Any]]:
+        pages = self.scheduler.pages[self.request.query]
+        for page_number, page in enumerate(pages, start=1):
+            if self.scheduler.quota == 0:
+                raise NewsApiRateLimitError("Request quota exhausted - try again later")
+            self.scheduler.quota -= 1
+            self.scheduler.queries.append(self.request.query)
+            yield page
+            if page_number == self.scheduler.max_pages:
+                self.truncated = page_number < len(pages)
+                return
+
+
+class FakeScheduler(NewsQueryScheduler):
+
+    def __init__(self, pages: Dict[str, List[Dict[str, Any]]], quota: int = 100, **kwargs: Any) -> None:
+        super().__init__(api_key="test", **kwargs)
+        self.pages = pages
+        self.quota = quota
+        self.queries: List[str] = []
+
+    def _client(self, request: MergedRequest) -> FakeClient:
+        return FakeClient(self, request)
+
+
+def job(query: str, start: str = "2025-01-01", end: str = "2025-01-03") -> QueryJob:
+    return QueryJob(query, "business", start, end)
+
+
+@pytest.mark.parametrize("query, title, expected", [
+    ("apple", "Apple beats estimates", True),
+    ("apple", "Microsoft beats estimates", False),
+    ("apple AND iphone", "Apple sells more iPhone units", True),
+    ("apple AND iphone", "Apple beats estimates", False),
+    ('"interest rates"', "Fed keeps interest rates steady", True),
+    ('"interest rates"', "Rates and interest diverge", False),
+    ("apple OR microsoft", "Microsoft beats estimates", True),
+    ("(apple) OR (microsoft)", "Microsoft beats estimates", True),
+    ("apple OR microsoft", "Google beats estimates", False),
+    ("apple NOT fruit", "Apple beats estimates", True),
+    ("apple NOT fruit", "Apple fruit prices rise", False),
+    ("apple -fruit", "Apple fruit prices rise", False),
+    ("apple AND NOT fruit OR pear", "Pear fruit prices rise", True),
+    ("+apple -\"fruit prices\"", "Apple fruit prices rise", False),
+])
+def test_matches(query: str, title: str, expected: bool) -> None:
+    assert job(query).matches(article("https://example.com/a", title)) is expected
+
+
+def test_matches_title_description_and_content() -> None:
+    item = {"title": "Markets", "description": "Apple rallies", "content": None}
+    assert job("apple").matches(item)
+
+
+def test_merged_articles_tagged_with_matching_jobs() -> None:
+    scheduler = FakeScheduler({"(apple) OR (microsoft)": [{"totalResults": 2, "articles": [
+        article("https://example.com/a", "Apple beats estimates"),
+        article("https://example.com/m", "Microsoft beats estimates"),
+    ]}]})
+
+    result = scheduler.fetch([job("apple"), job("microsoft")])
+
+    assert result.requests == 1
+    tags = {a["url"]: a["matched_queries"] for a in result.articles}
+    assert tags == {"https://example.com/a": [job("apple").key], "https://example.com/m": [job("microsoft").key]}
+
+
+def test_request_over_result_limit_is_split() -> None:
+    scheduler = FakeScheduler({
+        "(apple) OR (microsoft)": [{"totalResults": 500, "articles": [
+            article("https://example.com/a", "Apple beats estimates"),
+        ]}],
+        "apple": [{"totalResults": 1, "articles": [article("https://example.com/a", "Apple beats estimates")]}],
+        "microsoft": [{"totalResults": 1, "articles": [article("https://example.com/m", "Microsoft beats estimates")]}],
+    }, max_results=100)
+
+    result = scheduler.fetch([job("apple"), job("microsoft")])
+
+    assert scheduler.queries == ["(apple) OR (microsoft)", "apple", "microsoft"]
+    assert result.requests == 3
+    assert sorted(a["url"] for a in result.articles) == ["https://example.com/a", "https://example.com/m"]
+    assert result.pending == []
+
+
+def test_rate_limit_keeps_progress_of_interrupted_request() -> None:
+    query = "(apple) OR (microsoft)"
+    scheduler = FakeScheduler({query: [
+        {"totalResults": 3, "articles": [article("https://example.com/1", "Apple news", "2025-01-03T10:00:00Z")]},
+        {"totalResults": 3, "articles": [article("https://example.com/2", "Apple news", "2025-01-02T09:00:00Z")]},
+        {"totalResults": 3, "articles": [article("https://example.com/3", "Apple news", "2025-01-01T08:00:00Z")]},
+    ]}, quota=2, max_results=None)
+    apple = job("apple", "2025-01-01", "2025-01-03")
+    microsoft = job("microsoft", "2025-01-02T12:00:00", "2025-01-03")
+
+    result = scheduler.fetch([apple, microsoft])
+
+    assert result.requests == 2
+    assert len(result.articles) == 2
+    # The fetched pages reach back to 2025-01-02T09:00:00, which covers the microsoft window
+    assert result.pending == [QueryJob("apple", "business", "2025-01-01", "2025-01-02T09:00:00")]
+
+
+def test_rate_limit_before_first_page_keeps_all_jobs_pending() -> None:
+    scheduler = FakeScheduler({"apple": [{"totalResults": 0, "articles": []}]}, quota=0)
+
+    result = scheduler.fetch([job("apple")])
+
+    assert result.requests == 0
+    assert result.pending == [job("apple")]
+
+
+def test_single_job_over_result_limit_is_truncated() -> None:
+    scheduler = FakeScheduler({"apple": [
+        {"totalResults": 3, "articles": [article("https://example.com/1", "Apple news", "2025-01-03T10:00:00Z")]},
+        {"totalResults": 3, "articles": [article("https://example.com/2", "Apple news", "2025-01-02T09:00:00Z")]},
+        {"totalResults": 3, "articles": [article("https://example.com/3", "Apple news", "2025-01-01T08:00:00Z")]},
+    ]}, max_pages=2, max_results=1)
+
+    result = scheduler.fetch([job("apple")])
+
+    assert scheduler.queries == ["apple", "apple"]
+    assert result.pending == []
+    assert result.truncated == [QueryJob("apple", "business", "2025-01-01", "2025-01-02T09:00:00")]
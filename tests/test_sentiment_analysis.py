@@ -0,0 +1,71 @@
+import pytest
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from src.sentiment_analysis import CompiledVaderScorer
+
+CORPUS = [
+    # Plain lexicon words, boosters and dampeners
+    "The company reported good results.",
+    "The company reported very good results.",
+    "The company reported somewhat good results.",
+    "Profits were kind of disappointing this quarter.",
+    # Negation, including contractions and 'never so'
+    "The outlook is not good.",
+    "The outlook isn't bad at all.",
+    "Analysts don't expect a strong recovery.",
+    "Investors were never so happy with a merger.",
+    "Without doubt the deal is not without risk.",
+    "Nobody thinks the stock is cheap, nor attractive.",
+    # 'but' shifts the weight to what follows it
+    "Revenue was great, but guidance was terrible.",
+    "The launch was a failure but the brand is strong.",
+    "It was not bad but not great either.",
+    # Capitalized emphasis, alone and in mixed-case text
+    "The results were GREAT.",
+    "The results were GREAT and the outlook is GOOD.",
+    "SHARES COLLAPSE AFTER FRAUD ALLEGATIONS",
+    # Emoticons and emoji-like tokens
+    "Earnings beat expectations :)",
+    "Another downgrade :( what a mess",
+    "Dividend raised again <3",
+    "lol the CEO said what?! :D",
+    # Punctuation emphasis
+    "Record profits!",
+    "Record profits!!!",
+    "Record profits!!!!!!",
+    "Is this a good buy?",
+    "Is this a good buy???",
+    "Is this a good buy?!?!",
+    # Idioms, multi-word boosters and repeated words
+    "The new product is the bomb, a real hit.",
+    "Sales went up kind of slowly, and it's a kiss of death for margins.",
+    "Good, good, good, but bad bad.",
+    # Mixed content and edge cases
+    "Shares fell 5% after the CEO resigned; however, analysts remain optimistic about the long-term strategy.",
+    "",
+    "   ",
+    "12345 $AAPL #earnings @analyst",
+    "No comment.",
+]
+
+
+@pytest.fixture(scope="module")
+def analyzer() -> SentimentIntensityAnalyzer:
+    return SentimentIntensityAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def scorer(analyzer: SentimentIntensityAnalyzer) -> CompiledVaderScorer:
+    return CompiledVaderScorer(analyzer.lexicon)
+
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_polarity_scores_match_nltk(
+        analyzer: SentimentIntensityAnalyzer, scorer: CompiledVaderScorer, text: str
+) -> None:
+    assert scorer.polarity_scores(text) == pytest.approx(analyzer.polarity_scores(text), abs=1e-9)
+
+
+def test_score_batch_matches_nltk(analyzer: SentimentIntensityAnalyzer, scorer: CompiledVaderScorer) -> None:
+    expected = [analyzer.polarity_scores(text) for text in CORPUS]
+    assert scorer.score_batch(CORPUS) == [pytest.approx(scores, abs=1e-9) for scores in expected]